@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2019 Giuliano França
+
+MIT License
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+====================================================================================================
+
+How to use:
+    * Run the file, no display is needed. Results are printed and written as JSON.
+    * Save a baseline once with --baseline and --save-baseline, later runs fail when a case gets
+      slower than the baseline by more than the threshold. Runs on another GL backend or renderer
+      than the baseline are not compared.
+    * Example: python benchmark.py --output bench.json --baseline baseline.json --threshold 0.25
+
+Dependencies:
+    * Python 3
+    * Numpy
+    * PyOpenGL with Mesa EGL or OSMesa for the submission cases (skipped otherwise)
+
+Todo:
+    * NDA
+
+Sources:
+    * NDA
+
+This code supports Pylint. Rc file in project.
+"""
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import platform
+import numpy as np
+
+from objects import geometry
+from objects import mesh
+from viewer import meshbuffer
+from viewer import softwaregl
+
+
+kTorusSizes = (16, 64, 256, 512)
+kLegacyTorusSizes = (16, 64)
+kCubeSizes = (8, 32, 128, 256)
+kSubmitSizes = (16, 64, 128)
+
+
+def legacyTorus(subdAxis, subdHeight, radius=1.0, radiusSec=0.5):
+    """Compute the torus points with the original rotatingCube per point matrix loop.
+
+    Returns:
+        list: The position of every point.
+    """
+    step = 2.0 * math.pi / subdAxis
+    stepSec = 2.0 * math.pi / subdHeight
+    points = []
+    for i in range(subdAxis):
+        alpha = step * i + (math.pi / 2.0)
+        mOrigin = np.identity(4)
+        mOrigin[0][0] = math.cos(-alpha)
+        mOrigin[0][2] = -math.sin(-alpha)
+        mOrigin[2][0] = math.sin(-alpha)
+        mOrigin[2][2] = math.cos(-alpha)
+        mOrigin[3][0] = math.cos(step * i) * radius
+        mOrigin[3][2] = math.sin(step * i) * radius
+        for j in range(subdHeight):
+            beta = stepSec * j
+            mChildL = np.identity(4)
+            mChildL[3][1] = -math.sin(beta) * radiusSec
+            mChildL[3][2] = math.cos(beta) * radiusSec
+            mChildW = np.matmul(mChildL, mOrigin)
+            points.append([mChildW[3][0], mChildW[3][1], mChildW[3][2]])
+    return points
+
+
+def timeit(function, repeat, finish=None):
+    """Return the best time of several runs of a function.
+
+    Args:
+        function (callable): The function to time, called without arguments.
+        repeat (int): The number of runs.
+        finish (callable): Optional function called inside the timed region after each run.
+
+    Returns:
+        float: The fastest run in seconds.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        if finish is not None:
+            finish()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def submitImmediate(gl, positions, lines):
+    """Send the torus wireframe one vertex per call, like the old draw methods."""
+    gl.glBegin(gl.GL_LINES)
+    for index in lines.ravel().tolist():
+        vertex = positions[index]
+        gl.glVertex3f(vertex[0], vertex[1], vertex[2])
+    gl.glEnd()
+
+
+def openGL(platformName):
+    """Return a headless GL module and the name of the backend.
+
+    The SoftwareGL stand-in, which only measures the Python side of the calls, is only used
+    when asked for with the "software" platform.
+
+    Returns:
+        tuple: The GL module, the backend name and the objects to release at the end.
+
+    Raises:
+        RuntimeError: The headless context of the platform can not be created.
+    """
+    if platformName != "software":
+        try:
+            # pylint: disable=import-outside-toplevel
+            from viewer import offscreen
+            context = offscreen.createContext(platformName)
+            import OpenGL.GL as gl
+            framebuffer = offscreen.Framebuffer(256, 256)
+            framebuffer.bind()
+            renderer = gl.glGetString(gl.GL_RENDERER).decode("ascii", "replace")
+            return gl, "%s (%s)" % (platformName, renderer), [framebuffer, context]
+        except Exception as error:  # pylint: disable=broad-except
+            raise RuntimeError("Headless %s GL unavailable (%s)." % (platformName, error)) from error
+    return softwaregl.SoftwareGL(), "software", []
+
+
+def runBenchmarks(repeat, platformName, quick=False):
+    """Run every benchmark case.
+
+    Args:
+        repeat (int): The number of runs of each case, the fastest is kept.
+        platformName (str): "egl", "osmesa" or "software".
+        quick (bool): Use only the smallest sizes.
+
+    Returns:
+        dict: The metadata and the time in seconds of each case.
+
+    Raises:
+        RuntimeError: The headless context of the platform can not be created.
+    """
+    torusSizes = kTorusSizes[:2] if quick else kTorusSizes
+    cubeSizes = kCubeSizes[:2] if quick else kCubeSizes
+    submitSizes = kSubmitSizes[:2] if quick else kSubmitSizes
+    # Opened first, a missing headless GL stops the run before the long CPU cases.
+    gl, backend, resources = openGL(platformName)
+    results = {}
+
+    for size in kLegacyTorusSizes:
+        results["torus.legacy/%dx%d" % (size, size)] = timeit(lambda size=size: legacyTorus(size, size), max(1, repeat // 2))
+    for size in torusSizes:
+        results["torus.vectorized/%dx%d" % (size, size)] = timeit(lambda size=size: geometry.torus(size, size), repeat)
+        positions, _, triangles = geometry.torus(size, size)
+        results["normals.smooth/%dx%d" % (size, size)] = timeit(
+            lambda positions=positions, triangles=triangles: geometry.smoothNormals(positions, triangles), repeat)
+    for size in cubeSizes:
+        results["cube.box/%d" % size] = timeit(lambda size=size: geometry.box(size, size, size), repeat)
+        quads = geometry.box(size, size, size)["quads"]
+        results["cube.edges/%d" % size] = timeit(lambda quads=quads: geometry.uniqueEdges(quads), repeat)
+
+    for size in submitSizes:
+        positions, _ = geometry.torusGrid(size, size)
+        lines = geometry.torusLineIndices(size, size)
+        vertexCount = lines.size
+        results["submit.immediate/%dx%d" % (size, size)] = timeit(
+            lambda positions=positions, lines=lines: submitImmediate(gl, positions, lines), repeat, gl.glFinish) / vertexCount
+        buffer = meshbuffer.MeshBuffer(gl)
+        buffer.upload(mesh.Mesh(positions, {"lines": lines}))
+        results["submit.buffer/%dx%d" % (size, size)] = timeit(
+            lambda buffer=buffer: buffer.draw("lines"), repeat, gl.glFinish) / vertexCount
+        buffer.release()
+    for resource in resources:
+        resource.release()
+
+    meta = {"python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "glBackend": backend,
+            "repeat": repeat,
+            "units": "seconds, per vertex for submit.* cases",
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S")}
+    return {"meta": meta, "results": results}
+
+
+def compareBaseline(results, baseline, threshold):
+    """Find the cases slower than the baseline.
+
+    Args:
+        results (dict): The results of this run.
+        baseline (dict): The stored results.
+        threshold (float): The allowed slowdown ratio, 0.25 means 25 percent.
+
+    Returns:
+        list: The (case, baseline, current) tuples that regressed.
+
+    Raises:
+        ValueError: The GL backend, which names the renderer, differs from the baseline, so the
+            submission timings are not comparable.
+    """
+    backend = results["meta"].get("glBackend")
+    reference = baseline.get("meta", {}).get("glBackend")
+    if backend != reference:
+        raise ValueError("The GL backend %r differs from the baseline backend %r." % (backend, reference))
+    regressions = []
+    for case, reference in sorted(baseline["results"].items()):
+        current = results["results"].get(case)
+        if current is not None and current > reference * (1.0 + threshold):
+            regressions.append((case, reference, current))
+    return regressions
+
+
+def parseArguments(argv):
+    """Parse the command line.
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Headless benchmarks of the geometry generation and draw submission.")
+    parser.add_argument("-o", "--output", default="benchmark.json", help="Result JSON file.")
+    parser.add_argument("-b", "--baseline", help="Baseline JSON file to compare against.")
+    parser.add_argument("-t", "--threshold", type=float, default=0.25, help="Allowed slowdown ratio against the baseline.")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="Runs of each case, the fastest is kept.")
+    parser.add_argument("-p", "--platform", choices=("egl", "osmesa", "software"), default=os.environ.get("PYOPENGL_PLATFORM", "egl"),
+                        help="Headless GL platform of the submission cases.")
+    parser.add_argument("--quick", action="store_true", help="Only run the smallest sizes.")
+    parser.add_argument("--save-baseline", action="store_true", help="Also write the results to the baseline file.")
+    args = parser.parse_args(argv)
+    if args.save_baseline and not args.baseline:
+        parser.error("--save-baseline needs the --baseline file to write.")
+    return args
+
+
+def main(argv=None):
+    """Run the benchmarks.
+
+    Returns:
+        int: 1 when a case regressed against the baseline, 2 when the baseline was recorded on
+            another GL backend or no headless GL is available, 0 otherwise.
+    """
+    args = parseArguments(argv)
+    try:
+        results = runBenchmarks(args.repeat, args.platform, args.quick)
+    except RuntimeError as error:
+        print("%s Run with --platform software to time the Python side only." % error)
+        return 2
+    print("GL backend: %s" % results["meta"]["glBackend"])
+    for case, seconds in sorted(results["results"].items()):
+        unit = "us/vertex" if case.startswith("submit.") else "ms"
+        print("%-32s %12.4f %s" % (case, seconds * (1e6 if unit == "us/vertex" else 1e3), unit))
+    with open(args.output, "w") as resultFile:
+        json.dump(results, resultFile, indent=2, sort_keys=True)
+
+    if args.baseline and args.save_baseline:
+        with open(args.baseline, "w") as baselineFile:
+            json.dump(results, baselineFile, indent=2, sort_keys=True)
+    elif args.baseline:
+        with open(args.baseline) as baselineFile:
+            baseline = json.load(baselineFile)
+        try:
+            regressions = compareBaseline(results, baseline, args.threshold)
+        except ValueError as error:
+            print("Baseline not compared: %s" % error)
+            return 2
+        for case, reference, current in regressions:
+            print("REGRESSION %s: %.6g s -> %.6g s (+%.0f%%)" % (case, reference, current, (current / reference - 1.0) * 100.0))
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
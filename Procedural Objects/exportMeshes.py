@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2019 Giuliano França
+
+MIT License
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+====================================================================================================
+
+How to use:
+    * Pass the shape, the values of each parameter to sweep and the output folder.
+    * Every combination of the values is generated and written in a process pool.
+    * Example: python exportMeshes.py torus --radius 1 2 --secRadius 0.25 0.5 --subdAxis 16 64 -o out
+
+Dependencies:
+    * Python 3
+    * Numpy
+
+Todo:
+    * NDA
+
+Sources:
+    * NDA
+
+This code supports Pylint. Rc file in project.
+"""
+import os
+import sys
+import time
+import argparse
+import itertools
+import concurrent.futures
+
+from objects import meshio
+from objects import shapes
+
+
+def variantName(shape, parameters):
+    """Return the file name of a variant without extension.
+
+    Args:
+        shape (str): The shape name.
+        parameters (dict): The parameter values of the variant.
+
+    Returns:
+        str: The name built from the shape and the parameter values.
+    """
+    return "_".join([shape] + ["%s%s" % (name, value) for name, value in parameters.items()])
+
+
+def exportVariant(job):
+    """Generate and write one variant. Runs in a worker process.
+
+    Args:
+        job (tuple): The shape name, the parameter dict, the output folder and the file format.
+
+    Returns:
+        tuple: The written path and its vertex count.
+    """
+    shape, parameters, folder, fileFormat = job
+    shapeGeometry = shapes.kShapes[shape](**parameters)
+    primitive = "triangles" if "triangles" in shapeGeometry.mesh()[1] else "lines"
+    meshData = shapeGeometry.toMesh(normals=primitive == "triangles")
+    path = os.path.join(folder, "%s.%s" % (variantName(shape, parameters), fileFormat))
+    meshio.kWriters[fileFormat](path, meshData, primitive)
+    return path, meshData.vertexCount
+
+
+def sweep(shape, values):
+    """Expand the parameter values into every combination.
+
+    Args:
+        shape (str): The shape name.
+        values (dict): The list of values of each parameter.
+
+    Returns:
+        list: One parameter dict per variant.
+    """
+    names = [name for name, _ in shapes.kShapes[shape].kParameters]
+    return [dict(zip(names, combination)) for combination in itertools.product(*(values[name] for name in names))]
+
+
+def parseArguments(argv):
+    """Parse the command line.
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Export procedural objects without Qt or OpenGL.")
+    subparsers = parser.add_subparsers(dest="shape")
+    subparsers.required = True
+    for shape, shapeClass in shapes.kShapes.items():
+        shapeParser = subparsers.add_parser(shape, help="Export a %s sweep." % shape)
+        for name, default in shapeClass.kParameters:
+            shapeParser.add_argument("--%s" % name, type=type(default), nargs="+", default=[default],
+                                     help="Values of %s to sweep (default: %s)." % (name, default))
+        shapeParser.add_argument("-o", "--output", default="export", help="Output folder.")
+        shapeParser.add_argument("-f", "--format", choices=sorted(meshio.kWriters), default="glb", help="File format.")
+        shapeParser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="Number of worker processes.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Run the exporter.
+
+    Returns:
+        int: The exit code.
+    """
+    args = parseArguments(argv)
+    variants = sweep(args.shape, vars(args))
+    os.makedirs(args.output, exist_ok=True)
+    jobs = [(args.shape, parameters, args.output, args.format) for parameters in variants]
+
+    start = time.perf_counter()
+    vertexCount = 0
+    if args.jobs > 1 and len(jobs) > 1:
+        chunkSize = max(1, len(jobs) // (args.jobs * 4))
+        with concurrent.futures.ProcessPoolExecutor(max_workers=args.jobs) as executor:
+            for _, count in executor.map(exportVariant, jobs, chunksize=chunkSize):
+                vertexCount += count
+    else:
+        for job in jobs:
+            vertexCount += exportVariant(job)[1]
+    elapsed = time.perf_counter() - start
+    print("Exported %d meshes (%d vertices) to %s in %.2fs." % (len(jobs), vertexCount, args.output, elapsed))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
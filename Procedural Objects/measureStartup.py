@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2019 Giuliano França
+
+MIT License
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+====================================================================================================
+
+How to use:
+    * Run the file from this folder. The viewer is started several times with --first-frame, it
+      quits after its first frame and the time from the launch to that frame is printed.
+    * Cold runs start without compiled .ui modules and with an empty bytecode cache. Warm runs
+      reuse both, as every start after the first one does.
+    * Use QT_QPA_PLATFORM=offscreen to measure without a display.
+    * Example: python measureStartup.py --runs 5
+
+Dependencies:
+    * Python 3
+    * PySide2
+    * PyOpenGL
+
+Todo:
+    * NDA
+
+Sources:
+    * NDA
+
+This code supports Pylint. Rc file in project.
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+import numpy as np
+
+from objects import uicache
+
+
+kUiFolder = "ui"
+
+
+def launch(pycachePrefix, timeout):
+    """Start the viewer once and wait for its first frame.
+
+    Args:
+        pycachePrefix (str): The folder of the bytecode cache of the run.
+        timeout (float): Seconds to wait for the first frame.
+
+    Returns:
+        dict: The seconds from the launch until the imports finished and until the first frame.
+    """
+    environment = dict(os.environ, PYTHONPYCACHEPREFIX=pycachePrefix)
+    start = time.time()
+    result = subprocess.run([sys.executable, "proceduralObjects.py", "--first-frame"], env=environment, timeout=timeout,
+                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, universal_newlines=True, check=False)
+    stamps = dict(line.split() for line in result.stdout.splitlines() if line.startswith(("imported ", "firstFrame ")))
+    if "firstFrame" not in stamps:
+        raise RuntimeError("The viewer exited with code %d before its first frame." % result.returncode)
+    return {name: float(stamp) - start for name, stamp in stamps.items()}
+
+
+def measure(runs, cold, timeout):
+    """Launch the viewer several times with cold or warm caches.
+
+    Args:
+        runs (int): Number of measured launches.
+        cold (bool): Remove the compiled .ui modules and use a new bytecode cache before every
+            launch. Warm runs share the caches, filled by a first launch that is not measured.
+        timeout (float): Seconds to wait for each first frame.
+
+    Returns:
+        dict: The list of seconds of each phase.
+    """
+    timings = {"imported": [], "firstFrame": []}
+    with tempfile.TemporaryDirectory() as prefixRoot:
+        if not cold:
+            launch(prefixRoot, timeout)
+            # The .ui modules are compiled in the background of the first launch, make sure they are all there.
+            uicache.compileAll(kUiFolder)
+        for run in range(runs):
+            prefix = prefixRoot
+            if cold:
+                shutil.rmtree(os.path.join(kUiFolder, uicache.kCacheFolder), ignore_errors=True)
+                prefix = os.path.join(prefixRoot, str(run))
+            for name, seconds in launch(prefix, timeout).items():
+                timings[name].append(seconds)
+    return timings
+
+
+def parseArguments(argv):
+    """Parse the command line.
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Measure the time from the launch of the viewer to its first frame.")
+    parser.add_argument("-r", "--runs", type=int, default=5, help="Measured launches of each mode.")
+    parser.add_argument("-t", "--timeout", type=float, default=60.0, help="Seconds to wait for a first frame.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Run the measurement.
+
+    Returns:
+        int: The exit code.
+    """
+    args = parseArguments(argv)
+    for mode in ("cold", "warm"):
+        timings = measure(args.runs, mode == "cold", args.timeout)
+        for name, seconds in timings.items():
+            p50, p95 = np.percentile(seconds, [50, 95]) * 1000.0
+            print("%-5s %-11s p50 %8.1f ms | p95 %8.1f ms | min %8.1f ms" % (mode, name, p50, p95, min(seconds) * 1000.0))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
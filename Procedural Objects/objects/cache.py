@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2019 Giuliano França
+
+MIT License
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+====================================================================================================
+
+How to use:
+    * Use the shared cache (or create a GeometryCache) and call fetch() with a key and a builder.
+    * Check the counters with stats() to size the byte budget.
+
+Dependencies:
+    * Python 3
+    * Numpy
+
+Todo:
+    * NDA
+
+Sources:
+    * NDA
+
+This code supports Pylint. Rc file in project.
+"""
+import threading
+import collections
+import numpy as np
+
+
+def arraysBytes(value):
+    """Return the number of bytes held by the arrays of a value.
+
+    Args:
+        value (object): An array or a tuple, list or dict of arrays.
+
+    Returns:
+        int: The sum of the nbytes of all arrays found.
+    """
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sum(arraysBytes(item) for item in value.values())
+    if isinstance(value, (tuple, list)):
+        return sum(arraysBytes(item) for item in value)
+    return 0
+
+
+def freezeArrays(value):
+    """Make all arrays of a value read only, so cached geometry can't be changed by a consumer.
+
+    Args:
+        value (object): An array or a tuple, list or dict of arrays.
+    """
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    elif isinstance(value, dict):
+        for item in value.values():
+            freezeArrays(item)
+    elif isinstance(value, (tuple, list)):
+        for item in value:
+            freezeArrays(item)
+
+
+class GeometryCache(object):
+    """Least recently used cache of generated geometry, bounded by a byte budget.
+
+    The cache can be shared by threads. Builders run outside of the lock, so two threads missing
+    the same key may both build it and the last one is kept.
+    """
+
+    def __init__(self, maxBytes=64 * 1024 * 1024):
+        self._lock = threading.RLock()
+        self._entries = collections.OrderedDict()
+        self._maxBytes = maxBytes
+        self._currentBytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    @property
+    def maxBytes(self):
+        """Return the byte budget of the cache.
+
+        Returns:
+            int: The maximum number of bytes kept in the cache.
+        """
+        return self._maxBytes
+
+    @maxBytes.setter
+    def maxBytes(self, value):
+        """Set the byte budget of the cache, evicting entries if needed."""
+        with self._lock:
+            self._maxBytes = value
+            self._evict()
+
+    @property
+    def currentBytes(self):
+        """Return the bytes used by the cached geometry.
+
+        Returns:
+            int: The sum of the bytes of all cached arrays.
+        """
+        return self._currentBytes
+
+    def _evict(self):
+        """Drop the least recently used entries until the cache fits its budget."""
+        while self._entries and self._currentBytes > self._maxBytes:
+            _, (_, size) = self._entries.popitem(last=False)
+            self._currentBytes -= size
+            self.evictions += 1
+
+    def get(self, key, default=None):
+        """Return a cached value and mark it as recently used.
+
+        Args:
+            key (tuple): The object type followed by its parameters.
+            default (object): The value returned when the key is not cached.
+
+        Returns:
+            object: The cached geometry or the default value.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value):
+        """Store a value in the cache.
+
+        Values bigger than the whole budget are not stored.
+
+        Args:
+            key (tuple): The object type followed by its parameters.
+            value (object): An array or a tuple, list or dict of arrays.
+        """
+        size = arraysBytes(value)
+        freezeArrays(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._currentBytes -= old[1]
+            if size > self._maxBytes:
+                return
+            self._entries[key] = (value, size)
+            self._currentBytes += size
+            self._evict()
+
+    def fetch(self, key, builder):
+        """Return the cached value of a key, building and storing it on a miss.
+
+        Args:
+            key (tuple): The object type followed by its parameters.
+            builder (callable): Function without arguments that generates the value.
+
+        Returns:
+            object: The cached or the new geometry.
+        """
+        value = self.get(key)
+        if value is None:
+            value = builder()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        """Remove all entries. The counters are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._currentBytes = 0
+
+    def stats(self):
+        """Return the cache counters.
+
+        Returns:
+            dict: The hits, misses, evictions, entries and bytes of the cache.
+        """
+        return {"hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._currentBytes,
+                "maxBytes": self._maxBytes}
+
+
+sharedCache = GeometryCache()
@@ -44,70 +44,16 @@ Sources:
 
 This code supports Pylint. Rc file in project.
 """
-import math
-import collections
-import numpy as np
-import OpenGL.GL as gl
-from PySide2 import QtCore
-from PySide2 import QtUiTools
+from objects import panel
+from objects import shapes
 
 
-class ProceduralCube(QtCore.QObject):
+@panel.registerPanel("cube")
+class ProceduralCube(panel.ShapePanel):
     """Class of the cube parameters."""
 
     def __init__(self, file, glViewer, parent=None):
-        super(ProceduralCube, self).__init__(parent)
-        loader = QtUiTools.QUiLoader()
-        cubeUIFile = QtCore.QFile(file)
-        cubeUIFile.open(QtCore.QFile.ReadOnly)
-        self.widget = loader.load(cubeUIFile)
-        self.glViewer = glViewer
-        cubeUIFile.close()
-
-        self._width = 10
-        self._height = 10
-        self._depth = 10
-        self._subdWidth = 1
-        self._subdHeight = 1
-        self._subdDepth = 1
-
-        self.restoreDefaults()
-        self.configureWidgets()
-
-    def configureWidgets(self):
-        """Configure all widgets."""
-        self.widget.sld_width.sliderMoved.connect(self.updateAllValues)
-        self.widget.sld_height.sliderMoved.connect(self.updateAllValues)
-        self.widget.sld_depth.sliderMoved.connect(self.updateAllValues)
-        self.widget.sld_subdWidth.sliderMoved.connect(self.updateAllValues)
-        self.widget.sld_subdHeight.sliderMoved.connect(self.updateAllValues)
-        self.widget.sld_subdDepth.sliderMoved.connect(self.updateAllValues)
-
-    def updateAllValues(self):
-        """Update all values from the sliders to the instance."""
-        widthVal = self.widget.sld_width.value()
-        heightVal = self.widget.sld_height.value()
-        depthVal = self.widget.sld_depth.value()
-        subdWidthVal = self.widget.sld_subdWidth.value()
-        subdHeightVal = self.widget.sld_subdHeight.value()
-        subdDepthVal = self.widget.sld_subdDepth.value()
-        self._width = widthVal
-        self._height = heightVal
-        self._depth = depthVal
-        self._subdWidth = subdWidthVal
-        self._subdHeight = subdHeightVal
-        self._subdDepth = subdDepthVal
-        self.glViewer.update()
-
-    def restoreDefaults(self):
-        """Restores widgets to default value."""
-        self.widget.sld_width.setValue(10)
-        self.widget.sld_height.setValue(10)
-        self.widget.sld_depth.setValue(10)
-        self.widget.sld_subdWidth.setValue(1)
-        self.widget.sld_subdHeight.setValue(1)
-        self.widget.sld_subdDepth.setValue(1)
-        self.updateAllValues()
+        super(ProceduralCube, self).__init__(file, glViewer, shapes.CubeGeometry, parent)
 
     @property
     def cubeWidth(self):
@@ -116,7 +62,7 @@ class ProceduralCube(QtCore.QObject):
         Returns:
             float: The width value of the cube.
         """
-        return self._width * 0.1
+        return self.geometry.width
 
     @property
     def cubeHeight(self):
@@ -125,7 +71,7 @@ class ProceduralCube(QtCore.QObject):
         Returns:
             float: The height value of the cube.
         """
-        return self._height * 0.1
+        return self.geometry.height
 
     @property
     def cubeDepth(self):
@@ -134,7 +80,7 @@ class ProceduralCube(QtCore.QObject):
         Returns:
             float: The depth value of the cube.
         """
-        return self._depth * 0.1
+        return self.geometry.depth
 
     @property
     def cubeSubdWidth(self):
@@ -143,7 +89,7 @@ class ProceduralCube(QtCore.QObject):
         Returns:
             float: The subdivisions width value of the cube.
         """
-        return self._subdWidth
+        return self.geometry.subdWidth
 
     @property
     def cubeSubdHeight(self):
@@ -152,7 +98,7 @@ class ProceduralCube(QtCore.QObject):
         Returns:
             float: The subdivisions height value of the cube.
         """
-        return self._subdHeight
+        return self.geometry.subdHeight
 
     @property
     def cubeSubdDepth(self):
@@ -161,33 +107,4 @@ class ProceduralCube(QtCore.QObject):
         Returns:
             float: The subdivisions depth value of the cube.
         """
-        return self._subdDepth
-
-    def draw(self):
-        """Draw a cube using OpenGL functions."""
-        # pylint: disable=unused-variable
-        width = self.cubeWidth
-        height = self.cubeHeight
-        depth = self.cubeDepth
-        subdWidth = self.cubeSubdWidth
-        subdHeight = self.cubeSubdHeight
-        subdDepth = self.cubeSubdDepth
-
-        stepW = 1 / subdWidth
-        stepH = 1 / subdHeight
-        stepD = 1 / subdDepth
-
-        vtxList = []
-
-        gl.glColor3f(1.0, 0.0, 0.0)
-        gl.glPointSize(6.0)
-        gl.glBegin(gl.GL_POINTS)
-        gl.glVertex3f(width, height, depth)
-        gl.glVertex3f(-width, height, depth)
-        gl.glVertex3f(width, -height, depth)
-        gl.glVertex3f(-width, -height, depth)
-        gl.glVertex3f(width, -height, -depth)
-        gl.glVertex3f(-width, -height, -depth)
-        gl.glVertex3f(width, height, -depth)
-        gl.glVertex3f(-width, height, -depth)
-        gl.glEnd()
+        return self.geometry.subdDepth
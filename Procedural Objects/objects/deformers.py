@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2019 Giuliano França
+
+MIT License
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+====================================================================================================
+
+How to use:
+    * List deformers in the kDeformers of a ShapeGeometry subclass, each bound to one of its
+      kParameters. They run in order on the positions written by scale().
+    * A deformer whose parameter is zero is skipped, so the stack costs nothing until it is used.
+    * Only numpy is imported, so this module is safe to use in worker processes.
+
+Dependencies:
+    * Python 3
+    * Numpy
+
+Todo:
+    * NDA
+
+Sources:
+    * https://www.cs.jhu.edu/~misha/Fall04/Barr84.pdf
+
+This code supports Pylint. Rc file in project.
+"""
+import math
+import numpy as np
+
+
+# Frequencies of the noise deformer, along each axis of the shape, per bounding radius. Unrelated
+# values, so the displacement does not repeat on the shape.
+kNoiseFrequencies = np.array([[2.31, 4.17, 3.63],
+                              [3.97, 2.09, 4.41],
+                              [4.73, 3.29, 2.57]], dtype=np.float32)
+kNoisePhases = np.array([0.3, 1.7, 2.9], dtype=np.float32)
+
+
+class Deformer(object):
+    """Base class of the cheap per vertex modifiers applied on top of a shape.
+
+    A deformer reads its amount from a parameter of the shape and changes the positions in place,
+    without touching the topology. Deformers that know how they rotate the normals set
+    kExactNormals and implement deformNormals(), the shape computes the normals of the others
+    from the deformed triangles.
+    """
+    __slots__ = ("parameter",)
+    kExactNormals = False
+
+    def __init__(self, parameter):
+        self.parameter = parameter
+
+    def __repr__(self):
+        return "%s(%r)" % (type(self).__name__, self.parameter)
+
+    def amount(self, shape):
+        """Return the value of the parameter of the deformer.
+
+        Args:
+            shape (ShapeGeometry): The deformed shape.
+
+        Returns:
+            float: The amount of deformation, zero when the deformer does nothing.
+        """
+        return getattr(shape, self.parameter)
+
+    def deform(self, shape, frame, positions):
+        """Deform the positions in place.
+
+        Args:
+            shape (ShapeGeometry): The deformed shape.
+            frame (dict): The frame of the shape.
+            positions (numpy.ndarray): The float32 positions with shape (N, 3).
+        """
+        raise NotImplementedError
+
+    def deformNormals(self, shape, frame, normals):
+        """Rotate the normals in place, for deformers with kExactNormals.
+
+        Args:
+            shape (ShapeGeometry): The deformed shape.
+            frame (dict): The frame of the shape.
+            normals (numpy.ndarray): The float32 normals with shape (N, 3).
+        """
+        raise NotImplementedError
+
+
+class RingTwist(Deformer):
+    """Rotate each ring section of a swept shape around its pivot, more on every ring.
+
+    The frame holds the unit pivot directions of the rings in "positions", grouped by ring, and
+    the ring count in "rings". The first ring stays in place and the rotation grows linearly up
+    to the amount in degrees after a full turn. Only one rotation matrix per ring is computed.
+    """
+    __slots__ = ("radius",)
+    kExactNormals = True
+
+    def __init__(self, parameter, radius):
+        super(RingTwist, self).__init__(parameter)
+        self.radius = radius
+
+    def _rotations(self, shape, frame):
+        """Return the transposed rotation matrix and the unit pivot of each ring.
+
+        Each matrix turns the plane of the ring pivot and the Y axis around the ring tangent,
+        so the points rotate about their pivot with a single batched matrix product. The matrices
+        are written in the scratch buffers of the shape, the planes and skew matrices of the rings
+        only once per topology.
+
+        Returns:
+            tuple: The float32 matrices with shape (rings, 3, 3), to multiply row vectors on the
+                left, and the pivots with shape (rings, 1, 3).
+        """
+        rings = frame["rings"]
+        pivots = frame["positions"].reshape(rings, -1, 3)[:, 0]
+
+        def initializePlane(plane):
+            np.multiply(pivots[:, :, np.newaxis], pivots[:, np.newaxis, :], out=plane)
+            plane[:, 1, 1] += 1.0
+
+        def initializeSkew(skew):
+            skew.fill(0.0)
+            skew[:, 1, :] += pivots
+            skew[:, :, 1] -= pivots
+
+        plane = shape.scratch((self.parameter, "plane"), (rings, 3, 3), initialize=initializePlane)
+        skew = shape.scratch((self.parameter, "skew"), (rings, 3, 3), initialize=initializeSkew)
+        steps = shape.scratch((self.parameter, "steps"), (rings,), np.float64, lambda steps: np.copyto(steps, np.arange(rings)))
+        angles = shape.scratch((self.parameter, "angles"), (rings,), np.float64)
+        trigonometry = shape.scratch((self.parameter, "trigonometry"), (rings,), np.float64)
+        factors = shape.scratch((self.parameter, "factors"), (rings, 1, 1))
+        matrices = shape.scratch((self.parameter, "matrices"), (rings, 3, 3))
+        rotated = shape.scratch((self.parameter, "rotated"), (rings, 3, 3))
+
+        # The angles are computed in double precision, only their cosine and sine are rounded.
+        np.multiply(steps, math.radians(self.amount(shape)) / rings, out=angles)
+        np.cos(angles, out=trigonometry)
+        trigonometry -= 1.0
+        np.copyto(factors[:, 0, 0], trigonometry, casting="same_kind")
+        np.multiply(factors, plane, out=matrices)
+        np.sin(angles, out=trigonometry)
+        np.copyto(factors[:, 0, 0], trigonometry, casting="same_kind")
+        np.multiply(factors, skew, out=rotated)
+        matrices += rotated
+        # The diagonal of every matrix, as a strided view.
+        matrices.reshape(rings, 9)[:, ::4] += 1.0
+        return matrices.transpose(0, 2, 1), pivots[:, np.newaxis, :]
+
+    def deform(self, shape, frame, positions):
+        """Rotate the offset of each point from its ring pivot.
+
+        Args:
+            shape (ShapeGeometry): The deformed shape, with the ring radius in the radius parameter.
+            frame (dict): The frame of the shape.
+            positions (numpy.ndarray): The float32 positions with shape (N, 3).
+        """
+        matrices, pivots = self._rotations(shape, frame)
+        offsets = positions.reshape(frame["rings"], -1, 3)
+        scaled = shape.scratch((self.parameter, "pivots"), pivots.shape)
+        np.multiply(pivots, np.float32(getattr(shape, self.radius)), out=scaled)
+        product = shape.scratch((self.parameter, "product"), offsets.shape)
+        offsets -= scaled
+        np.matmul(offsets, matrices, out=product)
+        np.add(product, scaled, out=offsets)
+
+    def deformNormals(self, shape, frame, normals):
+        """Rotate the normals by the angle of their ring.
+
+        Args:
+            shape (ShapeGeometry): The deformed shape.
+            frame (dict): The frame of the shape.
+            normals (numpy.ndarray): The float32 normals with shape (N, 3).
+        """
+        matrices, _ = self._rotations(shape, frame)
+        vectors = normals.reshape(frame["rings"], -1, 3)
+        product = shape.scratch((self.parameter, "product"), vectors.shape)
+        np.matmul(vectors, matrices, out=product)
+        np.copyto(vectors, product)
+
+
+class Taper(Deformer):
+    """Scale the shape across the Y axis, linearly with the height.
+
+    The scale is one plus the amount at the bounding radius above the center, and one minus the
+    amount at the same distance below it.
+    """
+    __slots__ = ()
+
+    def deform(self, shape, frame, positions):
+        """Scale X and Z by the taper factor of the height.
+
+        Args:
+            shape (ShapeGeometry): The deformed shape.
+            frame (dict): The frame of the shape.
+            positions (numpy.ndarray): The float32 positions with shape (N, 3).
+        """
+        factors = positions[:, 1] * np.float32(self.amount(shape) / max(shape.boundingRadius, 1e-6))
+        factors += 1.0
+        positions[:, 0] *= factors
+        positions[:, 2] *= factors
+
+
+class Bend(Deformer):
+    """Bend the X axis of the shape into an arc in the XY plane.
+
+    The amount is the angle in degrees swept by the bounding radius, so the bend looks the same at
+    any size. The points at the center keep their place.
+    """
+    __slots__ = ()
+
+    def deform(self, shape, frame, positions):
+        """Wrap the points around the center of curvature above the shape.
+
+        Args:
+            shape (ShapeGeometry): The deformed shape.
+            frame (dict): The frame of the shape.
+            positions (numpy.ndarray): The float32 positions with shape (N, 3).
+        """
+        curvature = math.radians(self.amount(shape)) / max(shape.boundingRadius, 1e-6)
+        angles = positions[:, 0] * np.float32(curvature)
+        distances = np.float32(1.0 / curvature) - positions[:, 1]
+        positions[:, 0] = distances * np.sin(angles)
+        positions[:, 1] = np.float32(1.0 / curvature) - distances * np.cos(angles)
+
+
+class Noise(Deformer):
+    """Displace the points by a smooth pseudo random field made of a few sine waves.
+
+    The field only depends on the position, so coincident points move together and seams stay
+    closed. The amount is the largest displacement, relative to the bounding radius.
+    """
+    __slots__ = ()
+
+    def deform(self, shape, frame, positions):
+        """Add the displacement field to the positions.
+
+        Args:
+            shape (ShapeGeometry): The deformed shape.
+            frame (dict): The frame of the shape.
+            positions (numpy.ndarray): The float32 positions with shape (N, 3).
+        """
+        radius = max(shape.boundingRadius, 1e-6)
+        waves = positions @ (kNoiseFrequencies.T / np.float32(radius))
+        waves += kNoisePhases
+        np.sin(waves, out=waves)
+        waves *= np.float32(self.amount(shape) * radius)
+        positions += waves
@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2019 Giuliano França
+
+MIT License
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+====================================================================================================
+
+How to use:
+    * Create a MeshDiskCache with a folder and a byte budget. It can be pickled to worker
+      processes, and any number of processes can share the same folder.
+    * keyOf() hashes the generator name, its version and the parameters of a mesh.
+    * load() maps a stored mesh with numpy.memmap, so only the pages read by the upload are
+      loaded from disk. store() writes a Mesh and evicts the least recently used files.
+
+Dependencies:
+    * Python 3
+    * Numpy
+
+Todo:
+    * NDA
+
+Sources:
+    * https://numpy.org/doc/stable/reference/generated/numpy.memmap.html
+
+This code supports Pylint. Rc file in project.
+"""
+import os
+import time
+import struct
+import hashlib
+import tempfile
+import numpy as np
+
+from objects import mesh
+
+
+kMagic = b"PMSH"
+kFormatVersion = 2
+# Magic, format version, index size, attribute mask, primitive mask, vertex count, index count,
+# the start and count of each kPrimitives index range, the bounding box and the bounding sphere.
+kHeader = struct.Struct("<4sHHHHQQ6Q6f4f")
+kDataOffset = 128
+kPrimitives = ("points", "lines", "triangles")
+kAttributeNames = tuple(name for name, _ in mesh.kAttributes)
+kExtension = ".mesh"
+# Temporary files older than this were left by a writer that died.
+kStaleSeconds = 3600.0
+
+
+class MeshDiskCache(object):
+    """Persistent cache of generated meshes in a folder, bounded by a byte budget.
+
+    Files are written to a temporary name and renamed in place, so readers in other processes
+    always see a complete file. A mapped file stays readable after another process replaced or
+    evicted it. Loading refreshes the modification time, which orders the eviction.
+
+    Each file holds one mesh, little endian: a kDataOffset bytes header starting with kHeader,
+    the interleaved float32 vertices, then the packed indices aligned to mesh.kIndexAlignment.
+    """
+
+    def __init__(self, directory, maxBytes=1024 * 1024 * 1024, minSeconds=0.05):
+        self.directory = directory
+        self.maxBytes = maxBytes
+        self.minSeconds = minSeconds
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def keyOf(shapeType, parameters, normals=False):
+        """Return the key of a generated mesh.
+
+        Args:
+            shapeType (type): A ShapeGeometry subclass.
+            parameters (tuple): The parameter values in declaration order.
+            normals (bool): True if the mesh has vertex normals.
+
+        Returns:
+            str: A hex digest of the generator, its version and the parameters.
+        """
+        description = repr((shapeType.kName, shapeType.kVersion, kFormatVersion, tuple(parameters), bool(normals)))
+        return hashlib.sha1(description.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        """Return the file path of a key."""
+        return os.path.join(self.directory, key + kExtension)
+
+    def load(self, key):
+        """Map a stored mesh without reading it.
+
+        Args:
+            key (str): The key returned by keyOf().
+
+        Returns:
+            Mesh: A read only mesh backed by the file, or None if the key is not stored.
+        """
+        path = self._path(key)
+        try:
+            data = np.memmap(path, dtype=np.uint8, mode="r")
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        layout = self._readHeader(data)
+        if layout is None:
+            del data
+            self._remove(path)
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return mesh.Mesh.fromBuffer(data[kDataOffset:], layout)
+
+    @staticmethod
+    def _readHeader(data):
+        """Validate the header and size of a mapped file.
+
+        Returns:
+            dict: The layout of the stored mesh, or None if the file is not a complete mesh.
+        """
+        if len(data) < kDataOffset:
+            return None
+        fields = kHeader.unpack(bytes(data[:kHeader.size]))
+        magic, version, indexSize, attributeMask, primitiveMask, vertexCount, indexCount = fields[:7]
+        if magic != kMagic or version != kFormatVersion:
+            return None
+        ranges = {primitive: (fields[7 + i * 2], fields[8 + i * 2])
+                  for i, primitive in enumerate(kPrimitives) if primitiveMask & (1 << i)}
+        layout = {"attributes": tuple(name for i, name in enumerate(kAttributeNames) if attributeMask & (1 << i)),
+                  "vertexCount": vertexCount,
+                  "indexType": "<u%d" % indexSize,
+                  "indexCount": indexCount,
+                  "ranges": ranges,
+                  "box": fields[13:19],
+                  "sphere": fields[19:23]}
+        nbytes, _ = mesh.Mesh.bufferSize(vertexCount, layout["attributes"], indexCount)
+        if len(data) != kDataOffset + nbytes or np.dtype(layout["indexType"]) != mesh.indexType(vertexCount):
+            return None
+        return layout
+
+    def store(self, key, meshData):
+        """Write a mesh and evict the oldest files beyond the budget.
+
+        Args:
+            key (str): The key returned by keyOf().
+            meshData (Mesh): The mesh to store.
+
+        Returns:
+            bool: True if the mesh was written.
+        """
+        _, indexOffset = mesh.Mesh.bufferSize(meshData.vertexCount, meshData.attributes, meshData.indices.size)
+        ranges = []
+        for primitive in kPrimitives:
+            ranges += meshData.ranges.get(primitive, (0, 0))
+        header = kHeader.pack(kMagic, kFormatVersion, meshData.indices.itemsize,
+                              sum(1 << i for i, name in enumerate(kAttributeNames) if name in meshData.attributes),
+                              sum(1 << i for i, primitive in enumerate(kPrimitives) if primitive in meshData.ranges),
+                              meshData.vertexCount, meshData.indices.size, *ranges,
+                              *meshData.box.ravel().tolist(), *meshData.sphere.tolist())
+        vertexBuffer = meshData.vertexBuffer()
+        try:
+            handle, temporary = tempfile.mkstemp(suffix=".tmp", dir=self.directory)
+        except OSError:
+            return False
+        try:
+            with os.fdopen(handle, "wb") as meshFile:
+                meshFile.write(header.ljust(kDataOffset, b"\x00"))
+                meshFile.write(vertexBuffer)
+                meshFile.write(b"\x00" * (indexOffset - vertexBuffer.nbytes))
+                meshFile.write(meshData.indexBuffer())
+            os.replace(temporary, self._path(key))
+        except OSError:
+            # The disk is full, or the file is mapped by a process on a system that can't replace it.
+            self._remove(temporary)
+            return False
+        self.writes += 1
+        self.evict()
+        return True
+
+    def fetch(self, key, builder):
+        """Return the stored mesh of a key, building and storing it on a miss.
+
+        Args:
+            key (str): The key returned by keyOf().
+            builder (callable): Function without arguments that generates the Mesh.
+
+        Returns:
+            Mesh: The mapped or the new mesh.
+        """
+        meshData = self.load(key)
+        if meshData is None:
+            meshData = builder()
+            self.store(key, meshData)
+        return meshData
+
+    def evict(self):
+        """Delete the least recently used files until the folder fits the budget."""
+        files = []
+        now = time.time()
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                try:
+                    info = entry.stat()
+                except OSError:
+                    continue
+                if entry.name.endswith(kExtension):
+                    files.append((info.st_mtime, info.st_size, entry.path))
+                elif entry.name.endswith(".tmp") and now - info.st_mtime > kStaleSeconds:
+                    self._remove(entry.path)
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.maxBytes:
+                break
+            if self._remove(path):
+                self.evictions += 1
+            total -= size
+
+    @staticmethod
+    def _remove(path):
+        """Delete a file that another process may have deleted already.
+
+        Returns:
+            bool: True if this call deleted the file.
+        """
+        try:
+            os.remove(path)
+        except OSError:
+            return False
+        return True
+
+    def stats(self):
+        """Return the cache counters of this process.
+
+        Returns:
+            dict: The hits, misses, writes and evictions.
+        """
+        return {"hits": self.hits, "misses": self.misses, "writes": self.writes, "evictions": self.evictions}
@@ -0,0 +1,534 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2019 Giuliano França
+
+MIT License
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+====================================================================================================
+
+How to use:
+    * Import the module and call one of the generator functions.
+    * All generators are GL free and return contiguous numpy arrays.
+
+Dependencies:
+    * Python 3
+    * Numpy
+
+Todo:
+    * NDA
+
+Sources:
+    * https://en.wikipedia.org/wiki/Torus#Geometry
+
+This code supports Pylint. Rc file in project.
+"""
+import math
+import numpy as np
+
+
+def torusFrame(subdAxis, subdHeight, twist=0.0):
+    """Generate the unit directions of a torus grid in a single vectorized pass.
+
+    The layout matches the old per point matrix loop: ring ``i`` sits at the angle ``step * i``
+    around the Y axis and the section point ``j`` starts at the inner side of the ring. The twist
+    rotates each section around its ring pivot, linearly from zero on the first ring up to
+    ``twist`` degrees after a full turn.
+
+    Args:
+        subdAxis (int): Number of rings around the main axis.
+        subdHeight (int): Number of points in each ring section.
+        twist (float): Twist in degrees applied along the main axis.
+
+    Returns:
+        tuple: The float32 pivot directions and normals, both with shape (subdAxis * subdHeight, 3).
+    """
+    theta = np.arange(subdAxis, dtype=np.float64) * (2.0 * math.pi / subdAxis)
+    beta = np.arange(subdHeight, dtype=np.float64) * (2.0 * math.pi / subdHeight)
+    beta = beta[np.newaxis, :] + (math.radians(twist) / subdAxis) * np.arange(subdAxis)[:, np.newaxis]
+
+    cosTheta = np.cos(theta)[:, np.newaxis]
+    sinTheta = np.sin(theta)[:, np.newaxis]
+    cosBeta = np.cos(beta)
+    sinBeta = np.sin(beta)
+
+    pivots = np.zeros((subdAxis, subdHeight, 3), dtype=np.float32)
+    pivots[..., 0] = cosTheta
+    pivots[..., 2] = sinTheta
+
+    normals = np.empty((subdAxis, subdHeight, 3), dtype=np.float32)
+    normals[..., 0] = -cosBeta * cosTheta
+    normals[..., 1] = -sinBeta
+    normals[..., 2] = -cosBeta * sinTheta
+    return pivots.reshape(-1, 3), normals.reshape(-1, 3)
+
+
+def torusPositions(pivots, normals, radius, secRadius, out=None):
+    """Scale the unit directions of a torus frame into vertex positions.
+
+    Args:
+        pivots (numpy.ndarray): The pivot directions returned by torusFrame.
+        normals (numpy.ndarray): The normals returned by torusFrame.
+        radius (float): Distance from the center to the ring pivots.
+        secRadius (float): Radius of the ring section.
+        out (numpy.ndarray): Optional float32 array that receives the positions in place.
+
+    Returns:
+        numpy.ndarray: The float32 positions with the same shape of the pivots.
+    """
+    out = np.multiply(pivots, np.float32(radius), out=out)
+    out += normals * np.float32(secRadius)
+    return out
+
+
+def torusGrid(subdAxis, subdHeight, radius=1.0, secRadius=0.5, twist=0.0):
+    """Generate the vertices of a torus.
+
+    Args:
+        subdAxis (int): Number of rings around the main axis.
+        subdHeight (int): Number of points in each ring section.
+        radius (float): Distance from the center to the ring pivots.
+        secRadius (float): Radius of the ring section.
+        twist (float): Twist in degrees applied along the main axis.
+
+    Returns:
+        tuple: The float32 positions and normals, both with shape (subdAxis * subdHeight, 3).
+    """
+    pivots, normals = torusFrame(subdAxis, subdHeight, twist)
+    return torusPositions(pivots, normals, radius, secRadius, out=pivots), normals
+
+
+def torusIndices(subdAxis, subdHeight):
+    """Generate the triangle indices of a torus grid.
+
+    Args:
+        subdAxis (int): Number of rings around the main axis.
+        subdHeight (int): Number of points in each ring section.
+
+    Returns:
+        numpy.ndarray: The uint32 triangle indices with shape (subdAxis * subdHeight * 2, 3).
+    """
+    ring = np.arange(subdAxis, dtype=np.uint32)[:, np.newaxis]
+    point = np.arange(subdHeight, dtype=np.uint32)[np.newaxis, :]
+    nextRing = (ring + 1) % subdAxis
+    nextPoint = (point + 1) % subdHeight
+    a = ring * subdHeight + point
+    b = nextRing * subdHeight + point
+    c = nextRing * subdHeight + nextPoint
+    d = ring * subdHeight + nextPoint
+    # Counter clockwise seen from outside, so the faces agree with the normals of torusFrame.
+    triangles = np.stack((a, c, b, a, d, c), axis=-1)
+    return np.ascontiguousarray(triangles.reshape(-1, 3), dtype=np.uint32)
+
+
+def torusLineIndices(subdAxis, subdHeight):
+    """Generate the wireframe indices of a torus grid.
+
+    Each point is connected to the same point of the next ring and to the next point of its own
+    ring, so every grid edge is emitted once.
+
+    Args:
+        subdAxis (int): Number of rings around the main axis.
+        subdHeight (int): Number of points in each ring section.
+
+    Returns:
+        numpy.ndarray: The uint32 line indices with shape (subdAxis * subdHeight * 2, 2).
+    """
+    ring = np.arange(subdAxis, dtype=np.uint32)[:, np.newaxis]
+    point = np.arange(subdHeight, dtype=np.uint32)[np.newaxis, :]
+    start = ring * subdHeight + point
+    endAxis = ((ring + 1) % subdAxis) * subdHeight + point
+    endHeight = ring * subdHeight + (point + 1) % subdHeight
+    lines = np.stack((start, endAxis, start, endHeight), axis=-1)
+    return np.ascontiguousarray(lines.reshape(-1, 2), dtype=np.uint32)
+
+
+def torus(subdAxis, subdHeight, radius=1.0, secRadius=0.5, twist=0.0):
+    """Generate a complete torus mesh.
+
+    Args:
+        subdAxis (int): Number of rings around the main axis.
+        subdHeight (int): Number of points in each ring section.
+        radius (float): Distance from the center to the ring pivots.
+        secRadius (float): Radius of the ring section.
+        twist (float): Twist in degrees applied along the main axis.
+
+    Returns:
+        tuple: The positions, normals and triangle indices of the torus.
+    """
+    positions, normals = torusGrid(subdAxis, subdHeight, radius, secRadius, twist)
+    return positions, normals, torusIndices(subdAxis, subdHeight)
+
+
+# Faces of the box as (normal axis, side, u axis, v axis), with u x v pointing outwards.
+kBoxFaces = ((0, 1, 1, 2),
+             (0, 0, 2, 1),
+             (1, 1, 2, 0),
+             (1, 0, 0, 2),
+             (2, 1, 0, 1),
+             (2, 0, 1, 0))
+
+
+def smoothNormals(positions, triangles):
+    """Compute area weighted vertex normals from a triangle index buffer.
+
+    The cross product of two triangle sides is twice the triangle area long, so summing the
+    unnormalized face normals on their corners weights each face by its area. The work is done
+    one axis at a time on contiguous columns, and the sums are scattered with bincount, which is
+    much faster than numpy.add.at.
+
+    Args:
+        positions (numpy.ndarray): The vertex positions with shape (N, 3).
+        triangles (numpy.ndarray): The counter clockwise triangle indices with shape (T, 3).
+
+    Returns:
+        numpy.ndarray: The float32 unit normals with shape (N, 3). Vertices without area get zero.
+    """
+    positions = np.asarray(positions, dtype=np.float32).reshape(-1, 3)
+    triangles = np.asarray(triangles).reshape(-1, 3)
+    corners = [triangles[:, corner].astype(np.intp) for corner in range(3)]
+    sideA = []
+    sideB = []
+    for axis in range(3):
+        column = np.ascontiguousarray(positions[:, axis])
+        first = column.take(corners[0])
+        sideA.append(column.take(corners[1]) - first)
+        sideB.append(column.take(corners[2]) - first)
+    faceNormals = (sideA[1] * sideB[2] - sideA[2] * sideB[1],
+                   sideA[2] * sideB[0] - sideA[0] * sideB[2],
+                   sideA[0] * sideB[1] - sideA[1] * sideB[0])
+
+    normals = np.empty((len(positions), 3), dtype=np.float32)
+    for axis in range(3):
+        normals[:, axis] = sum(np.bincount(corner, weights=faceNormals[axis], minlength=len(positions)) for corner in corners)
+    lengths = np.sqrt(np.einsum("ij,ij->i", normals, normals))
+    lengths[lengths == 0.0] = 1.0
+    normals /= lengths[:, np.newaxis]
+    return normals
+
+
+def boxNormals(positions):
+    """Return the closed form vertex normals of a box generated by box().
+
+    Each coordinate at -1 or 1 lies on the face of that axis, so its sign is a component of the
+    normal. Face vertices get the face normal and the shared edge and corner vertices the
+    normalized sum of their faces. The normals do not change when the box is scaled.
+
+    Args:
+        positions (numpy.ndarray): The unit box positions returned by box().
+
+    Returns:
+        numpy.ndarray: The float32 unit normals with shape (N, 3).
+    """
+    positions = np.asarray(positions, dtype=np.float32)
+    normals = np.where(np.abs(positions) == 1.0, positions, np.float32(0.0))
+    normals /= np.sqrt(np.einsum("ij,ij->i", normals, normals))[:, np.newaxis]
+    return normals
+
+
+def uniqueEdges(faces, vertexCount=None):
+    """Return the unique edges of a triangle or quad index buffer, ready to draw as GL_LINES.
+
+    The edges of every face are packed in one integer key with the smaller index first, so both
+    directions of a shared edge get the same key. The keys are sorted and the repeated ones
+    dropped, which finds the unique edges in a few vectorized passes.
+
+    Args:
+        faces (numpy.ndarray): The face indices with shape (N, 3) or (N, 4).
+        vertexCount (int): Number of vertices in the mesh. Meshes up to 65536 vertices pack their
+            keys in 32 bits, which sorts faster. Found from the faces when not given.
+
+    Returns:
+        numpy.ndarray: The uint32 edge indices with shape (E, 2), each edge listed once.
+    """
+    faces = np.asarray(faces)
+    if not faces.size:
+        return np.zeros((0, 2), dtype=np.uint32)
+    if vertexCount is None:
+        vertexCount = int(faces.max()) + 1
+    keyType, shift = (np.uint32, 16) if vertexCount <= 0x10000 else (np.uint64, 32)
+    faces = faces.astype(keyType, copy=False)
+    nextCorners = np.roll(faces, -1, axis=1)
+    keys = (np.minimum(faces, nextCorners) << keyType(shift)) | np.maximum(faces, nextCorners)
+    keys = keys.ravel()
+    keys.sort()
+    unique = np.empty(len(keys), dtype=bool)
+    unique[:1] = True
+    np.not_equal(keys[1:], keys[:-1], out=unique[1:])
+    keys = keys[unique]
+    mask = keyType((1 << shift) - 1)
+    return np.stack((keys >> keyType(shift), keys & mask), axis=-1).astype(np.uint32)
+
+
+def box(subdWidth=1, subdHeight=1, subdDepth=1, faceNormals=False, uvs=False):
+    """Generate a watertight subdivided box from -1 to 1 in every axis.
+
+    Each of the six faces is built as a vectorized grid of lattice coordinates. The lattice points
+    are packed in a single integer key and merged with numpy.unique, so vertices on the shared
+    edges and corners exist only once.
+
+    Args:
+        subdWidth (int): Number of subdivisions in X.
+        subdHeight (int): Number of subdivisions in Y.
+        subdDepth (int): Number of subdivisions in Z.
+        faceNormals (bool): Also return the normal of each triangle.
+        uvs (bool): Also return the UVs of each triangle corner. They are face varying because a
+            shared vertex sits on more than one face.
+
+    Returns:
+        dict: The float32 "positions" (N, 3), the uint32 "quads" (Q, 4) and "triangles" (Q * 2, 3),
+            plus "faceNormals" (Q * 2, 3) and "uvs" (Q * 2, 3, 2) when requested.
+    """
+    counts = np.array([subdWidth, subdHeight, subdDepth], dtype=np.int64)
+    lattices = []
+    quads = []
+    normals = []
+    faceUvs = []
+    offset = 0
+    for axis, side, uAxis, vAxis in kBoxFaces:
+        countU = counts[uAxis]
+        countV = counts[vAxis]
+        lattice = np.empty((countU + 1, countV + 1, 3), dtype=np.int64)
+        lattice[..., axis] = side * counts[axis]
+        lattice[..., uAxis] = np.arange(countU + 1)[:, np.newaxis]
+        lattice[..., vAxis] = np.arange(countV + 1)[np.newaxis, :]
+        lattices.append(lattice.reshape(-1, 3))
+
+        local = np.arange((countU + 1) * (countV + 1), dtype=np.int64).reshape(countU + 1, countV + 1)
+        faceQuads = np.stack((local[:-1, :-1], local[1:, :-1], local[1:, 1:], local[:-1, 1:]), axis=-1).reshape(-1, 4)
+        if uvs:
+            gridUvs = np.empty((countU + 1, countV + 1, 2), dtype=np.float32)
+            gridUvs[..., 0] = (np.arange(countU + 1) / countU)[:, np.newaxis]
+            gridUvs[..., 1] = (np.arange(countV + 1) / countV)[np.newaxis, :]
+            faceUvs.append(gridUvs.reshape(-1, 2)[faceQuads[:, [0, 1, 2, 0, 2, 3]]].reshape(-1, 3, 2))
+        if faceNormals:
+            normal = np.zeros(3, dtype=np.float32)
+            normal[axis] = 1.0 if side else -1.0
+            normals.append(np.broadcast_to(normal, (len(faceQuads) * 2, 3)))
+        quads.append(faceQuads + offset)
+        offset += len(local.flat)
+
+    lattice = np.concatenate(lattices)
+    keys = (lattice[:, 0] * (counts[1] + 1) + lattice[:, 1]) * (counts[2] + 1) + lattice[:, 2]
+    _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    positions = (lattice[first] * (2.0 / counts) - 1.0).astype(np.float32)
+    quads = inverse.reshape(-1)[np.concatenate(quads)].astype(np.uint32)
+
+    result = {"positions": positions,
+              "quads": quads,
+              "triangles": np.ascontiguousarray(quads[:, [0, 1, 2, 0, 2, 3]].reshape(-1, 3))}
+    if faceNormals:
+        result["faceNormals"] = np.concatenate(normals)
+    if uvs:
+        result["uvs"] = np.concatenate(faceUvs)
+    return result
+
+
+def sphere(subdAxis, subdHeight):
+    """Generate a unit UV sphere with a single vertex at each pole.
+
+    Ring ``r`` sits at the polar angle ``pi * (r + 1) / subdHeight`` from the top pole, so
+    ``subdHeight - 1`` rings of ``subdAxis`` points lie between the poles. The poles are closed
+    with triangle fans and the rings are joined with quads.
+
+    Args:
+        subdAxis (int): Number of points around the Y axis.
+        subdHeight (int): Number of segments from pole to pole.
+
+    Returns:
+        dict: The float32 unit "positions" (N, 3), which are also the normals, and the uint32
+            "triangles" (subdAxis * (subdHeight - 1) * 2, 3) and "lines" indices.
+    """
+    rings = subdHeight - 1
+    phi = np.arange(1, subdHeight, dtype=np.float64) * (math.pi / subdHeight)
+    theta = np.arange(subdAxis, dtype=np.float64) * (2.0 * math.pi / subdAxis)
+    sinPhi = np.sin(phi)[:, np.newaxis]
+
+    positions = np.empty((rings * subdAxis + 2, 3), dtype=np.float32)
+    positions[0] = (0.0, 1.0, 0.0)
+    positions[-1] = (0.0, -1.0, 0.0)
+    grid = positions[1:-1].reshape(rings, subdAxis, 3)
+    grid[..., 0] = sinPhi * np.cos(theta)
+    grid[..., 1] = np.cos(phi)[:, np.newaxis]
+    grid[..., 2] = sinPhi * np.sin(theta)
+
+    top = 0
+    bottom = len(positions) - 1
+    index = np.arange(1, bottom, dtype=np.uint32).reshape(rings, subdAxis)
+    nextIndex = np.roll(index, -1, axis=1)
+    # Counter clockwise seen from outside: along the ring first, then down to the next ring.
+    a, b, c, d = index[:-1], nextIndex[:-1], nextIndex[1:], index[1:]
+    topFan = np.stack((np.full(subdAxis, top, dtype=np.uint32), nextIndex[0], index[0]), axis=-1)
+    bottomFan = np.stack((index[-1], nextIndex[-1], np.full(subdAxis, bottom, dtype=np.uint32)), axis=-1)
+    triangles = np.concatenate((topFan,
+                                np.stack((a, b, c, a, c, d), axis=-1).reshape(-1, 3),
+                                bottomFan))
+
+    meridians = np.concatenate((np.stack((np.full(subdAxis, top, dtype=np.uint32), index[0]), axis=-1),
+                                np.stack((index[:-1], index[1:]), axis=-1).reshape(-1, 2),
+                                np.stack((index[-1], np.full(subdAxis, bottom, dtype=np.uint32)), axis=-1)))
+    parallels = np.stack((index, nextIndex), axis=-1).reshape(-1, 2)
+    return {"positions": positions,
+            "triangles": np.ascontiguousarray(triangles, dtype=np.uint32),
+            "lines": np.ascontiguousarray(np.concatenate((meridians, parallels)), dtype=np.uint32)}
+
+
+# Corners of one gear tooth as (fraction of the tooth angle, radius index) with the radius indices
+# 1 for the root circle and 2 for the tip circle.
+kGearTooth = ((0.0, 1), (0.2, 2), (0.5, 2), (0.7, 1))
+
+
+def gearFrame(teeth):
+    """Generate the radius independent frame of an extruded gear with a hole in the middle.
+
+    The profile has four corners per tooth. The front and back sides hold an outer ring on the
+    profile and an inner ring on the hole, joined by four bands of quads: the front and back
+    faces and the outer and inner walls.
+
+    Args:
+        teeth (int): Number of teeth.
+
+    Returns:
+        dict: The float32 unit "directions" (N, 3) in the XZ plane, the uint8 "radial" index of
+            the circle of each vertex (0 for the hole, 1 for the root, 2 for the tip), the float32
+            "side" (N,) of each vertex (0.5 front, -0.5 back) and the uint32 "quads" (Q, 4).
+    """
+    tooth = np.array(kGearTooth)
+    count = teeth * len(tooth)
+    angles = ((np.arange(teeth)[:, np.newaxis] + tooth[:, 0]) * (2.0 * math.pi / teeth)).ravel()
+    profile = np.tile(tooth[:, 1], teeth).astype(np.uint8)
+
+    directions = np.zeros((4, count, 3), dtype=np.float32)
+    directions[..., 0] = np.cos(angles)
+    directions[..., 2] = np.sin(angles)
+    radial = np.zeros((4, count), dtype=np.uint8)
+    radial[0] = radial[2] = profile
+    side = np.empty((4, count), dtype=np.float32)
+    side[:2] = 0.5
+    side[2:] = -0.5
+
+    point = np.arange(count, dtype=np.uint32)
+    nextPoint = np.roll(point, -1)
+    frontOuter, frontInner, backOuter, backInner = (np.uint32(ring * count) for ring in range(4))
+    # Each band as (ring of the first corner, ring of the last corner), counter clockwise from outside.
+    bands = ((frontOuter, frontInner), (backInner, backOuter), (backOuter, frontOuter), (frontInner, backInner))
+    quads = np.concatenate([np.stack((first + point, last + point, last + nextPoint, first + nextPoint), axis=-1)
+                            for first, last in bands])
+    return {"directions": directions.reshape(-1, 3),
+            "radial": radial.ravel(),
+            "side": side.ravel(),
+            "quads": np.ascontiguousarray(quads, dtype=np.uint32)}
+
+
+def gearPositions(directions, radial, side, radius, innerRadius, toothDepth, thickness, out=None):
+    """Place the vertices of a gear frame.
+
+    Args:
+        directions (numpy.ndarray): The unit directions returned by gearFrame.
+        radial (numpy.ndarray): The circle index of each vertex returned by gearFrame.
+        side (numpy.ndarray): The side of each vertex returned by gearFrame.
+        radius (float): Radius of the tip circle.
+        innerRadius (float): Radius of the hole, kept inside the root circle.
+        toothDepth (float): Distance from the root circle to the tip circle.
+        thickness (float): Size of the extrusion along Y.
+        out (numpy.ndarray): Optional float32 array that receives the positions in place.
+
+    Returns:
+        numpy.ndarray: The float32 positions with shape (N, 3).
+    """
+    rootRadius = max(radius - toothDepth, radius * 0.05)
+    radii = np.array([min(innerRadius, rootRadius * 0.95), rootRadius, radius], dtype=np.float32)
+    out = np.multiply(directions, radii[radial][:, np.newaxis], out=out)
+    np.multiply(side, np.float32(thickness), out=out[:, 1])
+    return out
+
+
+def spiralFrame(subdAxis, subdHeight):
+    """Generate the connectivity of a tube swept along a helix.
+
+    The tube has ``subdAxis + 1`` open rings of ``subdHeight`` points, so the first and last rings
+    are not joined like in a torus.
+
+    Args:
+        subdAxis (int): Number of segments along the helix.
+        subdHeight (int): Number of points in each ring section.
+
+    Returns:
+        dict: The uint32 "quads" (subdAxis * subdHeight, 4) and "triangles" (subdAxis * subdHeight * 2, 3).
+    """
+    ring = np.arange(subdAxis, dtype=np.uint32)[:, np.newaxis]
+    point = np.arange(subdHeight, dtype=np.uint32)[np.newaxis, :]
+    nextPoint = (point + 1) % subdHeight
+    a = ring * subdHeight + point
+    b = (ring + 1) * subdHeight + point
+    c = (ring + 1) * subdHeight + nextPoint
+    d = ring * subdHeight + nextPoint
+    quads = np.stack((a, d, c, b), axis=-1).reshape(-1, 4)
+    return {"quads": quads,
+            "triangles": np.ascontiguousarray(quads[:, [0, 1, 2, 0, 2, 3]].reshape(-1, 3))}
+
+
+def spiralGrid(subdAxis, subdHeight, radius=1.0, secRadius=0.2, height=2.0, turns=3.0, out=None):
+    """Generate the vertices of a tube swept along a helix around the Y axis.
+
+    Every section is a circle in the plane spanned by the principal normal and the binormal of
+    the helix, which are closed form, so the whole tube is built in a few vectorized passes.
+
+    Args:
+        subdAxis (int): Number of segments along the helix.
+        subdHeight (int): Number of points in each ring section.
+        radius (float): Distance from the Y axis to the helix.
+        secRadius (float): Radius of the tube section.
+        height (float): Distance along Y between the two ends, centered on the origin.
+        turns (float): Number of turns of the helix.
+        out (numpy.ndarray): Optional float32 array that receives the positions in place.
+
+    Returns:
+        tuple: The float32 positions and normals, both with shape ((subdAxis + 1) * subdHeight, 3).
+    """
+    t = np.arange(subdAxis + 1, dtype=np.float64) / subdAxis
+    sweep = 2.0 * math.pi * turns
+    theta = (t * sweep)[:, np.newaxis]
+    beta = (np.arange(subdHeight, dtype=np.float64) * (2.0 * math.pi / subdHeight))[np.newaxis, :]
+    cosTheta = np.cos(theta)
+    sinTheta = np.sin(theta)
+
+    # Unit tangent of (r cos, h t, r sin); the section spans the outward normal N and the binormal T x N.
+    tangentLength = math.sqrt((radius * sweep) ** 2 + height ** 2) or 1.0
+    tangentY = height / tangentLength
+    tangentXZ = radius * sweep / tangentLength
+    cosBeta = np.cos(beta)
+    sinBeta = np.sin(beta)
+
+    normals = np.empty((subdAxis + 1, subdHeight, 3), dtype=np.float32)
+    normals[..., 0] = cosBeta * cosTheta + sinBeta * tangentY * sinTheta
+    normals[..., 1] = sinBeta * tangentXZ
+    normals[..., 2] = cosBeta * sinTheta - sinBeta * tangentY * cosTheta
+    normals = normals.reshape(-1, 3)
+
+    centers = np.empty((subdAxis + 1, 1, 3), dtype=np.float32)
+    centers[..., 0] = radius * cosTheta
+    centers[..., 1] = height * (t[:, np.newaxis] - 0.5)
+    centers[..., 2] = radius * sinTheta
+    if out is None:
+        out = np.empty_like(normals)
+    out.reshape(subdAxis + 1, subdHeight, 3)[...] = centers
+    out += normals * np.float32(secRadius)
+    return out, normals
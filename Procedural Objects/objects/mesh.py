@@ -0,0 +1,356 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2019 Giuliano França
+
+MIT License
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+====================================================================================================
+
+How to use:
+    * Build a Mesh from the position, normal and index arrays, e.g. Mesh(positions, {"lines": edges}).
+    * Pass vertexBuffer() and indexBuffer() to glBufferData, file writers or shared memory. Both
+      are memoryviews of the mesh arrays, so no copy is made.
+    * Give a writable buffer to the constructor to build the mesh straight in that memory, and
+      rebuild it elsewhere with fromBuffer() and the dict returned by layout().
+
+Dependencies:
+    * Python 3
+    * Numpy
+
+Todo:
+    * NDA
+
+Sources:
+    * https://www.khronos.org/opengl/wiki/Vertex_Specification_Best_Practices
+    * https://docs.python.org/3/library/stdtypes.html#memoryview
+
+This code supports Pylint. Rc file in project.
+"""
+import numpy as np
+
+
+# Vertex attributes in interleaved order, with their number of float32 components.
+kAttributes = (("position", 3),
+               ("normal", 3),
+               ("uv", 2))
+kVerticesPerPrimitive = {"points": 1, "lines": 2, "triangles": 3}
+# The indices start at this alignment when a mesh shares one buffer with its vertices.
+kIndexAlignment = 16
+
+
+def indexType(vertexCount):
+    """Return the smallest index type that can address every vertex.
+
+    Args:
+        vertexCount (int): Number of vertices in the mesh.
+
+    Returns:
+        numpy.dtype: uint16 up to 65536 vertices, uint32 above.
+    """
+    return np.dtype(np.uint16) if vertexCount <= 0x10000 else np.dtype(np.uint32)
+
+
+def interleave(positions, normals=None, uvs=None, out=None):
+    """Pack the vertex attributes in one contiguous float32 array.
+
+    Args:
+        positions (numpy.ndarray): The vertex positions with shape (N, 3).
+        normals (numpy.ndarray): Optional vertex normals with shape (N, 3).
+        uvs (numpy.ndarray): Optional vertex UVs with shape (N, 2).
+        out (numpy.ndarray): Optional float32 array that receives the vertices in place.
+
+    Returns:
+        numpy.ndarray: The vertices with one row per vertex and the attributes side by side.
+    """
+    positions = np.asarray(positions, dtype=np.float32).reshape(-1, 3)
+    if normals is None and uvs is None and out is None:
+        return np.ascontiguousarray(positions)
+    blocks = [positions] + [np.asarray(block, dtype=np.float32) for block in (normals, uvs) if block is not None]
+    if out is None:
+        out = np.empty((len(positions), sum(block.shape[-1] for block in blocks)), dtype=np.float32)
+    column = 0
+    for block in blocks:
+        size = block.shape[-1]
+        out[:, column:column + size] = block.reshape(-1, size)
+        column += size
+    return out
+
+
+def computeBounds(positions):
+    """Return the axis aligned bounding box and a bounding sphere of a set of points.
+
+    The sphere is centered on the box, with the distance to the farthest point as radius. It is
+    not the smallest sphere, but it is found in one pass and never larger than the box.
+
+    Args:
+        positions (numpy.ndarray): The points with shape (N, 3).
+
+    Returns:
+        tuple: The float32 box as minimum and maximum corners with shape (2, 3) and the float32
+            sphere as center and radius with shape (4,). Both are zero without points.
+    """
+    positions = np.asarray(positions, dtype=np.float32).reshape(-1, 3)
+    box = np.zeros((2, 3), dtype=np.float32)
+    sphere = np.zeros(4, dtype=np.float32)
+    if not len(positions):
+        return box, sphere
+    for axis in range(3):
+        # Reducing the columns one by one is much faster than along axis 0 of the (N, 3) array.
+        column = positions[:, axis]
+        box[0, axis] = column.min()
+        box[1, axis] = column.max()
+    sphere[:3] = (box[0] + box[1]) * 0.5
+    sphere[3] = np.sqrt(np.max(np.einsum("ij,ij->i", positions - sphere[:3], positions - sphere[:3])))
+    return box, sphere
+
+
+class Mesh(object):
+    """Mesh stored in two contiguous arrays, one for the vertices and one for the indices.
+
+    The vertex attributes are interleaved in float32, from 12 bytes per vertex with positions only
+    up to 32 bytes with normals and UVs. The index arrays of all primitives are packed one after
+    the other in a single uint16 or uint32 array, so a mesh maps to one vertex and one index buffer.
+    The bounding box and sphere are computed once when the mesh is generated and travel with its
+    layout, so the viewer can cull the mesh without reading its vertices.
+    """
+    __slots__ = ("vertices", "indices", "attributes", "ranges", "box", "sphere")
+
+    def __init__(self, positions, elements=None, normals=None, uvs=None, buffer=None):
+        positions = np.asarray(positions, dtype=np.float32).reshape(-1, 3)
+        self.attributes = tuple(name for name, block in zip(("position", "normal", "uv"), (positions, normals, uvs))
+                                if block is not None)
+        self.box, self.sphere = computeBounds(positions)
+        chunks = [np.asarray(indices).ravel() for indices in (elements or {}).values()]
+        indexCount = sum(chunk.size for chunk in chunks)
+        dtype = indexType(len(positions))
+        if buffer is None:
+            self.vertices = interleave(positions, normals, uvs)
+            self.indices = np.empty(indexCount, dtype=dtype)
+        else:
+            nbytes, indexOffset = self.bufferSize(len(positions), self.attributes, indexCount)
+            if nbytes > memoryview(buffer).nbytes:
+                raise ValueError("The buffer has %d bytes, the mesh needs %d." % (memoryview(buffer).nbytes, nbytes))
+            self.vertices = self._vertexView(buffer, len(positions), self.attributes)
+            interleave(positions, normals, uvs, out=self.vertices)
+            self.indices = np.frombuffer(buffer, dtype=dtype, count=indexCount, offset=indexOffset)
+        self.ranges = {}
+        start = 0
+        for primitive, chunk in zip(elements or {}, chunks):
+            self.indices[start:start + chunk.size] = chunk
+            self.ranges[primitive] = (start, chunk.size)
+            start += chunk.size
+
+    @staticmethod
+    def bufferSize(vertexCount, attributes, indexCount):
+        """Return the size of a mesh stored in a single buffer, the indices after the vertices.
+
+        Args:
+            vertexCount (int): Number of vertices.
+            attributes (tuple): The names of the vertex attributes.
+            indexCount (int): Number of indices of all primitives.
+
+        Returns:
+            tuple: The total number of bytes and the byte offset of the indices.
+        """
+        floats = sum(size for name, size in kAttributes if name in attributes)
+        indexOffset = -(-vertexCount * floats * 4 // kIndexAlignment) * kIndexAlignment
+        return indexOffset + indexCount * indexType(vertexCount).itemsize, indexOffset
+
+    @staticmethod
+    def _vertexView(buffer, vertexCount, attributes):
+        """Return the vertices stored at the start of a buffer as a float32 array."""
+        floats = sum(size for name, size in kAttributes if name in attributes)
+        return np.frombuffer(buffer, dtype=np.float32, count=vertexCount * floats).reshape(vertexCount, floats)
+
+    @classmethod
+    def fromBuffers(cls, vertexBuffer, indexBuffer, layout):
+        """Wrap existing memory in a Mesh without copying it.
+
+        Args:
+            vertexBuffer (buffer): Any object with the buffer protocol holding the vertices.
+            indexBuffer (buffer): Any object with the buffer protocol holding the indices.
+            layout (dict): The layout() of the mesh that wrote the buffers.
+
+        Returns:
+            Mesh: A mesh whose arrays are views of the given buffers.
+        """
+        mesh = cls.__new__(cls)
+        mesh.attributes = tuple(layout["attributes"])
+        mesh.vertices = cls._vertexView(vertexBuffer, layout["vertexCount"], mesh.attributes)
+        mesh.indices = np.frombuffer(indexBuffer, dtype=layout["indexType"], count=layout["indexCount"])
+        mesh.ranges = {primitive: tuple(indexRange) for primitive, indexRange in layout["ranges"].items()}
+        if "box" in layout:
+            mesh.box = np.array(layout["box"], dtype=np.float32).reshape(2, 3)
+            mesh.sphere = np.array(layout["sphere"], dtype=np.float32)
+        else:
+            mesh.box, mesh.sphere = computeBounds(mesh.positions)
+        return mesh
+
+    @classmethod
+    def fromBuffer(cls, buffer, layout):
+        """Wrap a buffer written by a Mesh built with the buffer argument, without copying it.
+
+        Args:
+            buffer (buffer): Any object with the buffer protocol holding the vertices and indices.
+            layout (dict): The layout() of the mesh that wrote the buffer.
+
+        Returns:
+            Mesh: A mesh whose arrays are views of the buffer.
+        """
+        _, indexOffset = cls.bufferSize(layout["vertexCount"], layout["attributes"], layout["indexCount"])
+        return cls.fromBuffers(buffer, memoryview(buffer)[indexOffset:], layout)
+
+    def layout(self):
+        """Describe the buffers, so another process can rebuild the mesh with fromBuffers().
+
+        Returns:
+            dict: The attribute names, the vertex and index counts, the index type, the index
+                range of each primitive and the bounds. Only plain python values, so it pickles cheaply.
+        """
+        return {"attributes": self.attributes,
+                "vertexCount": len(self.vertices),
+                "indexType": self.indices.dtype.str,
+                "indexCount": int(self.indices.size),
+                "ranges": dict(self.ranges),
+                "box": tuple(self.box.ravel().tolist()),
+                "sphere": tuple(self.sphere.tolist())}
+
+    @property
+    def vertexCount(self):
+        """Return the number of vertices.
+
+        Returns:
+            int: The vertex count.
+        """
+        return len(self.vertices)
+
+    @property
+    def stride(self):
+        """Return the size of one interleaved vertex.
+
+        Returns:
+            int: The number of bytes per vertex.
+        """
+        return self.vertices.shape[1] * self.vertices.itemsize
+
+    @property
+    def nbytes(self):
+        """Return the memory used by the vertex and index arrays.
+
+        Returns:
+            int: The number of bytes.
+        """
+        return self.vertices.nbytes + self.indices.nbytes
+
+    def attributeOffset(self, name):
+        """Return the byte offset of an attribute inside a vertex.
+
+        Args:
+            name (str): One of the kAttributes names.
+
+        Returns:
+            int: The offset in bytes, or None if the mesh does not have the attribute.
+        """
+        if name not in self.attributes:
+            return None
+        offset = 0
+        for attribute, size in kAttributes:
+            if attribute == name:
+                return offset
+            if attribute in self.attributes:
+                offset += size * self.vertices.itemsize
+        return None
+
+    def attribute(self, name):
+        """Return a view of one attribute of every vertex.
+
+        Args:
+            name (str): One of the kAttributes names.
+
+        Returns:
+            numpy.ndarray: A strided float32 view with one row per vertex, or None if the mesh
+                does not have the attribute.
+        """
+        offset = self.attributeOffset(name)
+        if offset is None:
+            return None
+        column = offset // self.vertices.itemsize
+        return self.vertices[:, column:column + dict(kAttributes)[name]]
+
+    @property
+    def positions(self):
+        """Return a view of the vertex positions.
+
+        Returns:
+            numpy.ndarray: The float32 positions with shape (N, 3).
+        """
+        return self.vertices[:, :3]
+
+    @property
+    def normals(self):
+        """Return a view of the vertex normals.
+
+        Returns:
+            numpy.ndarray: The float32 normals with shape (N, 3), or None without normals.
+        """
+        return self.attribute("normal")
+
+    @property
+    def hasNormals(self):
+        """Check if the vertices carry normals.
+
+        Returns:
+            bool: True if the mesh has vertex normals.
+        """
+        return "normal" in self.attributes
+
+    @property
+    def elements(self):
+        """Return views of the index array of each primitive.
+
+        Returns:
+            dict: The index arrays keyed by primitive name, shaped (N, vertices per primitive).
+        """
+        return {primitive: self.indices[start:start + count].reshape(-1, kVerticesPerPrimitive[primitive])
+                for primitive, (start, count) in self.ranges.items()}
+
+    def vertexBuffer(self):
+        """Return the raw bytes of the interleaved vertices.
+
+        Returns:
+            memoryview: A byte view of the vertex array, sharing its memory.
+        """
+        return memoryview(self.vertices).cast("B")
+
+    def indexBuffer(self, primitive=None):
+        """Return the raw bytes of the indices.
+
+        Args:
+            primitive (str): Only return the indices of this primitive. All of them by default.
+
+        Returns:
+            memoryview: A byte view of the index array, sharing its memory.
+        """
+        indices = self.indices
+        if primitive is not None:
+            start, count = self.ranges[primitive]
+            indices = indices[start:start + count]
+        return memoryview(indices).cast("B")
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2019 Giuliano França
+
+MIT License
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+====================================================================================================
+
+How to use:
+    * Call writePly, writeGlb or writeObj with an objects.mesh.Mesh.
+    * Binary formats write the interleaved vertex buffer of the mesh straight to the file.
+
+Dependencies:
+    * Python 3
+    * Numpy
+
+Todo:
+    * NDA
+
+Sources:
+    * http://paulbourke.net/dataformats/ply/
+    * https://registry.khronos.org/glTF/specs/2.0/glTF-2.0.html#glb-file-format-specification
+    * http://paulbourke.net/dataformats/obj/
+
+This code supports Pylint. Rc file in project.
+"""
+import json
+import struct
+import numpy as np
+
+
+kGltfModes = {"points": 0, "lines": 1, "triangles": 4}
+kGltfIndexTypes = {2: 5123, 4: 5125}
+kGltfAttributes = {"position": ("POSITION", "VEC3"), "normal": ("NORMAL", "VEC3"), "uv": ("TEXCOORD_0", "VEC2")}
+kPlyProperties = {"position": ("x", "y", "z"), "normal": ("nx", "ny", "nz"), "uv": ("s", "t")}
+kPlyIndexTypes = {2: "ushort", 4: "uint"}
+
+
+def writePly(path, meshData, primitive="triangles"):
+    """Write a mesh as a binary little endian PLY file.
+
+    The vertex element has the same layout of the interleaved vertices, so they are written
+    without a copy.
+
+    Args:
+        path (str): The output file path.
+        meshData (Mesh): The mesh to write.
+        primitive (str): Either "triangles" or "lines".
+    """
+    if primitive not in ("triangles", "lines"):
+        raise ValueError("Unsupported PLY primitive: %s" % primitive)
+    indices = meshData.elements[primitive]
+    indexSize = meshData.indices.itemsize
+    header = ["ply", "format binary_little_endian 1.0", "element vertex %d" % meshData.vertexCount]
+    header += ["property float %s" % name for attribute in meshData.attributes for name in kPlyProperties[attribute]]
+    if primitive == "triangles":
+        elements = np.empty(len(indices), dtype=[("count", "u1"), ("indices", "<u%d" % indexSize, 3)])
+        elements["count"] = 3
+        elements["indices"] = indices
+        elementBuffer = memoryview(elements).cast("B")
+        header += ["element face %d" % len(indices), "property list uchar %s vertex_indices" % kPlyIndexTypes[indexSize]]
+    else:
+        elementBuffer = meshData.indexBuffer(primitive)
+        header += ["element edge %d" % len(indices),
+                   "property %s vertex1" % kPlyIndexTypes[indexSize],
+                   "property %s vertex2" % kPlyIndexTypes[indexSize]]
+    header.append("end_header\n")
+
+    with open(path, "wb") as plyFile:
+        plyFile.write("\n".join(header).encode("ascii"))
+        plyFile.write(meshData.vertexBuffer())
+        plyFile.write(elementBuffer)
+
+
+def writeGlb(path, meshData, primitive="triangles"):
+    """Write a mesh as a binary glTF 2.0 file.
+
+    The interleaved vertices go in a single strided buffer view and the indices keep their
+    uint16 or uint32 type, so both are written without a copy.
+
+    Args:
+        path (str): The output file path.
+        meshData (Mesh): The mesh to write.
+        primitive (str): One of "points", "lines" or "triangles".
+    """
+    vertexBuffer = meshData.vertexBuffer()
+    blocks = [vertexBuffer]
+    bufferViews = [{"buffer": 0, "byteOffset": 0, "byteLength": vertexBuffer.nbytes, "byteStride": meshData.stride, "target": 34962}]
+    positions = meshData.positions
+    attributes = {}
+    accessors = []
+    for attribute in meshData.attributes:
+        name, accessorType = kGltfAttributes[attribute]
+        attributes[name] = len(accessors)
+        accessors.append({"bufferView": 0, "byteOffset": meshData.attributeOffset(attribute), "componentType": 5126,
+                          "count": meshData.vertexCount, "type": accessorType})
+    accessors[attributes["POSITION"]]["min"] = positions.min(axis=0).tolist() if len(positions) else [0.0] * 3
+    accessors[attributes["POSITION"]]["max"] = positions.max(axis=0).tolist() if len(positions) else [0.0] * 3
+
+    meshPrimitive = {"attributes": attributes, "mode": kGltfModes[primitive]}
+    if primitive in meshData.ranges:
+        indexBuffer = meshData.indexBuffer(primitive)
+        blocks.append(indexBuffer)
+        bufferViews.append({"buffer": 0, "byteOffset": vertexBuffer.nbytes, "byteLength": indexBuffer.nbytes, "target": 34963})
+        meshPrimitive["indices"] = len(accessors)
+        accessors.append({"bufferView": 1, "componentType": kGltfIndexTypes[meshData.indices.itemsize],
+                          "count": meshData.ranges[primitive][1], "type": "SCALAR"})
+    offset = sum(block.nbytes for block in blocks)
+
+    document = {"asset": {"version": "2.0", "generator": "OpenGL-Studies procedural objects"},
+                "scene": 0,
+                "scenes": [{"nodes": [0]}],
+                "nodes": [{"mesh": 0}],
+                "meshes": [{"primitives": [meshPrimitive]}],
+                "buffers": [{"byteLength": offset}],
+                "bufferViews": bufferViews,
+                "accessors": accessors}
+    jsonChunk = json.dumps(document, separators=(",", ":")).encode("utf-8")
+    jsonChunk += b" " * (-len(jsonChunk) % 4)
+    binPadding = -offset % 4
+
+    with open(path, "wb") as glbFile:
+        glbFile.write(struct.pack("<4sII", b"glTF", 2, 12 + 8 + len(jsonChunk) + 8 + offset + binPadding))
+        glbFile.write(struct.pack("<I4s", len(jsonChunk), b"JSON"))
+        glbFile.write(jsonChunk)
+        glbFile.write(struct.pack("<I4s", offset + binPadding, b"BIN\x00"))
+        for block in blocks:
+            glbFile.write(block)
+        glbFile.write(b"\x00" * binPadding)
+
+
+def writeObj(path, meshData, primitive="triangles"):
+    """Write a mesh as a Wavefront OBJ file.
+
+    OBJ is a text format, so each block is formatted with a single call over the whole array
+    instead of one call per vertex.
+
+    Args:
+        path (str): The output file path.
+        meshData (Mesh): The mesh to write.
+        primitive (str): One of "points", "lines" or "triangles".
+    """
+    positions = meshData.positions
+    normals = meshData.normals
+    if primitive in meshData.ranges:
+        elements = meshData.elements[primitive].astype(np.int64) + 1
+    else:
+        elements = np.arange(1, meshData.vertexCount + 1, dtype=np.int64).reshape(-1, 1)
+    size = elements.shape[1]
+    with open(path, "w") as objFile:
+        objFile.write(("v %.6g %.6g %.6g\n" * len(positions)) % tuple(positions.ravel().tolist()))
+        if normals is not None:
+            objFile.write(("vn %.6g %.6g %.6g\n" * len(normals)) % tuple(normals.ravel().tolist()))
+        if primitive == "triangles" and normals is not None:
+            face = "f" + " %d//%d" * size + "\n"
+            elements = np.repeat(elements, 2, axis=1)
+        else:
+            face = {"points": "p", "lines": "l", "triangles": "f"}[primitive] + " %d" * size + "\n"
+        objFile.write((face * len(elements)) % tuple(elements.ravel().tolist()))
+
+
+kWriters = {"ply": writePly,
+            "glb": writeGlb,
+            "obj": writeObj}
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2019 Giuliano França
+
+MIT License
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+====================================================================================================
+
+How to use:
+    * Call createPanel() with the name of a shape in objects.shapes.kShapes and the viewer.
+    * The panel loads ui/<name>proceduralwdg.ui, from its compiled module when up to date, and
+      connects every sld_<parameter> slider of the shape kSliders schema, so a new shape only
+      needs its geometry class and its .ui file.
+    * Shapes that need more than the sliders register a ShapePanel subclass with registerPanel.
+
+Dependencies:
+    * Python 3
+    * PySide2
+    * Numpy
+
+Todo:
+    * NDA
+
+Sources:
+    * NDA
+
+This code supports Pylint. Rc file in project.
+"""
+from PySide2 import QtCore
+
+from objects import shapes
+from objects import uicache
+
+
+kPanels = {}  # shape name: ShapePanel subclass, for the shapes with a specialized panel
+
+
+def registerPanel(name):
+    """Return a class decorator that makes a ShapePanel subclass the panel of a shape.
+
+    Args:
+        name (str): The lower case shape name, as in objects.shapes.kShapes.
+
+    Returns:
+        function: The decorator.
+    """
+    def decorator(panelType):
+        kPanels[name] = panelType
+        return panelType
+    return decorator
+
+
+def createPanel(name, glViewer, folder="ui"):
+    """Build the panel of a shape.
+
+    Args:
+        name (str): The shape name, in any case.
+        glViewer (OpenGLView): The viewer to update when a value changes.
+        folder (str): The folder with the .ui files.
+
+    Returns:
+        ShapePanel: The panel of the shape.
+    """
+    name = name.lower()
+    uiFile = "%s/%sproceduralwdg.ui" % (folder, name)
+    panelType = kPanels.get(name)
+    if panelType is not None:
+        return panelType(uiFile, glViewer)
+    return ShapePanel(uiFile, glViewer, shapes.kShapes[name])
+
+
+class ShapePanel(QtCore.QObject):
+    """Slider panel of a procedural shape, driven by the kSliders schema of its geometry.
+
+    Each slider holds an integer, the parameter value is the slider value times the scale of the
+    schema.
+    """
+
+    def __init__(self, file, glViewer, shapeType, parent=None):
+        super(ShapePanel, self).__init__(parent)
+        self.widget = uicache.loadUi(file)
+        self.glViewer = glViewer
+
+        self.geometry = shapeType()
+
+        self.restoreDefaults()
+        self.configureWidgets()
+
+    def slider(self, name):
+        """Return the slider of a parameter.
+
+        Args:
+            name (str): The parameter name.
+
+        Returns:
+            QSlider: The sld_<name> widget.
+        """
+        return getattr(self.widget, "sld_" + name)
+
+    def configureWidgets(self):
+        """Configure all widgets."""
+        for name in self.geometry.kSliders:
+            self.slider(name).sliderMoved.connect(self.updateAllValues)
+
+    def updateAllValues(self):
+        """Update all values from the sliders to the instance."""
+        # Rounded so a slider value always gives the same parameter, e.g. 0.3 and not 0.30000000000000004.
+        changed = [self.geometry.set(name, round(self.slider(name).value() * scale, 6))
+                   for name, (_, _, scale) in self.geometry.kSliders.items()]
+        if any(changed) and self.glViewer is not None:
+            self.glViewer.update()
+
+    def restoreDefaults(self):
+        """Restores widgets to default value."""
+        for name, default in self.geometry.kParameters:
+            self.slider(name).setValue(int(round(default / self.geometry.kSliders[name][2])))
+        self.updateAllValues()
+
+    @property
+    def parameters(self):
+        """Return all the values that define the shape geometry.
+
+        Returns:
+            tuple: The parameter values of the shape.
+        """
+        return self.geometry.parameters
+
+    @property
+    def topologyParameters(self):
+        """Return the values that change the shape vertex count or connectivity.
+
+        Returns:
+            tuple: The topology parameter values of the shape.
+        """
+        return self.geometry.topologyParameters
+
+    def mesh(self):
+        """Return the shape geometry.
+
+        Returns:
+            tuple: The vertex positions and a dict with the index arrays of each primitive.
+        """
+        return self.geometry.mesh()
@@ -0,0 +1,619 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2019 Giuliano França
+
+MIT License
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+====================================================================================================
+
+How to use:
+    * Create a shape with its parameters, e.g. TorusGeometry(radius=2.0, subdAxis=32), or look its
+      class up by name in kShapes.
+    * Change parameters with set() and call mesh() to get the up to date arrays, or toMesh() to
+      get them packed in a Mesh.
+    * Only numpy is imported, so this module is safe to use in worker processes.
+    * New shapes subclass ShapeGeometry and are added to kShapes with the register decorator.
+    * Parameters that only deform the scaled shape are bound to the deformers of kDeformers, see
+      objects.deformers.
+
+Dependencies:
+    * Python 3
+    * Numpy
+
+Todo:
+    * NDA
+
+Sources:
+    * NDA
+
+This code supports Pylint. Rc file in project.
+"""
+import numpy as np
+
+from objects import cache
+from objects import deformers
+from objects import geometry
+from objects import mesh
+
+
+kShapes = {}
+
+
+def register(shapeType):
+    """Class decorator that adds a shape to kShapes under its lower case name.
+
+    Args:
+        shapeType (type): The ShapeGeometry subclass.
+
+    Returns:
+        type: The same class.
+    """
+    kShapes[shapeType.kName.lower()] = shapeType
+    return shapeType
+
+
+class ShapeGeometry(object):
+    """Base class of the procedural shapes.
+
+    Subclasses declare their parameters as slots and implement buildFrame() and scale(). The frame
+    holds everything that only depends on the topology parameters and is shared through the
+    geometry cache; scale() writes the base positions in place when any other parameter changes.
+
+    The deformers of kDeformers then run in order on a copy of the base positions. When only their
+    parameters changed, the base is reused and the copy is deformed again in the same buffer. Their
+    work buffers come from scratch() and are kept until the topology changes.
+    """
+    __slots__ = ("_dirty", "_frame", "_base", "_positions", "_normals", "_deformed", "_deformedNormals", "_normalBuffer", "_scratch")
+    kName = ""
+    kVersion = 1  # Bump when the generated geometry changes, so cached meshes on disk are not reused.
+    kParameters = ()  # (name, default value)
+    kSliders = {}  # name: (minimum, maximum, scale) of the integer slider that edits the parameter
+    kTopologyParameters = ()
+    kLodParameters = ()  # Subdivisions a level of detail may reduce.
+    kLodMinimum = 1
+    kDeformers = ()  # Deformer instances applied after scale(), each bound to one of the kParameters.
+
+    def __init__(self, **values):
+        self._dirty = set()
+        self._frame = None
+        self._base = None
+        self._positions = None
+        self._normals = None
+        self._deformed = ()
+        self._deformedNormals = None
+        self._normalBuffer = None
+        self._scratch = {}
+        for name, default in self.kParameters:
+            setattr(self, name, type(default)(values.pop(name, default)))
+        if values:
+            raise TypeError("Unknown %s parameters: %s" % (self.kName, ", ".join(sorted(values))))
+
+    def __repr__(self):
+        values = ", ".join("%s=%r" % (name, getattr(self, name)) for name, _ in self.kParameters)
+        return "%s(%s)" % (type(self).__name__, values)
+
+    def set(self, name, value):
+        """Set a parameter and flag it as dirty if the value changed.
+
+        Args:
+            name (str): The parameter name.
+            value (int or float): The new value.
+
+        Returns:
+            bool: True if the value changed.
+        """
+        value = type(getattr(self, name))(value)
+        if getattr(self, name) == value:
+            return False
+        setattr(self, name, value)
+        self._dirty.add(name)
+        return True
+
+    def scratch(self, key, shape, dtype=np.float32, initialize=None):
+        """Return a work buffer of the deformers, allocated once per topology.
+
+        Args:
+            key (hashable): The name of the buffer, prefixed by the parameter of the deformer.
+            shape (tuple): The shape of the buffer.
+            dtype (numpy.dtype): The type of its elements.
+            initialize (callable): Fills a new buffer given as argument, for the data that only
+                depends on the topology.
+
+        Returns:
+            numpy.ndarray: The same buffer on every call until the topology changes.
+        """
+        buffer = self._scratch.get(key)
+        if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+            buffer = self._scratch[key] = np.empty(shape, dtype)
+            if initialize is not None:
+                initialize(buffer)
+        return buffer
+
+    @property
+    def parameters(self):
+        """Return all the values that define the shape.
+
+        Returns:
+            tuple: The parameter values in declaration order.
+        """
+        return tuple(getattr(self, name) for name, _ in self.kParameters)
+
+    @property
+    def topologyParameters(self):
+        """Return the values that change the vertex count or connectivity.
+
+        Returns:
+            tuple: The topology parameter values.
+        """
+        return tuple(getattr(self, name) for name in self.kTopologyParameters)
+
+    @property
+    def boundingRadius(self):
+        """Return the radius of a sphere around the origin that contains the shape.
+
+        Returns:
+            float: The bounding radius.
+        """
+        raise NotImplementedError
+
+    @property
+    def triangleCount(self):
+        """Return the number of triangles of the mesh without generating it.
+
+        Returns:
+            int: The triangle count.
+        """
+        raise NotImplementedError
+
+    @property
+    def normals(self):
+        """Return the vertex normals of the shape.
+
+        Frames with closed form normals give them directly, and so do shapes whose scale() stores
+        them in _normals. Other shapes get area weighted normals computed from their triangles,
+        once per change of the positions. The same goes for deformed shapes, unless all the active
+        deformers can rotate the closed form normals.
+
+        Returns:
+            numpy.ndarray: The float32 normals or None if the shape has no triangles.
+        """
+        positions, elements = self.mesh()
+        if self._deformed:
+            if self._deformedNormals is None:
+                self._deformedNormals = self._deformNormals(positions, elements)
+            return self._deformedNormals
+        normals = self._frame.get("normals")
+        if normals is None and "triangles" in elements:
+            if self._normals is None:
+                self._normals = geometry.smoothNormals(positions, elements["triangles"])
+            normals = self._normals
+        return normals
+
+    def mesh(self):
+        """Return the shape geometry, rebuilding only what changed since the last call.
+
+        Topology changes fetch a new frame from the shared cache, generating it on a miss.
+        Any other change only rewrites the positions in place, and a change of the deformer
+        parameters only deforms the base positions again.
+
+        Returns:
+            tuple: The vertex positions and a dict with the index arrays of each primitive.
+        """
+        if self._frame is None or not self._dirty.isdisjoint(self.kTopologyParameters):
+            self._frame = cache.sharedCache.fetch((self.kName,) + self.topologyParameters, self._buildFrameWithEdges)
+            self._base = np.empty_like(self._frame["positions"])
+            self._positions = np.empty_like(self._base) if self.kDeformers else self._base
+            self._normalBuffer = None
+            self._scratch = {}
+            self._dirty.add(None)
+        if self._dirty:
+            if not self._dirty.issubset(deformer.parameter for deformer in self.kDeformers):
+                self._normals = None
+                self.scale(self._frame, self._base)
+            self._deform()
+            self._dirty.clear()
+        return self._positions, self._frame["elements"]
+
+    def _deform(self):
+        """Copy the base positions and run the active deformers on the copy."""
+        self._deformed = tuple(deformer for deformer in self.kDeformers if deformer.amount(self))
+        self._deformedNormals = None
+        if self._positions is self._base:
+            return
+        np.copyto(self._positions, self._base)
+        for deformer in self._deformed:
+            deformer.deform(self, self._frame, self._positions)
+
+    def _deformNormals(self, positions, elements):
+        """Return the normals of the deformed positions.
+
+        Returns:
+            numpy.ndarray: The closed form normals rotated by the deformers when they all can,
+                otherwise the area weighted normals of the triangles, or None without triangles.
+        """
+        normals = self._frame.get("normals") if self._normals is None else self._normals
+        if normals is not None and all(deformer.kExactNormals for deformer in self._deformed):
+            if self._normalBuffer is None:
+                self._normalBuffer = np.empty_like(normals)
+            np.copyto(self._normalBuffer, normals)
+            for deformer in self._deformed:
+                deformer.deformNormals(self, self._frame, self._normalBuffer)
+            return self._normalBuffer
+        if "triangles" in elements:
+            return geometry.smoothNormals(positions, elements["triangles"])
+        return None
+
+    def toMesh(self, normals=False):
+        """Pack the current geometry in a Mesh.
+
+        Args:
+            normals (bool): Also pack the vertex normals, when the shape has them.
+
+        Returns:
+            Mesh: The interleaved vertices and the packed indices of the shape.
+        """
+        positions, elements = self.mesh()
+        return mesh.Mesh(positions, elements, self.normals if normals else None)
+
+    def _buildFrameWithEdges(self):
+        """Build the frame and add the wireframe edges of its faces when it has none.
+
+        The edges are cached with the frame, so all render modes draw from the same buffers.
+
+        Returns:
+            dict: The frame returned by buildFrame(), with a "lines" index array and without "quads".
+        """
+        frame = self.buildFrame()
+        elements = frame["elements"]
+        quads = frame.pop("quads", None)
+        faces = quads if quads is not None else elements.get("triangles")
+        if "lines" not in elements and faces is not None:
+            elements["lines"] = geometry.uniqueEdges(faces, len(frame["positions"]))
+        return frame
+
+    def buildFrame(self):
+        """Generate the part of the shape that only depends on the topology parameters.
+
+        Frames without "lines" get the unique edges of their "quads", or else of their triangles.
+
+        Returns:
+            dict: At least the unit "positions" and the "elements" index arrays, optionally the
+                "quads" of the surface.
+        """
+        raise NotImplementedError
+
+    def scale(self, frame, out):
+        """Write the vertex positions before the deformers.
+
+        Shapes with closed form normals that change with the positions may set _normals here.
+
+        Args:
+            frame (dict): The frame returned by buildFrame().
+            out (numpy.ndarray): The float32 array that receives the positions.
+        """
+        raise NotImplementedError
+
+
+@register
+class CubeGeometry(ShapeGeometry):
+    """Pure geometry of the procedural cube."""
+    __slots__ = ("width", "height", "depth", "subdWidth", "subdHeight", "subdDepth")
+    kName = "Cube"
+    kParameters = (("width", 1.0),
+                   ("height", 1.0),
+                   ("depth", 1.0),
+                   ("subdWidth", 1),
+                   ("subdHeight", 1),
+                   ("subdDepth", 1))
+    kSliders = {"width": (1, 50, 0.1),
+                "height": (1, 50, 0.1),
+                "depth": (1, 50, 0.1),
+                "subdWidth": (1, 20, 1),
+                "subdHeight": (1, 20, 1),
+                "subdDepth": (1, 20, 1)}
+    kVersion = 2
+    kTopologyParameters = ("subdWidth", "subdHeight", "subdDepth")
+    kLodParameters = kTopologyParameters
+
+    @property
+    def boundingRadius(self):
+        """Return the distance from the center to the cube corners.
+
+        Returns:
+            float: The bounding radius.
+        """
+        return float(np.sqrt(self.width ** 2 + self.height ** 2 + self.depth ** 2))
+
+    @property
+    def triangleCount(self):
+        """Return the number of triangles of the six subdivided faces.
+
+        Returns:
+            int: The triangle count.
+        """
+        return 4 * (self.subdWidth * self.subdHeight + self.subdHeight * self.subdDepth + self.subdDepth * self.subdWidth)
+
+    def buildFrame(self):
+        """Generate the unit subdivided cube.
+
+        Returns:
+            dict: The unit positions, their closed form normals, the quads and the triangle indices.
+        """
+        box = geometry.box(self.subdWidth, self.subdHeight, self.subdDepth)
+        return {"positions": box["positions"],
+                "normals": geometry.boxNormals(box["positions"]),
+                "quads": box["quads"],
+                "elements": {"triangles": box["triangles"]}}
+
+    def scale(self, frame, out):
+        """Scale the unit cube by its size.
+
+        Args:
+            frame (dict): The frame returned by buildFrame().
+            out (numpy.ndarray): The float32 array that receives the positions.
+        """
+        size = np.array([self.width, self.height, self.depth], dtype=np.float32)
+        np.multiply(frame["positions"], size, out=out)
+
+
+@register
+class TorusGeometry(ShapeGeometry):
+    """Pure geometry of the procedural torus."""
+    __slots__ = ("radius", "secRadius", "twist", "taper", "bend", "noise", "subdAxis", "subdHeight")
+    kName = "Torus"
+    kParameters = (("radius", 1.0),
+                   ("secRadius", 0.5),
+                   ("twist", 0.0),
+                   ("taper", 0.0),
+                   ("bend", 0.0),
+                   ("noise", 0.0),
+                   ("subdAxis", 10),
+                   ("subdHeight", 10))
+    kSliders = {"radius": (1, 50, 0.1),
+                "secRadius": (1, 50, 0.1),
+                "twist": (-720, 720, 1),
+                "taper": (-100, 100, 0.01),
+                "bend": (-360, 360, 1),
+                "noise": (0, 100, 0.002),
+                "subdAxis": (3, 20, 1),
+                "subdHeight": (3, 20, 1)}
+    kVersion = 3
+    kTopologyParameters = ("subdAxis", "subdHeight")
+    kDeformers = (deformers.RingTwist("twist", "radius"),
+                  deformers.Taper("taper"),
+                  deformers.Bend("bend"),
+                  deformers.Noise("noise"))
+    kLodParameters = ("subdAxis", "subdHeight")
+    kLodMinimum = 3
+
+    @property
+    def boundingRadius(self):
+        """Return the distance from the center to the outer side of the torus.
+
+        Returns:
+            float: The bounding radius.
+        """
+        return self.radius + self.secRadius
+
+    @property
+    def triangleCount(self):
+        """Return the number of triangles of the torus grid.
+
+        Returns:
+            int: The triangle count.
+        """
+        return 2 * self.subdAxis * self.subdHeight
+
+    def buildFrame(self):
+        """Generate the torus frame that does not depend on the radius nor on the twist.
+
+        Returns:
+            dict: The unit pivot directions grouped by ring, the ring count for the twist, the
+                normals and the index arrays of each primitive.
+        """
+        pivots, normals = geometry.torusFrame(self.subdAxis, self.subdHeight)
+        # The grid knows its edges, so they skip the sort of the generic extraction.
+        elements = {"lines": geometry.torusLineIndices(self.subdAxis, self.subdHeight),
+                    "triangles": geometry.torusIndices(self.subdAxis, self.subdHeight)}
+        return {"positions": pivots, "normals": normals, "rings": self.subdAxis, "elements": elements}
+
+    def scale(self, frame, out):
+        """Place the untwisted torus points using the radius and section radius.
+
+        Args:
+            frame (dict): The frame returned by buildFrame().
+            out (numpy.ndarray): The float32 array that receives the positions.
+        """
+        geometry.torusPositions(frame["positions"], frame["normals"], self.radius, self.secRadius, out=out)
+
+
+@register
+class SphereGeometry(ShapeGeometry):
+    """Pure geometry of the procedural UV sphere."""
+    __slots__ = ("radius", "subdAxis", "subdHeight")
+    kName = "Sphere"
+    kParameters = (("radius", 1.0),
+                   ("subdAxis", 16),
+                   ("subdHeight", 12))
+    kSliders = {"radius": (1, 50, 0.1),
+                "subdAxis": (3, 512, 1),
+                "subdHeight": (2, 256, 1)}
+    kTopologyParameters = ("subdAxis", "subdHeight")
+    kLodParameters = kTopologyParameters
+    kLodMinimum = 3
+
+    @property
+    def boundingRadius(self):
+        """Return the radius of the sphere.
+
+        Returns:
+            float: The bounding radius.
+        """
+        return self.radius
+
+    @property
+    def triangleCount(self):
+        """Return the number of triangles of the pole fans and the ring quads.
+
+        Returns:
+            int: The triangle count.
+        """
+        return 2 * self.subdAxis * (self.subdHeight - 1)
+
+    def buildFrame(self):
+        """Generate the unit sphere, whose positions are also its normals.
+
+        Returns:
+            dict: The unit positions, the normals and the index arrays of each primitive.
+        """
+        unitSphere = geometry.sphere(self.subdAxis, self.subdHeight)
+        return {"positions": unitSphere["positions"],
+                "normals": unitSphere["positions"],
+                "elements": {"lines": unitSphere["lines"], "triangles": unitSphere["triangles"]}}
+
+    def scale(self, frame, out):
+        """Scale the unit sphere by its radius.
+
+        Args:
+            frame (dict): The frame returned by buildFrame().
+            out (numpy.ndarray): The float32 array that receives the positions.
+        """
+        np.multiply(frame["positions"], np.float32(self.radius), out=out)
+
+
+@register
+class GearGeometry(ShapeGeometry):
+    """Pure geometry of the procedural gear."""
+    __slots__ = ("radius", "innerRadius", "toothDepth", "thickness", "teeth")
+    kName = "Gear"
+    kParameters = (("radius", 1.0),
+                   ("innerRadius", 0.3),
+                   ("toothDepth", 0.2),
+                   ("thickness", 0.3),
+                   ("teeth", 12))
+    kSliders = {"radius": (1, 50, 0.1),
+                "innerRadius": (1, 50, 0.05),
+                "toothDepth": (0, 50, 0.01),
+                "thickness": (1, 50, 0.02),
+                "teeth": (3, 200, 1)}
+    kTopologyParameters = ("teeth",)
+
+    @property
+    def boundingRadius(self):
+        """Return the distance from the center to the tip corners.
+
+        Returns:
+            float: The bounding radius.
+        """
+        return float(np.hypot(self.radius, self.thickness * 0.5))
+
+    @property
+    def triangleCount(self):
+        """Return the number of triangles of the two faces and the two walls.
+
+        Returns:
+            int: The triangle count.
+        """
+        return 8 * len(geometry.kGearTooth) * self.teeth
+
+    def buildFrame(self):
+        """Generate the gear frame that does not depend on the radii and the thickness.
+
+        Returns:
+            dict: The unit directions with the circle and side of each vertex, the quads and the
+                triangle indices.
+        """
+        frame = geometry.gearFrame(self.teeth)
+        quads = frame["quads"]
+        frame["positions"] = frame.pop("directions")
+        frame["elements"] = {"triangles": np.ascontiguousarray(quads[:, [0, 1, 2, 0, 2, 3]].reshape(-1, 3))}
+        return frame
+
+    def scale(self, frame, out):
+        """Place the gear points on their circles and extrude them.
+
+        Args:
+            frame (dict): The frame returned by buildFrame().
+            out (numpy.ndarray): The float32 array that receives the positions.
+        """
+        geometry.gearPositions(frame["positions"], frame["radial"], frame["side"],
+                               self.radius, self.innerRadius, self.toothDepth, self.thickness, out=out)
+
+
+@register
+class SpiralGeometry(ShapeGeometry):
+    """Pure geometry of the procedural spiral, a tube swept along a helix."""
+    __slots__ = ("radius", "secRadius", "height", "turns", "subdAxis", "subdHeight")
+    kName = "Spiral"
+    kParameters = (("radius", 1.0),
+                   ("secRadius", 0.2),
+                   ("height", 2.0),
+                   ("turns", 3.0),
+                   ("subdAxis", 96),
+                   ("subdHeight", 12))
+    kSliders = {"radius": (1, 50, 0.1),
+                "secRadius": (1, 50, 0.02),
+                "height": (0, 100, 0.05),
+                "turns": (1, 40, 0.25),
+                "subdAxis": (8, 2048, 1),
+                "subdHeight": (3, 64, 1)}
+    kTopologyParameters = ("subdAxis", "subdHeight")
+    kLodParameters = kTopologyParameters
+    kLodMinimum = 3
+
+    @property
+    def boundingRadius(self):
+        """Return the distance from the center to the outer side of the tube ends.
+
+        Returns:
+            float: The bounding radius.
+        """
+        return float(np.hypot(self.radius + self.secRadius, self.height * 0.5 + self.secRadius))
+
+    @property
+    def triangleCount(self):
+        """Return the number of triangles of the tube grid.
+
+        Returns:
+            int: The triangle count.
+        """
+        return 2 * self.subdAxis * self.subdHeight
+
+    def buildFrame(self):
+        """Generate the tube connectivity. The helix itself depends on every parameter.
+
+        Returns:
+            dict: The position array layout, the quads and the triangle indices.
+        """
+        frame = geometry.spiralFrame(self.subdAxis, self.subdHeight)
+        frame["positions"] = np.zeros(((self.subdAxis + 1) * self.subdHeight, 3), dtype=np.float32)
+        frame["elements"] = {"triangles": frame.pop("triangles")}
+        return frame
+
+    def scale(self, frame, out):
+        """Sweep the section along the helix, keeping the closed form normals.
+
+        Args:
+            frame (dict): The frame returned by buildFrame().
+            out (numpy.ndarray): The float32 array that receives the positions.
+        """
+        _, self._normals = geometry.spiralGrid(self.subdAxis, self.subdHeight, self.radius, self.secRadius,
+                                               self.height, self.turns, out=out)
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2019 Giuliano França
+
+MIT License
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+====================================================================================================
+
+How to use:
+    * Create one SharedMeshPool in the viewer process, before starting the worker processes.
+    * acquire() a block for each job and send its name to the worker, which builds the mesh
+      straight in the block with writeMesh() and returns the layout.
+    * Map the result with meshOf() and release() the block once the mesh is not used anymore.
+      Released blocks are handed to the next jobs instead of being unlinked.
+
+Dependencies:
+    * Python 3.8
+    * Numpy
+
+Todo:
+    * NDA
+
+Sources:
+    * https://docs.python.org/3/library/multiprocessing.shared_memory.html
+
+This code supports Pylint. Rc file in project.
+"""
+import threading
+import contextlib
+from multiprocessing import resource_tracker
+from multiprocessing import shared_memory
+
+from objects import mesh
+
+
+kMinimumBlockBytes = 64 * 1024
+
+
+def blockSize(nbytes):
+    """Round a size up to the size class of the pool blocks.
+
+    Args:
+        nbytes (int): The number of bytes needed.
+
+    Returns:
+        int: The next power of two, at least kMinimumBlockBytes.
+    """
+    size = kMinimumBlockBytes
+    while size < nbytes:
+        size <<= 1
+    return size
+
+
+def writeMesh(name, positions, elements, normals=None):
+    """Build a mesh straight in a shared memory block. Runs in the worker processes.
+
+    Args:
+        name (str): The name of a block acquired from the pool.
+        positions (numpy.ndarray): The vertex positions with shape (N, 3).
+        elements (dict): The index arrays of the mesh keyed by primitive name.
+        normals (numpy.ndarray): Optional vertex normals with shape (N, 3).
+
+    Returns:
+        dict: The layout of the mesh, to map it with SharedMeshPool.meshOf().
+    """
+    with openBlock(name) as buffer:
+        return mesh.Mesh(positions, elements, normals, buffer=buffer).layout()
+
+
+@contextlib.contextmanager
+def openBlock(name):
+    """Attach to a block for the duration of the context. Runs in the worker processes.
+
+    Arrays made from the buffer must be dropped before the context ends.
+
+    Args:
+        name (str): The name of a block acquired from the pool.
+    """
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        yield block.buf
+    finally:
+        block.close()
+
+
+class SharedMeshPool(object):
+    """Shared memory blocks that receive the meshes generated in worker processes.
+
+    The pool creates every block and keeps it mapped, so the viewer reads the meshes without
+    attaching again. A block belongs to one job at a time. Released blocks are reused by the next
+    job that fits, and free blocks above maxFreeBytes are unlinked, largest first.
+    """
+
+    def __init__(self, maxFreeBytes=256 * 1024 * 1024):
+        # Started before the workers, so they share it and do not unlink the blocks when they exit.
+        resource_tracker.ensure_running()
+        self.maxFreeBytes = maxFreeBytes
+        self.created = 0
+        self.reused = 0
+        self._blocks = {}
+        self._free = []
+        self._lingering = []
+        self._lock = threading.Lock()
+
+    def acquire(self, nbytes):
+        """Return a block that holds at least nbytes, reusing a free one when possible.
+
+        Args:
+            nbytes (int): The number of bytes needed.
+
+        Returns:
+            tuple: The block name and its size in bytes.
+        """
+        with self._lock:
+            fitting = [name for name in self._free if self._blocks[name].size >= nbytes]
+            if fitting:
+                name = min(fitting, key=lambda name: self._blocks[name].size)
+                self._free.remove(name)
+                self.reused += 1
+            else:
+                block = shared_memory.SharedMemory(create=True, size=blockSize(nbytes))
+                name = block.name
+                self._blocks[name] = block
+                self.created += 1
+            return name, self._blocks[name].size
+
+    def release(self, name):
+        """Give a block back to the pool. Its memory must not be read after this call.
+
+        Args:
+            name (str): The name returned by acquire().
+        """
+        with self._lock:
+            if name not in self._blocks or name in self._free:
+                return
+            self._free.append(name)
+            freeBytes = sum(self._blocks[free].size for free in self._free)
+            while freeBytes > self.maxFreeBytes:
+                largest = max(self._free, key=lambda free: self._blocks[free].size)
+                self._free.remove(largest)
+                freeBytes -= self._blocks[largest].size
+                self._destroy(self._blocks.pop(largest))
+
+    def meshOf(self, name, layout):
+        """Map the mesh written in a block by writeMesh(), without copying it.
+
+        Args:
+            name (str): The block name.
+            layout (dict): The layout returned by writeMesh().
+
+        Returns:
+            Mesh: A mesh whose arrays are views of the block.
+        """
+        return mesh.Mesh.fromBuffer(self._blocks[name].buf, layout)
+
+    def _destroy(self, block):
+        """Unlink a block and unmap it, or keep it mapped while a mesh still reads it."""
+        block.unlink()
+        try:
+            block.close()
+        except BufferError:
+            self._lingering.append(block)
+
+    def stats(self):
+        """Return the state of the pool.
+
+        Returns:
+            dict: The block count, the free block count, the mapped bytes and the number of
+                created and reused blocks.
+        """
+        with self._lock:
+            return {"blocks": len(self._blocks),
+                    "free": len(self._free),
+                    "bytes": sum(block.size for block in self._blocks.values()),
+                    "created": self.created,
+                    "reused": self.reused}
+
+    def close(self):
+        """Unlink every block. Meshes mapped from the pool must not be read after this call."""
+        with self._lock:
+            for block in self._blocks.values():
+                self._destroy(block)
+            self._blocks = {}
+            self._free = []
+            lingering, self._lingering = self._lingering, []
+            for block in lingering:
+                try:
+                    block.close()
+                except BufferError:
+                    self._lingering.append(block)
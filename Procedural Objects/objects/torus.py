@@ -44,65 +44,16 @@ Sources:
 
 This code supports Pylint. Rc file in project.
 """
-import math
-import collections
-import numpy as np
-import OpenGL.GL as gl
-from PySide2 import QtCore
-from PySide2 import QtUiTools
+from objects import panel
+from objects import shapes
 
 
-class ProceduralTorus(QtCore.QObject):
+@panel.registerPanel("torus")
+class ProceduralTorus(panel.ShapePanel):
     """Class of the torus parameters."""
 
     def __init__(self, file, glViewer, parent=None):
-        super(ProceduralTorus, self).__init__(parent)
-        loader = QtUiTools.QUiLoader()
-        torusUIFile = QtCore.QFile(file)
-        torusUIFile.open(QtCore.QFile.ReadOnly)
-        self.widget = loader.load(torusUIFile)
-        self.glViewer = glViewer
-        torusUIFile.close()
-
-        self._radius = 10
-        self._secRadius = 5
-        self._twist = 0
-        self._subdAxis = 10
-        self._subdHeight = 10
-
-        self.restoreDefaults()
-        self.configureWidgets()
-
-    def configureWidgets(self):
-        """Configure all widgets."""
-        self.widget.sld_radius.sliderMoved.connect(self.updateAllValues)
-        self.widget.sld_secRadius.sliderMoved.connect(self.updateAllValues)
-        self.widget.sld_twist.sliderMoved.connect(self.updateAllValues)
-        self.widget.sld_subdAxis.sliderMoved.connect(self.updateAllValues)
-        self.widget.sld_subdHeight.sliderMoved.connect(self.updateAllValues)
-
-    def updateAllValues(self):
-        """Update all values from the sliders to the instance."""
-        radiusVal = self.widget.sld_radius.value()
-        secRadiusVal = self.widget.sld_secRadius.value()
-        twistVal = self.widget.sld_twist.value()
-        subdAxisVal = self.widget.sld_subdAxis.value()
-        subdHeightVal = self.widget.sld_subdHeight.value()
-        self._radius = radiusVal
-        self._secRadius = secRadiusVal
-        self._twist = twistVal
-        self._subdAxis = subdAxisVal
-        self._subdHeight = subdHeightVal
-        self.glViewer.update()
-
-    def restoreDefaults(self):
-        """Restores widgets to default value."""
-        self.widget.sld_radius.setValue(10)
-        self.widget.sld_secRadius.setValue(5)
-        self.widget.sld_twist.setValue(0)
-        self.widget.sld_subdAxis.setValue(10)
-        self.widget.sld_subdHeight.setValue(10)
-        self.updateAllValues()
+        super(ProceduralTorus, self).__init__(file, glViewer, shapes.TorusGeometry, parent)
 
     @property
     def torusRadius(self):
@@ -111,7 +62,7 @@ class ProceduralTorus(QtCore.QObject):
         Returns:
             float: The radius value of the torus.
         """
-        return self._radius * 0.1
+        return self.geometry.radius
 
     @property
     def torusSecRadius(self):
@@ -120,16 +71,43 @@ class ProceduralTorus(QtCore.QObject):
         Returns:
             float: The section radius value of the torus.
         """
-        return self._secRadius * 0.1
+        return self.geometry.secRadius
 
     @property
     def torusTwist(self):
         """Return the twist of the torus.
 
         Returns:
-            int: The twist value of the torus.
+            float: The twist value of the torus.
         """
-        return self._twist
+        return self.geometry.twist
+
+    @property
+    def torusTaper(self):
+        """Return the taper of the torus.
+
+        Returns:
+            float: The taper value of the torus.
+        """
+        return self.geometry.taper
+
+    @property
+    def torusBend(self):
+        """Return the bend of the torus.
+
+        Returns:
+            float: The bend angle of the torus.
+        """
+        return self.geometry.bend
+
+    @property
+    def torusNoise(self):
+        """Return the noise of the torus.
+
+        Returns:
+            float: The noise amplitude of the torus.
+        """
+        return self.geometry.noise
 
     @property
     def torusSubdAxis(self):
@@ -138,7 +116,7 @@ class ProceduralTorus(QtCore.QObject):
         Returns:
             int: The subdivisions axis value of the torus.
         """
-        return self._subdAxis
+        return self.geometry.subdAxis
 
     @property
     def torusSubdHeight(self):
@@ -147,31 +125,4 @@ class ProceduralTorus(QtCore.QObject):
         Returns:
             int: The subdivisions height value of the torus.
         """
-        return self._subdHeight
-
-    def draw(self):
-        """Draw a torus using OpenGL functions."""
-        # pylint: disable=unused-variable
-        subdAxis = self.torusSubdAxis
-        subdHeight = self.torusSubdHeight
-        radius = self.torusRadius
-        secRadius = self.torusSecRadius
-        twist = self.torusTwist
-
-        step = 2.0 * math.pi / subdAxis
-        stepSec = 2.0 * math.pi / subdHeight
-        loops = collections.OrderedDict()
-        gl.glColor3f(1.0, 0.0, 0.0)
-        gl.glPointSize(6.0)
-        gl.glBegin(gl.GL_POINTS)
-        for i in range(subdAxis):
-            alpha = step * i + (math.pi / 2.0)
-            mOrigin = np.identity(4)
-            mOrigin[0][0] = math.cos(-alpha)
-            mOrigin[0][2] = -math.sin(-alpha)
-            mOrigin[2][0] = math.sin(-alpha)
-            mOrigin[2][2] = math.cos(-alpha)
-            mOrigin[3][0] = math.cos(step * i) * radius
-            mOrigin[3][2] = math.sin(step * i) * radius
-            gl.glVertex3f(mOrigin[3][0], mOrigin[3][1], mOrigin[3][2])
-        gl.glEnd()
+        return self.geometry.subdHeight
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2019 Giuliano França
+
+MIT License
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+====================================================================================================
+
+How to use:
+    * Call loadUi() instead of QUiLoader to get the widget of a .ui file.
+    * Run python -m objects.uicache to compile the files of the ui folder ahead of time, or let
+      loadUi() refresh the compiled module of a missing or stale file in the background.
+
+Dependencies:
+    * Python 3
+    * PySide2 (pyside2-uic to compile the .ui files)
+
+Todo:
+    * NDA
+
+Sources:
+    * https://doc.qt.io/qtforpython-5/tutorials/basictutorial/uifiles.html
+
+This code supports Pylint. Rc file in project.
+"""
+import os
+import sys
+import shutil
+import tempfile
+import threading
+import subprocess
+import importlib.util
+import xml.etree.ElementTree
+
+import PySide2
+from PySide2 import QtWidgets
+
+
+kCacheFolder = "__uicache__"
+kCompiler = "pyside2-uic"
+_modules = {}  # compiled module path: (source stamp, module)
+
+
+def compiledPath(uiPath):
+    """Return the path of the module compiled from a .ui file.
+
+    Args:
+        uiPath (str): The .ui file path.
+
+    Returns:
+        str: The .py path in the cache folder next to the .ui file.
+    """
+    folder, name = os.path.split(uiPath)
+    return os.path.join(folder, kCacheFolder, "%s_ui.py" % os.path.splitext(name)[0])
+
+
+def sourceStamp(uiPath):
+    """Return what identifies the version of a .ui file and of the compiler.
+
+    Args:
+        uiPath (str): The .ui file path.
+
+    Returns:
+        list: The size and modification time of the file and the PySide2 version.
+    """
+    status = os.stat(uiPath)
+    return [status.st_size, status.st_mtime_ns, PySide2.__version__]
+
+
+def compileUi(uiPath):
+    """Compile a .ui file into a Python module in the cache folder.
+
+    The module is written to a temporary file and moved in place, so a concurrent loadUi() never
+    reads it half written.
+
+    Args:
+        uiPath (str): The .ui file path.
+
+    Returns:
+        bool: True if the module was written, False if the compiler is missing or failed.
+    """
+    compiler = shutil.which(kCompiler)
+    if compiler is None:
+        return False
+    stamp = sourceStamp(uiPath)
+    root = xml.etree.ElementTree.parse(uiPath).getroot().find("widget")
+    path = compiledPath(uiPath)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    handle, temporaryPath = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(path))
+    os.close(handle)
+    try:
+        result = subprocess.run([compiler, uiPath, "-o", temporaryPath], stdout=subprocess.DEVNULL,
+                                stderr=subprocess.DEVNULL, check=False)
+        if result.returncode != 0 or not os.path.getsize(temporaryPath):
+            return False
+        with open(temporaryPath, "a") as moduleFile:
+            moduleFile.write("\n\nkSourceStamp = %r\n" % stamp)
+            moduleFile.write("kBaseClass = %r\n" % root.get("class"))
+            moduleFile.write("kFormClass = Ui_%s\n" % root.get("name"))
+        os.replace(temporaryPath, path)
+        return True
+    except OSError:
+        return False
+    finally:
+        if os.path.exists(temporaryPath):
+            os.remove(temporaryPath)
+
+
+def _loadCompiled(uiPath):
+    """Return the compiled module of a .ui file, or None if it is missing or stale."""
+    path = compiledPath(uiPath)
+    stamp = sourceStamp(uiPath)
+    loaded = _modules.get(path)
+    if loaded is not None and loaded[0] == stamp:
+        return loaded[1]
+    if not os.path.exists(path):
+        return None
+    spec = importlib.util.spec_from_file_location("uicache_" + os.path.basename(path)[:-3], path)
+    module = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(module)
+        if module.kSourceStamp != stamp:
+            return None
+    except Exception:  # pylint: disable=broad-except
+        return None
+    _modules[path] = (stamp, module)
+    return module
+
+
+def _loadRuntime(uiPath):
+    """Parse a .ui file with QUiLoader."""
+    # QtUiTools is only imported when a .ui file has no up to date compiled module.
+    # pylint: disable=import-outside-toplevel
+    from PySide2 import QtCore
+    from PySide2 import QtUiTools
+    uiFile = QtCore.QFile(uiPath)
+    uiFile.open(QtCore.QFile.ReadOnly)
+    widget = QtUiTools.QUiLoader().load(uiFile)
+    uiFile.close()
+    return widget
+
+
+def loadUi(uiPath, refresh=True):
+    """Build the widget of a .ui file from its compiled module, parsing the XML only when needed.
+
+    As with QUiLoader, the named children of the form are attributes of the returned widget.
+
+    Args:
+        uiPath (str): The .ui file path.
+        refresh (bool): Compile the module in a background thread when it is missing or stale,
+            so the next start finds it.
+
+    Returns:
+        QWidget: The top level widget of the form.
+    """
+    module = _loadCompiled(uiPath)
+    if module is None:
+        if refresh:
+            threading.Thread(target=compileUi, args=(uiPath,), daemon=True).start()
+        return _loadRuntime(uiPath)
+    widget = getattr(QtWidgets, module.kBaseClass)()
+    form = module.kFormClass()
+    form.setupUi(widget)
+    for name, value in vars(form).items():
+        setattr(widget, name, value)
+    return widget
+
+
+def compileAll(folder):
+    """Compile every .ui file of a folder.
+
+    Temporary files left by background compilations that were stopped with the application are
+    removed first.
+
+    Args:
+        folder (str): The folder with the .ui files.
+
+    Returns:
+        dict: True or False for each .ui path, whether it was compiled.
+    """
+    cacheFolder = os.path.join(folder, kCacheFolder)
+    if os.path.isdir(cacheFolder):
+        for name in os.listdir(cacheFolder):
+            if name.endswith(".tmp"):
+                os.remove(os.path.join(cacheFolder, name))
+    paths = sorted(os.path.join(folder, name) for name in os.listdir(folder) if name.endswith(".ui"))
+    return {path: compileUi(path) for path in paths}
+
+
+if __name__ == "__main__":
+    for uiPath, compiled in compileAll(sys.argv[1] if len(sys.argv) > 1 else "ui").items():
+        print("%s %s" % ("compiled" if compiled else "FAILED  ", uiPath))
@@ -32,7 +32,6 @@ How to use:
 Dependencies:
     * Python 3
     * PyOpenGL
-    * GLFW
     * PySide2
     * Numpy
 
@@ -44,16 +43,34 @@ Sources:
 
 This code supports Pylint. Rc file in project.
 """
+import os
 import sys
-import OpenGL.GL as gl
-import OpenGL.GLU as glu
-import glfw
+import math
+import time
+import multiprocessing
+import concurrent.futures
+import numpy as np
 from PySide2 import QtWidgets
 from PySide2 import QtCore
-from PySide2 import QtUiTools
+from PySide2 import QtGui
 
-from objects import cube
-from objects import torus
+from objects import cube  # pylint: disable=unused-import
+from objects import diskcache
+from objects import panel
+from objects import sharedmesh
+from objects import torus  # pylint: disable=unused-import
+from objects import uicache
+from viewer import culling
+from viewer import instancing
+from viewer import lod
+from viewer import meshbuffer
+from viewer import meshworker
+from viewer import profiler
+from viewer import shaders
+from viewer import transforms
+
+
+kImportTime = time.time()  # Reported with --first-frame to split the startup time.
 
 
 class ProceduralObjects(QtCore.QObject):
@@ -75,31 +92,44 @@ class ProceduralObjects(QtCore.QObject):
         Returns:
             instance: The class instance of the current object.
         """
-        curObjText = self.window.cmb_objType.currentText()
-        if curObjText == "Cube":
-            return self.cubeObject
-        elif curObjText == "Torus":
-            return self.torusObject
+        return self.proceduralObject(self.findCurrentProceduralObjectText)
+
+    def proceduralObject(self, name):
+        """Return the panel of an object, building it on its first selection.
+
+        Args:
+            name (str): The object name shown in the combo box.
+
+        Returns:
+            ShapePanel: The panel of the object.
+        """
+        obj = self.proceduralObjects.get(name)
+        if obj is None:
+            obj = panel.createPanel(name, self.glViewer)
+            self.proceduralObjects[name] = obj
+        return obj
 
     def __init__(self, file, parent=None):
         super(ProceduralObjects, self).__init__(parent)
-        loader = QtUiTools.QUiLoader()
-        mainUIFile = QtCore.QFile(file)
-        mainUIFile.open(QtCore.QFile.ReadOnly)
-        self.window = loader.load(mainUIFile)
+        self.window = uicache.loadUi(file)
         self.glViewer = None
-        mainUIFile.close()
+        self.proceduralObjects = {}
 
         self.configureWidgets()
         self.loadGLViewer()
-        self.cubeObject = cube.ProceduralCube("ui/cubeproceduralwdg.ui", self.glViewer)
-        self.torusObject = torus.ProceduralTorus("ui/torusproceduralwdg.ui", self.glViewer)
         self.loadProceduralObject()
 
     def show(self):
         """Show the main window."""
         self.window.show()
 
+    def reportFirstFrame(self):
+        """Print the time of the first frame and quit. Used by measureStartup.py."""
+        self.glViewer.frameSwapped.disconnect(self.reportFirstFrame)
+        print("firstFrame %.6f" % time.time())
+        sys.stdout.flush()
+        QtCore.QTimer.singleShot(0, QtCore.QCoreApplication.quit)
+
     def configureWidgets(self):
         """Connect signals of all widgets."""
         self.window.cmb_objType.currentIndexChanged.connect(self.loadProceduralObject)
@@ -107,12 +137,19 @@ class ProceduralObjects(QtCore.QObject):
         self.window.act_restoreDef.triggered.connect(self.restoreObjectDefaults)
         self.window.cbx_shaded.stateChanged.connect(self.retrieveRenderSettings)
         self.window.cbx_smooth.stateChanged.connect(self.retrieveRenderSettings)
+        self.window.act_profileFrames.toggled.connect(self.toggleProfiling)
+        self.window.act_saveFrameTrace.triggered.connect(self.saveFrameTrace)
+        self.window.act_instanceGrid.toggled.connect(self.toggleInstanceGrid)
+        self.profilerTimer = QtCore.QTimer(self)
+        self.profilerTimer.setInterval(500)
+        self.profilerTimer.timeout.connect(self.showProfilerStats)
 
     def loadGLViewer(self):
         """Load the GL Widget."""
         self.window.lay_glView = QtWidgets.QVBoxLayout()
         self.window.lay_glView.setContentsMargins(0, 0, 1, 0)
         self.glViewer = OpenGLView()
+        QtCore.QCoreApplication.instance().aboutToQuit.connect(self.glViewer.shutdownWorkers)
         self.window.lay_glView.addWidget(self.glViewer)
         self.window.wdg_glView.setLayout(self.window.lay_glView)
 
@@ -123,27 +160,47 @@ class ProceduralObjects(QtCore.QObject):
 
     def loadProceduralObject(self):
         """Load the procedural object current selected."""
-        curObj = self.findCurrentProceduralObjectText
+        curObj = self.findCurrentProceduralObject
         curLay = self.window.lay_objSettings
         if curLay.count() > 0:
             curLayWidget = curLay.itemAt(0).widget()
             curLay.removeWidget(curLayWidget)
             # curLayWidget.deleteLater()
             curLayWidget.setParent(None)
-        if curObj == "Cube":
-            curLay.addWidget(self.cubeObject.widget)
-        elif curObj == "Torus":
-            curLay.addWidget(self.torusObject.widget)
+        curLay.addWidget(curObj.widget)
         self.updateGLViewer()
 
     def restoreObjectDefaults(self):
         """Restores the current object widget to default value."""
-        curObj = self.findCurrentProceduralObjectText
-        if curObj == "Cube":
-            obj = self.cubeObject
-        elif curObj == "Torus":
-            obj = self.torusObject
-        obj.restoreDefaults()
+        self.findCurrentProceduralObject.restoreDefaults()
+
+    def toggleProfiling(self, enabled):
+        """Enable or disable the frame profiler of the GL Widget."""
+        if enabled:
+            self.glViewer.setProfiler(profiler.FrameProfiler())
+            self.profilerTimer.start()
+        else:
+            self.glViewer.setProfiler(profiler.NullProfiler())
+            self.profilerTimer.stop()
+            self.window.statusbar.clearMessage()
+
+    def showProfilerStats(self):
+        """Show the frame time statistics in the status bar."""
+        self.window.statusbar.showMessage(self.glViewer.profiler.summary())
+
+    def toggleInstanceGrid(self, enabled):
+        """Show the current object as a grid of instances or as a single object."""
+        self.glViewer.setInstanceGrid(OpenGLView.kInstanceGridSize if enabled else 0)
+        self.glViewer.update()
+
+    def saveFrameTrace(self):
+        """Save the recorded frame timings as a Chrome trace file."""
+        if not self.glViewer.profiler.enabled:
+            self.window.statusbar.showMessage("Enable View > Profile Frames to record a trace.", 3000)
+            return
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(self.window, "Save Frame Trace", "frametrace.json", "Trace (*.json)")
+        if path:
+            self.glViewer.profiler.dumpChromeTrace(path)
 
     def retrieveRenderSettings(self):
         """Retrieve a list of all render settings."""
@@ -157,13 +214,50 @@ class ProceduralObjects(QtCore.QObject):
 
 class OpenGLView(QtWidgets.QOpenGLWidget):
     """Class of the OpenGL View."""
+    meshReady = QtCore.Signal()
+    kInstanceGridSize = 4096
+    kFieldOfView = 45.0
+    kCameraDistance = 5.0
+    kViewTilt = 15.0
 
     def __init__(self, obj=None, render=None, parent=None):
         QtWidgets.QOpenGLWidget.__init__(self, parent=parent)
+        # Multisampling is requested once here, the context is created with it.
+        surfaceFormat = QtGui.QSurfaceFormat()
+        surfaceFormat.setDepthBufferSize(24)
+        surfaceFormat.setSamples(4)
+        self.setFormat(surfaceFormat)
         self.resizeSize = QtCore.QSize(547, 539)
         self._obj = obj
         self._render = render if render is not None else [False, False]
         # Render Settings = [shaded, smooth]
+        self.gl = None
+        self.meshBuffers = None
+        # Meshes are generated in a worker process straight in shared memory, a finished mesh repaints the view.
+        # The pool is created first, the workers are spawned so they do not fork the Qt process.
+        self.meshPool = sharedmesh.SharedMeshPool()
+        # Slow meshes are kept on disk across sessions and mapped back instead of generated again.
+        cacheFolder = QtCore.QStandardPaths.writableLocation(QtCore.QStandardPaths.CacheLocation)
+        self.meshDiskCache = diskcache.MeshDiskCache(os.path.join(cacheFolder, "meshes"))
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+        self.meshWorker = meshworker.MeshWorker(executor, onReady=self.meshReady.emit, pool=self.meshPool,
+                                                diskCache=self.meshDiskCache)
+        self.meshReady.connect(self.update)
+        self.programs = None
+        self.scene = None
+        self.instanceGrid = 0
+        self.viewportHeight = self.resizeSize.height()
+        self.camera = transforms.Camera(self.kFieldOfView, self.resizeSize.width() / self.resizeSize.height(), 1.0, 100.0,
+                                        self.kCameraDistance)
+        self.camera.setOrbit(pitch=self.kViewTilt)
+        self.lod = lod.LodSelector()
+        self.lodChains = {}
+        self._instanceTransforms = None
+        self._instanceColors = None
+        self._instanceLevels = None
+        self.profiler = profiler.NullProfiler()
+        self._swapStart = 0.0
+        self.frameSwapped.connect(self.onFrameSwapped)
 
     @property
     def obj(self):
@@ -177,7 +271,10 @@ class OpenGLView(QtWidgets.QOpenGLWidget):
     @obj.setter
     def obj(self, newObj):
         """Set the current drawing object."""
+        changed = newObj is not self._obj
         self._obj = newObj
+        if changed and self.instanceGrid:
+            self.updateInstances()
 
     @property
     def render(self):
@@ -193,16 +290,51 @@ class OpenGLView(QtWidgets.QOpenGLWidget):
         """Set the current render settings."""
         self._render = newSettings
 
+    @property
+    def renderMode(self):
+        """Return the shader render mode of the render settings.
+
+        Returns:
+            str: "wireframe" when not shaded, otherwise "smooth" or "flat".
+        """
+        shaded, smooth = self._render
+        if not shaded:
+            return "wireframe"
+        return "smooth" if smooth else "flat"
+
+    @property
+    def frameGL(self):
+        """Return the GL module of the frame calls, the profiling wrapper of the mesh buffers once set.
+
+        Returns:
+            module: The GL module or its CountingGL wrapper.
+        """
+        return self.gl if self.meshBuffers is None else self.meshBuffers.gl
+
     def initializeGL(self):
         """
         This virtual function is called once before the first call to paintGL() or resizeGL(),
         and then once whenever the widget has been assigned a new QGLContext.
         """
+        # PyOpenGL is imported right before the first frame instead of delaying the window.
+        import OpenGL.GL  # pylint: disable=import-outside-toplevel
+        self.gl = gl = OpenGL.GL
         gl.glClearColor(0.14, 0.14, 0.14, 0.0)  # Background color
         gl.glPushAttrib(gl.GL_CURRENT_BIT)
         gl.glDisable(gl.GL_CULL_FACE)
         gl.glEnable(gl.GL_BLEND)
         gl.glBlendFunc(gl.GL_SRC_ALPHA, gl.GL_ONE_MINUS_SRC_ALPHA)
+        gl.glEnable(gl.GL_DEPTH_TEST)
+        gl.glEnable(gl.GL_MULTISAMPLE)
+        # Push the shaded faces back so the wireframe drawn over them is not hidden.
+        gl.glEnable(gl.GL_POLYGON_OFFSET_FILL)
+        gl.glPolygonOffset(1.0, 1.0)
+        self.meshBuffers = meshbuffer.MeshBufferCache(gl)
+        self.programs = shaders.ProgramCache(gl)
+        self.scene = instancing.InstancedScene(self.meshBuffers, self.meshWorker)
+        self.updateInstances()
+        self.setProfiler(self.profiler)
+        self.context().aboutToBeDestroyed.connect(self.releaseGL)
         # gl.glEnable(gl.GL_DEPTH_TEST)
         # gl.glDisable(gl.GL_CULL_FACE)
         # gl.glPushAttrib(gl.GL_CURRENT_BIT)
@@ -212,46 +344,159 @@ class OpenGLView(QtWidgets.QOpenGLWidget):
     def resizeGL(self, w, h):
         """ This virtual function is called whenever the widget has been resized. """
         # pylint: disable=invalid-name
+        gl = self.frameGL
         gl.glViewport(0, 0, w, h)
+        self.viewportHeight = h
+        self.camera.setPerspective(aspect=w / max(h, 1))
         gl.glMatrixMode(gl.GL_PROJECTION)
-        gl.glLoadIdentity()
-        glu.gluPerspective(45, (self.resizeSize.width() / self.resizeSize.height()), 1.0, 100.0)
+        gl.glLoadMatrixf(transforms.toGL(self.camera.projection))
         gl.glMatrixMode(gl.GL_MODELVIEW)
         return None
 
+    def setProfiler(self, frameProfiler):
+        """Set the profiler that records the frames of the view.
+
+        Args:
+            frameProfiler (FrameProfiler): The profiler, or a NullProfiler to disable profiling.
+        """
+        self.profiler = frameProfiler
+        if self.meshBuffers is not None:
+            self.meshBuffers.profiler = frameProfiler
+            self.meshBuffers.setGL(profiler.CountingGL(self.gl, frameProfiler) if frameProfiler.enabled else self.gl)
+            self.programs.gl = self.meshBuffers.gl
+
+    def setInstanceGrid(self, count):
+        """Draw the current object as a lattice of instances.
+
+        Args:
+            count (int): Number of instances, or 0 to draw the object once.
+        """
+        self.instanceGrid = count
+        self.updateInstances()
+
+    def updateInstances(self):
+        """Lay out the lattice of the current object. The instances are added to the scene by their LOD."""
+        self._instanceLevels = None
+        if self.scene is not None:
+            self.scene.clear()
+        if self.instanceGrid and self.obj is not None:
+            # Fit the lattice in the area of a single object, the objects span about 3 units.
+            spacing = 4.0 / math.ceil(math.sqrt(self.instanceGrid))
+            self._instanceTransforms = instancing.lattice(self.instanceGrid, spacing, spacing * 0.3)
+            self._instanceColors = instancing.latticeColors(self.instanceGrid)
+        else:
+            self._instanceTransforms = self._instanceColors = None
+
+    def lodChain(self, obj):
+        """Return the LOD chain of an object, creating it on first use.
+
+        Args:
+            obj (instance): A procedural object.
+
+        Returns:
+            LodChain: The chain of the object.
+        """
+        chain = self.lodChains.get(id(obj))
+        if chain is None:
+            chain = lod.LodChain(obj)
+            self.lodChains[id(obj)] = chain
+        return chain
+
+    def projectedSize(self, radius, centers):
+        """Estimate the height in pixels of bounding spheres placed in the model space.
+
+        Args:
+            radius (float or numpy.ndarray): The radius of the spheres.
+            centers (numpy.ndarray): The sphere centers with shape (3,) or (N, 3).
+
+        Returns:
+            float or numpy.ndarray: The projected diameters in pixels.
+        """
+        depth = -transforms.transformPoints(self.camera.modelView, centers)[..., 2]
+        return lod.projectedSize(radius, depth, self.camera.fovY, self.viewportHeight)
+
+    def updateInstanceLevels(self):
+        """Pick the LOD of every instance and regroup the scene when any level changed."""
+        chain = self.lodChain(self.obj)
+        matrices = self._instanceTransforms
+        sizes = self.projectedSize(chain.shape.boundingRadius * matrices[:, 0, 0], matrices[:, :3, 3])
+        levels = self.lod.selectMany(sizes, chain.triangleCounts(), self._instanceLevels)
+        if self._instanceLevels is not None and np.array_equal(levels, self._instanceLevels):
+            return
+        self._instanceLevels = levels
+        self.scene.clear()
+        for level in np.unique(levels):
+            mask = levels == level
+            self.scene.add(chain[level], self._instanceTransforms[mask], self._instanceColors[mask])
+
+    def onFrameSwapped(self):
+        """Close the frame in the profiler once the buffers were swapped."""
+        self.profiler.end("swap", self._swapStart)
+        self.profiler.frameEnd()
+
     def paintGL(self):
         """ This virtual function is called whenever the widget needs to be painted. """
-        # gl.glRotatef(self.yRotDeg, self.rotAxis[0], self.rotAxis[1], self.rotAxis[2])
-        if self.render[1]:
-            gl.glEnable(gl.GL_POINT_SMOOTH)
-            gl.glEnable(gl.GL_LINE_SMOOTH)
-            gl.glEnable(gl.GL_POLYGON_SMOOTH)
-            glfw.init()
-            glfw.window_hint(glfw.SAMPLES, 4)
-            gl.glEnable(gl.GL_MULTISAMPLE)
-            # gl.glHint(gl.GL_MULTISAMPLE_BIT, gl.GL_NICEST)
-        else:
-            gl.glDisable(gl.GL_POINT_SMOOTH)
-            gl.glDisable(gl.GL_LINE_SMOOTH)
-            gl.glDisable(gl.GL_POLYGON_SMOOTH)
-            gl.glDisable(gl.GL_MULTISAMPLE)
+        self.profiler.frameBegin()
+        with self.profiler.phase("paintGL"):
+            self.paintFrame()
+        self._swapStart = self.profiler.begin("swap")
+
+    def paintFrame(self):
+        """Draw the frame. Called by paintGL."""
+        gl = self.frameGL
         gl.glClear(gl.GL_COLOR_BUFFER_BIT | gl.GL_DEPTH_BUFFER_BIT)
-        gl.glLoadIdentity()
-        gl.glTranslatef(0.0, 0.0, -5.0)
-        gl.glRotatef(15.0, 1.0, 0.0, 0.0)
-        self.drawObj()
+        gl.glLoadMatrixf(transforms.toGL(self.camera.modelView))
+        with self.profiler.phase("drawObj"):
+            self.drawObj()
+
+    def shutdownWorkers(self):
+        """Stop the mesh worker and unlink its shared memory blocks."""
+        self.meshWorker.shutdown()
+        self.meshPool.close()
+
+    def releaseGL(self):
+        """Delete the GPU buffers before the context goes away."""
+        self.makeCurrent()
+        self.scene.release()
+        self.programs.release()
+        self.meshBuffers.release()
+        self.doneCurrent()
 
     def drawObj(self):
         """Draw the current object."""
-        try:
-            self.obj.draw()
-        except AttributeError:
-            pass
+        if self.obj is None:
+            return
+        chain = self.lodChain(self.obj)
+        mode = self.renderMode
+        if self.instanceGrid:
+            self.updateInstanceLevels()
+            self.scene.draw(self.camera, mode)
+            self.profiler.count("drawn", self.scene.drawnCount)
+            self.profiler.count("culled", self.scene.culledCount)
+            return
+        # The object sits at the origin of the model, its size on screen follows its bounds and the viewport.
+        size = self.projectedSize(chain.shape.boundingRadius, np.zeros(3, dtype=np.float32))
+        level = self.lod.select(id(self.obj), size, len(chain))
+        shape = chain[level]
+        snapshot = self.meshWorker.latest(shape, normals=mode in shaders.kNormalModes)
+        if snapshot is None:
+            return
+        # The bounds come with the mesh, so an object out of view is skipped before its upload.
+        sphere = snapshot.meshData.sphere
+        if not culling.spheresVisible(culling.frustumPlanes(self.camera.mvp), sphere[:3], sphere[3])[0]:
+            self.profiler.count("culled", 1)
+            return
+        self.profiler.count("drawn", 1)
+        buffer = self.meshBuffers.get(snapshot, normals=mode in shaders.kNormalModes, key=id(shape))
+        shaders.drawMesh(self.programs, buffer, self.camera, mode)
 
 
 
 if __name__ == "__main__":
     app = QtWidgets.QApplication(sys.argv)
     mainUI = ProceduralObjects("ui/mainproceduralui.ui")
+    if "--first-frame" in sys.argv:
+        print("imported %.6f" % kImportTime)
+        mainUI.glViewer.frameSwapped.connect(mainUI.reportFirstFrame)
     mainUI.show()
     sys.exit(app.exec_())
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2019 Giuliano França
+
+MIT License
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+====================================================================================================
+
+How to use:
+    * Pass the shape and its parameters, frames are rendered without a display.
+    * Example: python renderTurntable.py torus --radius 1.5 --frames 36 --mode smooth -o turntable
+    * Example: python renderTurntable.py gear --video - | ffmpeg -f rawvideo -pix_fmt rgba -s 512x512 -r 30 -i - gear.mp4
+    * Use --frames 1 for a thumbnail.
+
+Dependencies:
+    * Python 3
+    * PyOpenGL
+    * Mesa with EGL surfaceless or OSMesa support
+    * Numpy
+
+Todo:
+    * NDA
+
+Sources:
+    * NDA
+
+This code supports Pylint. Rc file in project.
+"""
+import os
+import sys
+import argparse
+
+from objects import shapes
+from viewer import offscreen
+from viewer import shaders
+from viewer import turntable
+
+
+def parseArguments(argv):
+    """Parse the command line.
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Render turntable frames of procedural objects without a display.")
+    subparsers = parser.add_subparsers(dest="shape")
+    subparsers.required = True
+    for shape, shapeClass in shapes.kShapes.items():
+        shapeParser = subparsers.add_parser(shape, help="Render a %s turntable." % shape)
+        for name, default in shapeClass.kParameters:
+            shapeParser.add_argument("--%s" % name, type=type(default), default=default, help="Default: %s." % default)
+        shapeParser.add_argument("-n", "--frames", type=int, default=36, help="Number of angles of the turn.")
+        shapeParser.add_argument("-s", "--size", type=int, nargs=2, default=(512, 512), metavar=("WIDTH", "HEIGHT"), help="Image size.")
+        shapeParser.add_argument("-m", "--mode", choices=sorted(shaders.kRenderModes), default="flat", help="Render mode.")
+        shapeParser.add_argument("-o", "--output", default="turntable", help="Output folder of the PNG files.")
+        shapeParser.add_argument("--video", help="Write a raw RGBA video to this file instead of PNG files, - for stdout.")
+        shapeParser.add_argument("--compress-level", type=int, default=6, help="zlib level of the PNG files.")
+        shapeParser.add_argument("-p", "--platform", choices=("egl", "osmesa"), default=os.environ.get("PYOPENGL_PLATFORM", "egl"),
+                                 help="Headless GL platform.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Run the renderer.
+
+    Returns:
+        int: The exit code.
+    """
+    args = parseArguments(argv)
+    shapeClass = shapes.kShapes[args.shape]
+    shape = shapeClass(**{name: getattr(args, name) for name, _ in shapeClass.kParameters})
+    width, height = args.size
+    if args.video:
+        writer = turntable.RawVideoWriter(args.video)
+    else:
+        writer = turntable.PngSequenceWriter(args.output, args.shape, args.compress_level)
+
+    context = offscreen.createContext(args.platform)
+    # pylint: disable=import-outside-toplevel
+    import OpenGL.GL as gl
+    renderer = turntable.TurntableRenderer(gl, width, height, args.mode)
+    try:
+        stats = renderer.render(shape, args.frames, writer)
+    finally:
+        renderer.release()
+        context.release()
+
+    # Keep stdout clean when the video goes through it.
+    report = sys.stderr if args.video == "-" else sys.stdout
+    print("Rendered %d frames of %dx%d in %.2fs: %.1f fps (render and readback %.1f fps, encoding %.1f fps)." % (
+        stats["frames"], width, height, stats["seconds"], stats["fps"], stats["renderFps"], stats["encodeFps"]), file=report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
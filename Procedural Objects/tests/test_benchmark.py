@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2019 Giuliano França
+
+MIT License
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+====================================================================================================
+
+How to use:
+    * Run python -m pytest from the Procedural Objects folder.
+
+Dependencies:
+    * Python 3
+    * Pytest
+
+Todo:
+    * NDA
+
+Sources:
+    * NDA
+
+This code supports Pylint. Rc file in project.
+"""
+import pytest
+
+import benchmark
+
+
+def results(backend, seconds):
+    """Return benchmark results with a single case."""
+    return {"meta": {"glBackend": backend}, "results": {"submit.buffer/16x16": seconds}}
+
+
+def testRegressionAboveThreshold():
+    """Only a slowdown beyond the threshold is reported."""
+    baseline = results("egl (llvmpipe)", 1.0)
+    assert benchmark.compareBaseline(results("egl (llvmpipe)", 1.2), baseline, 0.25) == []
+    assert benchmark.compareBaseline(results("egl (llvmpipe)", 1.3), baseline, 0.25) == [("submit.buffer/16x16", 1.0, 1.3)]
+
+
+@pytest.mark.parametrize("backend", ["software", "egl (AMD Radeon)"])
+def testOtherBackendIsNotCompared(backend):
+    """Timings from another backend or renderer are refused instead of passing or failing."""
+    with pytest.raises(ValueError):
+        benchmark.compareBaseline(results(backend, 1.0), results("egl (llvmpipe)", 1.0), 0.25)
+
+
+def testSaveBaselineNeedsFile():
+    """--save-baseline without a baseline file is a command line error."""
+    with pytest.raises(SystemExit):
+        benchmark.parseArguments(["--save-baseline"])
+    assert benchmark.parseArguments(["--save-baseline", "--baseline", "base.json"]).save_baseline
+
+
+def testMissingPlatformIsAnError(monkeypatch):
+    """A headless platform that can not start is reported, not replaced by the software stand-in."""
+    from viewer import offscreen  # pylint: disable=import-outside-toplevel
+
+    def createContext(platformName):
+        raise OSError("no %s display" % platformName)
+
+    monkeypatch.setattr(offscreen, "createContext", createContext)
+    with pytest.raises(RuntimeError):
+        benchmark.openGL("egl")
+    assert benchmark.openGL("software")[1] == "software"
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2019 Giuliano França
+
+MIT License
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+====================================================================================================
+
+How to use:
+    * Run python -m pytest from the Procedural Objects folder.
+
+Dependencies:
+    * Python 3
+    * Pytest
+    * Numpy
+
+Todo:
+    * NDA
+
+Sources:
+    * NDA
+
+This code supports Pylint. Rc file in project.
+"""
+import numpy as np
+import pytest
+
+from objects import cache
+from objects import shapes
+
+
+def testArraysBytes():
+    """Nested containers count the bytes of their arrays only."""
+    value = {"a": np.zeros(10, dtype=np.float32), "b": (np.zeros(3, dtype=np.uint8), [np.zeros(2)]), "c": 5}
+    assert cache.arraysBytes(value) == 40 + 3 + 16
+
+
+def testCachedArraysAreReadOnly():
+    """Stored arrays can't be changed by a consumer."""
+    geometryCache = cache.GeometryCache()
+    geometryCache.put(("a",), {"positions": np.zeros(4)})
+    with pytest.raises(ValueError):
+        geometryCache.get(("a",))["positions"][0] = 1.0
+
+
+def testFetchBuildsOnce():
+    """The builder runs on the first miss only."""
+    geometryCache = cache.GeometryCache()
+    calls = []
+
+    def builder():
+        calls.append(None)
+        return np.arange(8)
+
+    first = geometryCache.fetch(("k",), builder)
+    assert geometryCache.fetch(("k",), builder) is first
+    assert len(calls) == 1
+    assert geometryCache.stats()["hits"] == 1
+    assert geometryCache.stats()["misses"] == 1
+
+
+def testLeastRecentlyUsedEviction():
+    """Over budget, the entry used the longest ago goes first."""
+    geometryCache = cache.GeometryCache(maxBytes=200)
+    for key in "abc":
+        geometryCache.put((key,), np.zeros(8))
+    geometryCache.get(("a",))
+    geometryCache.put(("d",), np.zeros(8))
+    assert ("a",) in geometryCache and ("b",) not in geometryCache
+    assert geometryCache.currentBytes == 192
+    assert geometryCache.evictions == 1
+    geometryCache.maxBytes = 64
+    assert len(geometryCache) == 1 and ("d",) in geometryCache
+
+
+def testOversizedValueIsNotStored():
+    """A value bigger than the budget is skipped and replaces nothing."""
+    geometryCache = cache.GeometryCache(maxBytes=100)
+    geometryCache.put(("a",), np.zeros(4))
+    geometryCache.put(("a",), np.zeros(100))
+    assert ("a",) not in geometryCache
+    assert geometryCache.currentBytes == 0
+
+
+def testShapesShareFrames():
+    """Two shapes with the same topology reuse one cached frame."""
+    first = shapes.TorusGeometry(radius=1.0)
+    second = shapes.TorusGeometry(radius=3.0)
+    first.mesh()
+    second.mesh()
+    assert cache.sharedCache.stats()["hits"] >= 1
+    assert not np.allclose(first.mesh()[0], second.mesh()[0])
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2019 Giuliano França
+
+MIT License
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+====================================================================================================
+
+How to use:
+    * Run python -m pytest from the Procedural Objects folder.
+
+Dependencies:
+    * Python 3
+    * Pytest
+    * Numpy
+
+Todo:
+    * NDA
+
+Sources:
+    * NDA
+
+This code supports Pylint. Rc file in project.
+"""
+import numpy as np
+import pytest
+
+from viewer import culling
+from viewer import instancing
+from viewer import transforms
+
+
+@pytest.fixture
+def camera():
+    """Return a camera looking at the origin from 5 units away."""
+    return transforms.Camera(fovY=45.0, aspect=1.0, near=1.0, far=100.0, distance=5.0)
+
+
+def testPlanesAreNormalized(camera):
+    """The six planes have unit normals and the origin in front of the camera is inside all of them."""
+    planes = culling.frustumPlanes(camera.mvp)
+    assert planes.shape == (6, 4)
+    np.testing.assert_allclose(np.linalg.norm(planes[:, :3], axis=1), 1.0)
+    assert np.all(planes[:, 3] > 0.0)
+
+
+def testSpheres(camera):
+    """Spheres in view, behind the camera, beyond the far plane and beside the frustum."""
+    planes = culling.frustumPlanes(camera.mvp)
+    centers = np.array([[0, 0, 0], [0, 0, 10], [0, 0, -200], [50, 0, 0], [3.5, 0, 0]], dtype=np.float64)
+    radii = np.array([1.0, 1.0, 1.0, 1.0, 2.0])
+    np.testing.assert_array_equal(culling.spheresVisible(planes, centers, radii), [True, False, False, False, True])
+
+
+def testBoxesAgreeWithCorners(camera):
+    """A box is culled only when all its corners are outside the same plane."""
+    planes = culling.frustumPlanes(camera.mvp)
+    random = np.random.default_rng(7)
+    minimum = random.uniform(-15.0, 15.0, (500, 3))
+    maximum = minimum + random.uniform(0.1, 3.0, (500, 3))
+    corners = np.stack([np.where([x, y, z], maximum, minimum) for x in (0, 1) for y in (0, 1) for z in (0, 1)], axis=1)
+    distances = corners @ planes[:, :3].T + planes[:, 3]
+    expected = ~np.any(np.all(distances < 0.0, axis=1), axis=1)
+    np.testing.assert_array_equal(culling.boxesVisible(planes, minimum, maximum), expected)
+
+
+def testTransformBoxesEnclosesCorners():
+    """The world boxes of rotated and scaled copies contain every transformed corner."""
+    box = np.array([[-1.0, -0.5, -2.0], [1.0, 0.5, 2.0]])
+    matrices = transforms.translation(np.array([[1, 2, 3], [-4, 0, 0]], dtype=np.float32)) @ transforms.rotation((0, 1, 0), 30.0) @ transforms.scaling(2.0)
+    minimum, maximum = culling.transformBoxes(matrices, box)
+    corners = np.array([[x, y, z, 1.0] for x in box[:, 0] for y in box[:, 1] for z in box[:, 2]])
+    for matrix, low, high in zip(matrices, minimum, maximum):
+        points = (corners @ np.asarray(matrix, dtype=np.float64).T)[:, :3]
+        np.testing.assert_allclose(points.min(axis=0), low, atol=1e-5)
+        np.testing.assert_allclose(points.max(axis=0), high, atol=1e-5)
+
+
+@pytest.mark.parametrize("distance,yaw", [(5.0, 0.0), (1.5, 0.0), (0.8, 30.0), (2.0, 80.0), (20.0, 10.0)])
+def testHierarchyMatchesBruteForce(camera, distance, yaw):
+    """The hierarchy finds exactly the instances a test of every box finds."""
+    matrices = instancing.lattice(4096, 4.0 / 64, 4.0 / 64 * 0.3)
+    box = np.array([[-1.5, -0.5, -1.5], [1.5, 0.5, 1.5]])
+    hierarchy = culling.BoundingVolumeHierarchy(matrices[:, :3, 3])
+    minimum, maximum = culling.transformBoxes(matrices, box)
+    hierarchy.refit(minimum, maximum)
+    camera.setOrbit(distance=distance, yaw=yaw, pitch=20.0)
+    planes = culling.frustumPlanes(camera.mvp)
+    expected = np.flatnonzero(culling.boxesVisible(planes, minimum, maximum))
+    np.testing.assert_array_equal(hierarchy.query(planes), expected)
+    assert hierarchy.testedNodes <= hierarchy.nodeCount
+
+
+def testHierarchyRefit(camera):
+    """Refitting with bigger boxes makes instances beside the frustum visible again."""
+    positions = np.array([[0, 0, 0], [6, 0, 0], [-6, 0, 0]], dtype=np.float64)
+    hierarchy = culling.BoundingVolumeHierarchy(positions, leafSize=1)
+    planes = culling.frustumPlanes(camera.mvp)
+    hierarchy.refit(positions - 0.5, positions + 0.5)
+    np.testing.assert_array_equal(hierarchy.query(planes), [0])
+    hierarchy.refit(positions - 5.0, positions + 5.0)
+    np.testing.assert_array_equal(hierarchy.query(planes), [0, 1, 2])
+
+
+def testEmptyHierarchy(camera):
+    """A hierarchy without objects finds nothing."""
+    hierarchy = culling.BoundingVolumeHierarchy(np.zeros((0, 3)))
+    hierarchy.refit(np.zeros((0, 3)), np.zeros((0, 3)))
+    assert len(hierarchy.query(culling.frustumPlanes(camera.mvp))) == 0
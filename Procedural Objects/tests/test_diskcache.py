@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2019 Giuliano França
+
+MIT License
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+====================================================================================================
+
+How to use:
+    * Run python -m pytest from the Procedural Objects folder.
+
+Dependencies:
+    * Python 3
+    * Pytest
+    * Numpy
+
+Todo:
+    * NDA
+
+Sources:
+    * NDA
+
+This code supports Pylint. Rc file in project.
+"""
+import os
+import numpy as np
+import pytest
+
+from objects import diskcache
+from objects import shapes
+
+
+@pytest.fixture
+def meshCache(tmp_path):
+    """Return a disk cache in a temporary folder."""
+    return diskcache.MeshDiskCache(str(tmp_path))
+
+
+def testRoundTrip(meshCache):
+    """A stored mesh maps back with the same vertices, indices, ranges and bounds."""
+    torus = shapes.TorusGeometry(subdAxis=12, subdHeight=8)
+    meshData = torus.toMesh(normals=True)
+    key = meshCache.keyOf(shapes.TorusGeometry, torus.parameters, normals=True)
+    assert meshCache.store(key, meshData)
+    loaded = meshCache.load(key)
+    np.testing.assert_array_equal(loaded.vertices, meshData.vertices)
+    np.testing.assert_array_equal(loaded.indices, meshData.indices)
+    assert loaded.ranges == meshData.ranges
+    assert loaded.attributes == meshData.attributes
+    np.testing.assert_array_equal(loaded.box, meshData.box)
+    np.testing.assert_array_equal(loaded.sphere, meshData.sphere)
+    assert not loaded.vertices.flags.writeable
+
+
+def testKeysDependOnParameters():
+    """The key changes with the parameters, the normals and the shape version."""
+    key = diskcache.MeshDiskCache.keyOf
+    parameters = shapes.TorusGeometry().parameters
+    assert key(shapes.TorusGeometry, parameters) == key(shapes.TorusGeometry, parameters)
+    assert key(shapes.TorusGeometry, parameters) != key(shapes.TorusGeometry, parameters, normals=True)
+    assert key(shapes.TorusGeometry, parameters) != key(shapes.TorusGeometry, (2.0,) + parameters[1:])
+
+
+def testMissAndFetch(meshCache):
+    """A missing key builds once, then loads from the file."""
+    torus = shapes.TorusGeometry()
+    key = meshCache.keyOf(shapes.TorusGeometry, torus.parameters)
+    assert meshCache.load(key) is None
+    calls = []
+
+    def builder():
+        calls.append(None)
+        return torus.toMesh()
+
+    meshCache.fetch(key, builder)
+    meshCache.fetch(key, builder)
+    assert len(calls) == 1
+    assert meshCache.stats()["writes"] == 1
+    assert meshCache.stats()["hits"] == 1
+
+
+def testCorruptFileIsDropped(meshCache):
+    """A truncated file is a miss and gets deleted."""
+    torus = shapes.TorusGeometry()
+    key = meshCache.keyOf(shapes.TorusGeometry, torus.parameters)
+    meshCache.store(key, torus.toMesh())
+    path = os.path.join(meshCache.directory, key + diskcache.kExtension)
+    with open(path, "r+b") as meshFile:
+        meshFile.truncate(os.path.getsize(path) - 4)
+    assert meshCache.load(key) is None
+    assert not os.path.exists(path)
+
+
+def testEvictionKeepsBudget(tmp_path):
+    """Storing beyond the budget deletes the least recently used files."""
+    sizes = [shapes.TorusGeometry(subdAxis=subdAxis, subdHeight=8) for subdAxis in (8, 9, 10, 11)]
+    meshCache = diskcache.MeshDiskCache(str(tmp_path), maxBytes=3000)
+    for shape in sizes:
+        meshCache.store(meshCache.keyOf(type(shape), shape.parameters), shape.toMesh())
+    total = sum(entry.stat().st_size for entry in os.scandir(str(tmp_path)))
+    assert total <= 3000
+    assert meshCache.evictions >= 1
+    last = sizes[-1]
+    assert meshCache.load(meshCache.keyOf(type(last), last.parameters)) is not None
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2019 Giuliano França
+
+MIT License
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+====================================================================================================
+
+How to use:
+    * Run python -m pytest from the Procedural Objects folder.
+
+Dependencies:
+    * Python 3
+    * Pytest
+
+Todo:
+    * NDA
+
+Sources:
+    * NDA
+
+This code supports Pylint. Rc file in project.
+"""
+import os
+import pytest
+
+import exportMeshes
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def testSweepWritesEveryVariant(tmp_path, jobs):
+    """Every combination of the swept values is written once, inline or from the process pool."""
+    folder = str(tmp_path)
+    arguments = ["torus", "--radius", "1", "2", "--subdAxis", "8", "16", "-f", "ply", "-j", jobs, "-o", folder]
+    assert exportMeshes.main(arguments) == 0
+    names = sorted(os.listdir(folder))
+    assert len(names) == 4
+    assert all(name.endswith(".ply") for name in names)
+    assert sum(name.startswith("torus_radius1.0_") for name in names) == 2
+    for name in names:
+        with open(os.path.join(folder, name), "rb") as plyFile:
+            assert plyFile.readline() == b"ply\n"
+
+
+def testUnknownShapeIsRejected(tmp_path):
+    """Only the registered shapes are sub commands."""
+    with pytest.raises(SystemExit):
+        exportMeshes.main(["teapot", "-o", str(tmp_path)])
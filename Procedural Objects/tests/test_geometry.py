@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2019 Giuliano França
+
+MIT License
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+====================================================================================================
+
+How to use:
+    * Run python -m pytest from the Procedural Objects folder.
+
+Dependencies:
+    * Python 3
+    * Pytest
+    * Numpy
+
+Todo:
+    * NDA
+
+Sources:
+    * https://en.wikipedia.org/wiki/Euler_characteristic
+
+This code supports Pylint. Rc file in project.
+"""
+import math
+import numpy as np
+import pytest
+
+from objects import geometry
+from objects import shapes
+
+
+def signedVolume(positions, triangles):
+    """Return the volume enclosed by a triangle mesh, positive when the faces wind outwards."""
+    corners = np.asarray(positions, dtype=np.float64)[np.asarray(triangles, dtype=np.intp)]
+    return np.einsum("ij,ij->i", corners[:, 0], np.cross(corners[:, 1], corners[:, 2])).sum() / 6.0
+
+
+def testTorusMatchesClosedFormVolume():
+    """The torus is closed, winds outwards and encloses about 2 pi^2 R r^2."""
+    positions, _, triangles = geometry.torus(128, 64, radius=2.0, secRadius=0.5)
+    assert signedVolume(positions, triangles) == pytest.approx(2.0 * math.pi ** 2 * 2.0 * 0.25, rel=1e-2)
+
+
+def testTorusTwistRotatesSections():
+    """A twist keeps the torus shape, only the section points slide around their ring."""
+    plain, normals = geometry.torusGrid(16, 8)
+    twisted, twistedNormals = geometry.torusGrid(16, 8, twist=180.0)
+    np.testing.assert_allclose(np.linalg.norm(twistedNormals, axis=1), 1.0, rtol=1e-6)
+    np.testing.assert_allclose(twisted[:8], plain[:8], atol=1e-6)
+    assert not np.allclose(twisted[8:16], plain[8:16], atol=1e-3)
+
+
+def testRingTwistReusesScratchBuffers():
+    """Dragging the twist deforms in the same work buffers, which a topology change replaces."""
+    torus = shapes.TorusGeometry(subdAxis=16, subdHeight=8, twist=30.0)
+    torus.mesh()
+    buffers = dict(torus._scratch)  # pylint: disable=protected-access
+    torus.set("twist", 200.0)
+    positions, _ = torus.mesh()
+    normals = torus.normals
+    assert all(torus._scratch[key] is buffer for key, buffer in buffers.items())  # pylint: disable=protected-access
+    reference, referenceNormals = geometry.torusGrid(16, 8, torus.radius, torus.secRadius, twist=200.0)
+    np.testing.assert_allclose(positions, reference, atol=1e-5)
+    np.testing.assert_allclose(normals, referenceNormals, atol=1e-5)
+    torus.set("subdAxis", 20)
+    torus.mesh()
+    assert torus._scratch[("twist", "product")].shape == (20, 8, 3)  # pylint: disable=protected-access
+
+
+@pytest.mark.parametrize("subdAxis,subdHeight", [(3, 3), (10, 7), (64, 32)])
+def testTorusIndicesAddressEveryVertex(subdAxis, subdHeight):
+    """The torus triangles and lines use every vertex and stay in range."""
+    triangles = geometry.torusIndices(subdAxis, subdHeight)
+    lines = geometry.torusLineIndices(subdAxis, subdHeight)
+    vertexCount = subdAxis * subdHeight
+    assert triangles.shape == (vertexCount * 2, 3)
+    assert lines.shape == (vertexCount * 2, 2)
+    assert set(np.unique(triangles)) == set(range(vertexCount))
+    assert len(geometry.uniqueEdges(triangles)) == vertexCount * 3
+
+
+def testUniqueEdgesOfQuad():
+    """Two triangles of a quad share their diagonal, which is listed once."""
+    edges = geometry.uniqueEdges(np.array([[0, 1, 2], [0, 2, 3]]))
+    assert sorted(map(tuple, edges.tolist())) == [(0, 1), (0, 2), (0, 3), (1, 2), (2, 3)]
+    assert geometry.uniqueEdges(np.zeros((0, 3), dtype=np.uint32)).shape == (0, 2)
+
+
+def testUniqueEdgesWideKeys():
+    """Meshes above 65536 vertices use 64 bit keys and keep the high indices."""
+    edges = geometry.uniqueEdges(np.array([[70000, 70001, 70002]]))
+    assert sorted(map(tuple, edges.tolist())) == [(70000, 70001), (70000, 70002), (70001, 70002)]
+
+
+def testSmoothNormalsOfFlatTriangles():
+    """The normals of a counter clockwise square in the XY plane point along +Z."""
+    positions = np.array([[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0], [5, 5, 5]], dtype=np.float32)
+    normals = geometry.smoothNormals(positions, np.array([[0, 1, 2], [0, 2, 3]]))
+    np.testing.assert_allclose(normals[:4], [[0, 0, 1]] * 4)
+    np.testing.assert_array_equal(normals[4], [0, 0, 0])
+
+
+@pytest.mark.parametrize("subdivisions", [(1, 1, 1), (2, 3, 4)])
+def testBoxIsWatertight(subdivisions):
+    """The box shares its edge vertices, so it is a closed surface of Euler characteristic 2."""
+    frame = geometry.box(*subdivisions)
+    positions, quads = frame["positions"], frame["quads"]
+    edges = geometry.uniqueEdges(quads, len(positions))
+    assert len(positions) - len(edges) + len(quads) == 2
+    assert signedVolume(positions, frame["triangles"]) == pytest.approx(8.0)
+    np.testing.assert_allclose(np.linalg.norm(geometry.boxNormals(positions), axis=1), 1.0, rtol=1e-6)
+
+
+def testSphereWindsOutwards():
+    """The sphere encloses close to 4/3 pi and its positions are unit normals."""
+    frame = geometry.sphere(64, 32)
+    assert signedVolume(frame["positions"], frame["triangles"]) == pytest.approx(4.0 / 3.0 * math.pi, rel=2e-2)
+    np.testing.assert_allclose(np.linalg.norm(frame["positions"], axis=1), 1.0, rtol=1e-6)
+
+
+@pytest.mark.parametrize("name", sorted(shapes.kShapes))
+def testShapeNormalsAgreeWithTriangles(name):
+    """The closed form normals of every shape point to the same side as its triangles."""
+    shape = shapes.kShapes[name]()
+    positions, elements = shape.mesh()
+    reference = geometry.smoothNormals(positions, elements["triangles"])
+    agreement = np.einsum("ij,ij->i", shape.normals, reference)
+    assert np.mean(agreement > 0.0) > 0.95
+
+
+@pytest.mark.parametrize("name", sorted(shapes.kShapes))
+def testShapeTriangleCountIsExact(name):
+    """triangleCount predicts the generated triangles without building the mesh."""
+    shape = shapes.kShapes[name]()
+    expected = shape.triangleCount
+    assert len(shape.mesh()[1]["triangles"]) == expected
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2019 Giuliano França
+
+MIT License
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+====================================================================================================
+
+How to use:
+    * Run python -m pytest from the Procedural Objects folder.
+    * InstancedScene is driven through SoftwareGL, so no display or GL context is needed.
+
+Dependencies:
+    * Python 3
+    * Pytest
+
+Todo:
+    * NDA
+
+Sources:
+    * NDA
+
+This code supports Pylint. Rc file in project.
+"""
+import pytest
+
+from objects import shapes
+from viewer import instancing
+from viewer import meshbuffer
+from viewer import softwaregl
+from viewer import transforms
+
+
+@pytest.fixture
+def gl():
+    """Return a fresh software GL module."""
+    return softwaregl.SoftwareGL()
+
+
+def scene(gl, count=4):
+    """Return a scene with a grid of torus instances, all in view, and the torus."""
+    torus = shapes.TorusGeometry(subdAxis=8, subdHeight=6)
+    instancedScene = instancing.InstancedScene(meshbuffer.MeshBufferCache(gl), culling=False)
+    instancedScene.add(torus, instancing.lattice(count, spacing=0.5, scale=0.1))
+    return instancedScene, torus
+
+
+def testWireframeDrawsLines(gl):
+    """The wireframe mode is one instanced draw of the lines."""
+    instancedScene, torus = scene(gl)
+    instancedScene.draw(transforms.Camera(), "wireframe")
+    assert gl.calls["glDrawElementsInstanced"] == 1
+    assert gl.drawnVertices == 4 * torus.toMesh().ranges["lines"][1]
+
+
+@pytest.mark.parametrize("mode", ["flat", "smooth"])
+def testShadedModesDrawFaces(gl, mode):
+    """The shaded modes draw the triangles, then the wireframe over them."""
+    instancedScene, torus = scene(gl)
+    instancedScene.draw(transforms.Camera(), mode)
+    ranges = torus.toMesh().ranges
+    assert gl.calls["glDrawElementsInstanced"] == 2
+    assert gl.drawnVertices == 4 * (ranges["triangles"][1] + ranges["lines"][1])
+
+
+def testCameraUploadedOncePerProgram(gl):
+    """The camera matrices are only sent again after the camera changed."""
+    instancedScene, _ = scene(gl)
+    camera = transforms.Camera()
+    instancedScene.draw(camera, "flat")
+    uploads = gl.calls["glUniformMatrix4fv"]
+    instancedScene.draw(camera, "flat")
+    assert gl.calls["glUniformMatrix4fv"] == uploads
+    camera.setOrbit(distance=8.0)
+    instancedScene.draw(camera, "flat")
+    assert gl.calls["glUniformMatrix4fv"] == 2 * uploads
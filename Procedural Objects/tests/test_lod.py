@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2019 Giuliano França
+
+MIT License
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+====================================================================================================
+
+How to use:
+    * Run python -m pytest from the Procedural Objects folder.
+
+Dependencies:
+    * Python 3
+    * Pytest
+    * Numpy
+
+Todo:
+    * NDA
+
+Sources:
+    * NDA
+
+This code supports Pylint. Rc file in project.
+"""
+import numpy as np
+import pytest
+
+from objects import shapes
+from viewer import lod
+
+
+def testProjectedSize():
+    """A sphere of radius 1 at depth 1 with a 90 degrees field of view fills the viewport."""
+    assert lod.projectedSize(1.0, 2.0, 90.0, 400) == pytest.approx(200.0)
+    assert lod.projectedSize(1.0, 0.1, 90.0, 400) == 400.0
+    np.testing.assert_allclose(lod.projectedSize(np.array([1.0, 0.5]), np.array([4.0, 4.0]), 90.0, 400), [100.0, 50.0])
+
+
+def testChainHalvesSubdivisions():
+    """Every level halves the LOD parameters and keeps the others."""
+    torus = shapes.TorusGeometry(radius=2.0, subdAxis=40, subdHeight=20)
+    chain = lod.LodChain(torus)
+    assert chain[0] is torus
+    assert [(level.subdAxis, level.subdHeight) for level in (chain[i] for i in range(len(chain)))] == [(40, 20), (20, 10), (10, 5), (5, 3), (3, 3)]
+    assert all(chain[i].radius == 2.0 for i in range(len(chain)))
+    counts = chain.triangleCounts()
+    assert np.all(np.diff(counts) <= 0)
+
+
+def testChainNeverRaisesSubdivisions():
+    """A subdivision already below the minimum is kept, not raised to it."""
+    torus = shapes.TorusGeometry(subdAxis=40, subdHeight=2)
+    chain = lod.LodChain(torus)
+    assert [chain[i].subdHeight for i in range(len(chain))] == [2] * len(chain)
+    assert np.all(np.diff(chain.triangleCounts()) < 0)
+
+
+def testChainDropsIdenticalLevels():
+    """Levels that would not reduce anything are not kept."""
+    assert len(lod.LodChain(shapes.GearGeometry())) == 1
+    torus = shapes.TorusGeometry(subdAxis=4, subdHeight=4)
+    chain = lod.LodChain(torus)
+    assert [(chain[i].subdAxis, chain[i].subdHeight) for i in range(len(chain))] == [(4, 4), (3, 3)]
+    torus.set("subdAxis", 3)
+    torus.set("subdHeight", 3)
+    assert len(chain) == 1
+    torus.set("subdAxis", 32)
+    assert len(chain) == 5
+
+
+def testChainFollowsShape():
+    """The coarser levels pick up the changes of the shape."""
+    torus = shapes.TorusGeometry(subdAxis=16, subdHeight=16)
+    chain = lod.LodChain(torus)
+    torus.set("secRadius", 0.8)
+    torus.set("subdAxis", 32)
+    assert chain[1].secRadius == 0.8
+    assert chain[1].subdAxis == 16
+
+
+def testSelectorHysteresis():
+    """A size just below a threshold keeps the level it came from."""
+    selector = lod.LodSelector(thresholds=(100.0,), hysteresis=0.2)
+    assert selector.select("a", 150.0, 2) == 0
+    assert selector.select("a", 90.0, 2) == 0
+    assert selector.select("a", 70.0, 2) == 1
+    assert selector.select("a", 110.0, 2) == 1
+    assert selector.select("a", 130.0, 2) == 0
+    selector.forget("a")
+    assert selector.select("a", 90.0, 2) == 1
+
+
+def testSelectManyRespectsBudget():
+    """Over budget, the smallest instances are coarsened first."""
+    selector = lod.LodSelector(thresholds=(10.0,), triangleBudget=250)
+    sizes = np.array([50.0, 40.0, 30.0])
+    levels = selector.selectMany(sizes, [100, 10])
+    np.testing.assert_array_equal(levels, [0, 0, 1])
+    np.testing.assert_array_equal(lod.LodSelector(thresholds=(10.0,)).selectMany(sizes, [100, 10]), [0, 0, 0])
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2019 Giuliano França
+
+MIT License
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+====================================================================================================
+
+How to use:
+    * Run python -m pytest from the Procedural Objects folder.
+    * MeshBuffer and MeshBufferCache are driven through SoftwareGL, so no display or GL context
+      is needed.
+
+Dependencies:
+    * Python 3
+    * Pytest
+    * Numpy
+
+Todo:
+    * NDA
+
+Sources:
+    * NDA
+
+This code supports Pylint. Rc file in project.
+"""
+import numpy as np
+import pytest
+
+from objects import shapes
+from viewer import meshbuffer
+from viewer import softwaregl
+
+
+@pytest.fixture
+def gl():
+    """Return a fresh software GL module."""
+    return softwaregl.SoftwareGL()
+
+
+def testDrawIssuesOneDrawElements(gl):
+    """Each draw of a primitive is a single glDrawElements of all its indices."""
+    torus = shapes.TorusGeometry(subdAxis=8, subdHeight=6)
+    buffer = meshbuffer.MeshBufferCache(gl).get(torus)
+    for draws in range(1, 4):
+        buffer.draw("lines")
+        assert gl.calls["glDrawElements"] == draws
+    assert gl.drawnVertices == 3 * torus.toMesh().ranges["lines"][1]
+    buffer.draw("triangles")
+    assert gl.calls["glDrawElements"] == 4
+    assert gl.calls["glDrawArrays"] == 0
+
+
+def testUploadedBuffersMatchMesh(gl):
+    """The vertex and index buffers hold the interleaved vertices and the packed indices."""
+    torus = shapes.TorusGeometry(subdAxis=5, subdHeight=4)
+    buffer = meshbuffer.MeshBufferCache(gl).get(torus, normals=True)
+    meshData = torus.toMesh(normals=True)
+    vertexBuffer, indexBuffer = buffer._vbo, buffer._ibo  # pylint: disable=protected-access
+    np.testing.assert_array_equal(gl.bufferArray(vertexBuffer, np.float32).reshape(meshData.vertices.shape), meshData.vertices)
+    np.testing.assert_array_equal(gl.bufferArray(indexBuffer, meshData.indices.dtype), meshData.indices)
+    assert buffer.hasNormals
+    assert sorted(buffer.primitives) == ["lines", "triangles"]
+
+
+def testNoUploadWhenParametersUnchanged(gl):
+    """Getting the buffer again with the same parameters sends nothing to the GPU."""
+    torus = shapes.TorusGeometry()
+    cache = meshbuffer.MeshBufferCache(gl)
+    first = cache.get(torus)
+    uploads = (gl.calls["glBufferData"], gl.calls["glBufferSubData"])
+    for _ in range(3):
+        assert cache.get(torus) is first
+    assert (gl.calls["glBufferData"], gl.calls["glBufferSubData"]) == uploads
+    assert gl.calls["glGenBuffers"] == 1
+
+
+def testScaleChangeOverwritesVerticesOnly(gl):
+    """A non topology change rewrites the vertex buffer in place and keeps the index buffer."""
+    torus = shapes.TorusGeometry(subdAxis=6, subdHeight=6)
+    cache = meshbuffer.MeshBufferCache(gl)
+    buffer = cache.get(torus)
+    bufferData = gl.calls["glBufferData"]
+    torus.set("radius", 2.5)
+    cache.get(torus)
+    assert gl.calls["glBufferData"] == bufferData
+    assert gl.calls["glBufferSubData"] == 1
+    vertices = gl.bufferArray(buffer._vbo, np.float32).reshape(-1, 3)  # pylint: disable=protected-access
+    np.testing.assert_array_equal(vertices, torus.mesh()[0])
+
+
+def testTopologyChangeUploadsAgain(gl):
+    """A topology change uploads both buffers with their new size."""
+    torus = shapes.TorusGeometry(subdAxis=6, subdHeight=6)
+    cache = meshbuffer.MeshBufferCache(gl)
+    buffer = cache.get(torus)
+    bufferData = gl.calls["glBufferData"]
+    torus.set("subdAxis", 12)
+    cache.get(torus)
+    assert gl.calls["glBufferData"] == bufferData + 2
+    assert buffer.vertexCount == 12 * 6
+    gl.drawnVertices = 0
+    buffer.draw("triangles")
+    assert gl.drawnVertices == 12 * 6 * 2 * 3
+
+
+def testRequestingNormalsUploadsAgain(gl):
+    """Asking for normals after a wireframe upload grows the vertex buffer, the indices are rewritten in place."""
+    torus = shapes.TorusGeometry()
+    cache = meshbuffer.MeshBufferCache(gl)
+    buffer = cache.get(torus)
+    assert not buffer.hasNormals
+    bufferData = gl.calls["glBufferData"]
+    cache.get(torus, normals=True)
+    assert buffer.hasNormals
+    assert gl.calls["glBufferData"] == bufferData + 1
+    assert gl.bufferArray(buffer._vbo, np.float32).size == buffer.vertexCount * 6  # pylint: disable=protected-access
+
+
+def testReleaseDeletesBuffers(gl):
+    """Released buffers are deleted and the next get uploads again."""
+    torus = shapes.TorusGeometry()
+    cache = meshbuffer.MeshBufferCache(gl)
+    cache.get(torus)
+    cache.release()
+    assert not gl.buffers
+    cache.get(torus)
+    assert len(gl.buffers) == 2
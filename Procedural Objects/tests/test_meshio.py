@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2019 Giuliano França
+
+MIT License
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+====================================================================================================
+
+How to use:
+    * Run python -m pytest from the Procedural Objects folder.
+    * The files are parsed back with the standard library and numpy only.
+
+Dependencies:
+    * Python 3
+    * Pytest
+    * Numpy
+
+Todo:
+    * NDA
+
+Sources:
+    * https://registry.khronos.org/glTF/specs/2.0/glTF-2.0.html#glb-file-format-specification
+    * http://paulbourke.net/dataformats/ply/
+
+This code supports Pylint. Rc file in project.
+"""
+import json
+import struct
+import numpy as np
+import pytest
+
+from objects import meshio
+from objects import shapes
+
+
+@pytest.fixture
+def meshData():
+    """Return a small torus with normals."""
+    return shapes.TorusGeometry(subdAxis=6, subdHeight=4).toMesh(normals=True)
+
+
+def testGlb(tmp_path, meshData):
+    """The GLB chunks are aligned and the accessors point to the written vertices and indices."""
+    path = str(tmp_path / "torus.glb")
+    meshio.writeGlb(path, meshData)
+    data = open(path, "rb").read()
+    magic, version, length = struct.unpack_from("<4sII", data)
+    assert (magic, version, length) == (b"glTF", 2, len(data))
+    jsonLength, kind = struct.unpack_from("<I4s", data, 12)
+    assert kind == b"JSON" and jsonLength % 4 == 0
+    document = json.loads(data[20:20 + jsonLength])
+    binLength, kind = struct.unpack_from("<I4s", data, 20 + jsonLength)
+    assert kind == b"BIN\x00" and binLength % 4 == 0
+    binary = data[28 + jsonLength:]
+    primitive = document["meshes"][0]["primitives"][0]
+    assert primitive["mode"] == 4
+    assert set(primitive["attributes"]) == {"POSITION", "NORMAL"}
+    view = document["bufferViews"][1]
+    indexAccessor = document["accessors"][primitive["indices"]]
+    indices = np.frombuffer(binary, dtype=meshData.indices.dtype, count=indexAccessor["count"], offset=view["byteOffset"])
+    np.testing.assert_array_equal(indices, meshData.elements["triangles"].ravel())
+    position = document["accessors"][primitive["attributes"]["POSITION"]]
+    np.testing.assert_allclose(position["min"], meshData.positions.min(axis=0))
+
+
+def testPly(tmp_path, meshData):
+    """The PLY header counts match and the face list follows the vertices."""
+    path = str(tmp_path / "torus.ply")
+    meshio.writePly(path, meshData)
+    data = open(path, "rb").read()
+    header, body = data.split(b"end_header\n", 1)
+    lines = header.decode("ascii").splitlines()
+    assert "element vertex %d" % meshData.vertexCount in lines
+    assert "element face %d" % len(meshData.elements["triangles"]) in lines
+    assert len(body) == meshData.vertices.nbytes + len(meshData.elements["triangles"]) * (1 + 3 * meshData.indices.itemsize)
+    vertices = np.frombuffer(body, dtype=np.float32, count=meshData.vertices.size)
+    np.testing.assert_array_equal(vertices.reshape(meshData.vertices.shape), meshData.vertices)
+
+
+def testPlyRejectsPoints(tmp_path, meshData):
+    """PLY has no point element."""
+    with pytest.raises(ValueError):
+        meshio.writePly(str(tmp_path / "torus.ply"), meshData, "points")
+
+
+@pytest.mark.parametrize("primitive,keyword", [("triangles", "f"), ("lines", "l"), ("points", "p")])
+def testObj(tmp_path, meshData, primitive, keyword):
+    """The OBJ file lists every vertex and element with one based indices."""
+    path = str(tmp_path / "torus.obj")
+    meshio.writeObj(path, meshData, primitive)
+    lines = open(path).read().splitlines()
+    vertices = np.array([line.split()[1:] for line in lines if line.startswith("v ")], dtype=np.float32)
+    np.testing.assert_allclose(vertices, meshData.positions, atol=1e-5)
+    assert sum(line.startswith("vn ") for line in lines) == meshData.vertexCount
+    elements = [line.split()[1:] for line in lines if line.startswith(keyword + " ")]
+    expected = meshData.elements[primitive] if primitive in meshData.ranges else np.arange(meshData.vertexCount).reshape(-1, 1)
+    assert len(elements) == len(expected)
+    first = [int(item.split("//")[0]) - 1 for item in elements[0]]
+    assert first == expected[0].tolist()
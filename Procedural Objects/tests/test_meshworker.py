@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2019 Giuliano França
+
+MIT License
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+====================================================================================================
+
+How to use:
+    * Run python -m pytest from the Procedural Objects folder.
+    * The jobs run on a thread held by a gate, so a test can act while a mesh is being built.
+    * With a large synchronousSeconds the meshes after the first one are built in place.
+
+Dependencies:
+    * Python 3
+    * Pytest
+    * Numpy
+
+Todo:
+    * NDA
+
+Sources:
+    * NDA
+
+This code supports Pylint. Rc file in project.
+"""
+import logging
+import threading
+import concurrent.futures
+import numpy as np
+import pytest
+
+from objects import shapes
+from objects import sharedmesh
+from viewer import meshworker
+
+
+class GatedExecutor(object):
+    """Single thread executor whose jobs wait for the gate once they started."""
+
+    def __init__(self):
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self.started = threading.Event()
+        self.gate = threading.Event()
+
+    def submit(self, function, *args):
+        """Run the function on the thread once the gate opens."""
+        def run():
+            self.started.set()
+            self.gate.wait()
+            return function(*args)
+        return self.executor.submit(run)
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        """Open the gate and stop the thread."""
+        self.gate.set()
+        self.executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+
+class BrokenTorus(shapes.TorusGeometry):
+    """Torus that fails to generate with a radius above 2."""
+
+    def scale(self, frame, out):
+        if self.radius > 2.0:
+            raise ValueError("The radius is too large.")
+        super(BrokenTorus, self).scale(frame, out)
+
+
+@pytest.fixture
+def pool():
+    """Return a shared memory pool, closed after the test."""
+    meshPool = sharedmesh.SharedMeshPool()
+    yield meshPool
+    meshPool.close()
+
+
+def testForgetDuringBuildReleasesBlock(pool):
+    """A shape forgotten while its mesh is built gives the block back to the pool."""
+    executor = GatedExecutor()
+    worker = meshworker.MeshWorker(executor=executor, pool=pool)
+    shape = shapes.TorusGeometry()
+    assert worker.latest(shape) is None
+    assert executor.started.wait(5.0)
+    worker.forget(shape)
+    executor.shutdown(wait=True)
+    stats = pool.stats()
+    assert stats["blocks"] == 1
+    assert stats["free"] == 1
+    assert worker.completed == 0
+
+
+def testCompletedMeshKeepsBlock(pool):
+    """A finished mesh holds its block until the shape is forgotten."""
+    executor = GatedExecutor()
+    executor.gate.set()
+    ready = threading.Event()
+    worker = meshworker.MeshWorker(executor=executor, onReady=ready.set, pool=pool)
+    shape = shapes.TorusGeometry()
+    worker.latest(shape)
+    assert ready.wait(5.0)
+    snapshot = worker.latest(shape)
+    assert snapshot is not None and snapshot.block is not None
+    assert pool.stats()["free"] == 0
+    worker.forget(shape)
+    assert pool.stats()["free"] == 1
+    executor.shutdown(wait=True)
+
+
+def testShapeIsKeptBetweenJobs():
+    """The jobs of a shape update one kept shape, the worker job and the ones built in place alike."""
+    executor = GatedExecutor()
+    executor.gate.set()
+    ready = threading.Event()
+    worker = meshworker.MeshWorker(executor=executor, onReady=ready.set, synchronousSeconds=60.0)
+    shape = shapes.TorusGeometry(subdAxis=16, subdHeight=8)
+    worker.latest(shape)
+    assert ready.wait(5.0)
+    kept = meshworker._shapes[id(shape)]  # pylint: disable=protected-access
+    for radius in (2.0, 3.0):
+        shape.set("radius", radius)
+        snapshot = worker.latest(shape)
+        assert meshworker._shapes[id(shape)] is kept  # pylint: disable=protected-access
+        expected = shapes.TorusGeometry(radius=radius, subdAxis=16, subdHeight=8).toMesh()
+        np.testing.assert_array_equal(snapshot.meshData.vertices, expected.vertices)
+    worker.forget(shape)
+    assert id(shape) not in meshworker._shapes  # pylint: disable=protected-access
+    executor.shutdown(wait=True)
+
+
+@pytest.mark.parametrize("synchronousSeconds", [0.0, 60.0])
+def testFailedJobKeepsLastMesh(caplog, synchronousSeconds):
+    """A job that raises is logged and the last completed mesh stays, on the worker or in place."""
+    executor = GatedExecutor()
+    executor.gate.set()
+    ready = threading.Event()
+    worker = meshworker.MeshWorker(executor=executor, onReady=ready.set, synchronousSeconds=synchronousSeconds)
+    shape = BrokenTorus()
+    worker.latest(shape)
+    assert ready.wait(5.0)
+    first = worker.latest(shape)
+    with caplog.at_level(logging.ERROR, logger=meshworker.__name__):
+        shape.set("radius", 3.0)
+        assert worker.latest(shape) is first
+        executor.shutdown(wait=True)
+        assert worker.latest(shape) is first
+    assert [record.exc_info[0] for record in caplog.records] == [ValueError]
+
+
+@pytest.mark.parametrize("synchronousSeconds", [0.0, 60.0])
+def testTwistReusesScratchBuffers(synchronousSeconds):
+    """Twist changes sent through the worker, or built in place, deform in the same work buffers."""
+    executor = GatedExecutor()
+    executor.gate.set()
+    ready = threading.Event()
+    worker = meshworker.MeshWorker(executor=executor, onReady=ready.set, synchronousSeconds=synchronousSeconds)
+    shape = shapes.TorusGeometry(subdAxis=16, subdHeight=8)
+    buffers = None
+    for twist in (30.0, 60.0, 90.0):
+        ready.clear()
+        shape.set("twist", twist)
+        worker.latest(shape)
+        assert not worker.isBusy(shape) or ready.wait(5.0)
+        scratch = meshworker._shapes[id(shape)]._scratch  # pylint: disable=protected-access
+        if buffers is None:
+            buffers = dict(scratch)
+        assert buffers and all(scratch[key] is buffer for key, buffer in buffers.items())
+    expected = shapes.TorusGeometry(subdAxis=16, subdHeight=8, twist=90.0).toMesh()
+    np.testing.assert_array_equal(worker.latest(shape).meshData.vertices, expected.vertices)
+    executor.shutdown(wait=True)
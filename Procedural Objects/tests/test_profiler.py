@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2019 Giuliano França
+
+MIT License
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+====================================================================================================
+
+How to use:
+    * Run python -m pytest from the Procedural Objects folder.
+    * CountingGL wraps SoftwareGL, whose own call counter is the reference.
+
+Dependencies:
+    * Python 3
+    * Pytest
+    * Numpy
+
+Todo:
+    * NDA
+
+Sources:
+    * NDA
+
+This code supports Pylint. Rc file in project.
+"""
+import pytest
+
+from objects import shapes
+from viewer import meshbuffer
+from viewer import profiler
+from viewer import softwaregl
+from viewer import transforms
+
+
+@pytest.fixture
+def softwareGL():
+    """Return a fresh software GL module."""
+    return softwaregl.SoftwareGL()
+
+
+def paintFrame(glApi, cache, shape, camera):
+    """Issue the calls of a viewer frame: clear, load the model view and draw the shape."""
+    glApi.glClear(glApi.GL_COLOR_BUFFER_BIT | glApi.GL_DEPTH_BUFFER_BIT)
+    glApi.glLoadMatrixf(transforms.toGL(camera.modelView))
+    glApi.glColor3f(1.0, 1.0, 1.0)
+    buffer = cache.get(shape)
+    buffer.draw("triangles")
+    buffer.draw("lines")
+
+
+def testCountsMatchSoftwareCalls(softwareGL):
+    """Every call through the proxy is counted once in its frame, the upload frame included."""
+    frameProfiler = profiler.FrameProfiler()
+    countingGL = profiler.CountingGL(softwareGL, frameProfiler)
+    cache = meshbuffer.MeshBufferCache(countingGL)
+    shape = shapes.TorusGeometry(subdAxis=8, subdHeight=6)
+    camera = transforms.Camera()
+    expected = []
+    for radius in (1.0, 1.0, 2.0):
+        shape.set("radius", radius)
+        before = sum(softwareGL.calls.values())
+        frameProfiler.frameBegin()
+        paintFrame(countingGL, cache, shape, camera)
+        frameProfiler.frameEnd()
+        expected.append(sum(softwareGL.calls.values()) - before)
+    assert list(frameProfiler.frameCalls) == expected
+    assert expected[0] > expected[2] > expected[1] >= 5
+    assert frameProfiler.stats()["glCalls"] == pytest.approx(sum(expected) / 3.0)
+
+
+def testConstantsAreNotCounted(softwareGL):
+    """Reading constants costs no call and the counting wrappers are made once per function."""
+    frameProfiler = profiler.FrameProfiler()
+    countingGL = profiler.CountingGL(softwareGL, frameProfiler)
+    frameProfiler.frameBegin()
+    assert countingGL.GL_TRIANGLES == softwareGL.GL_TRIANGLES
+    assert countingGL.glClear is countingGL.glClear
+    frameProfiler.frameEnd()
+    assert list(frameProfiler.frameCalls) == [0]
+    assert not softwareGL.calls
+
+
+def testFrameCountsRestart(softwareGL):
+    """Calls made outside a frame do not leak into the next one."""
+    frameProfiler = profiler.FrameProfiler()
+    countingGL = profiler.CountingGL(softwareGL, frameProfiler)
+    countingGL.glViewport(0, 0, 64, 64)
+    frameProfiler.frameBegin()
+    countingGL.glFlush()
+    frameProfiler.frameEnd()
+    assert list(frameProfiler.frameCalls) == [1]
+    assert softwareGL.calls["glViewport"] == softwareGL.calls["glFlush"] == 1
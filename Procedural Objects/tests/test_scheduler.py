@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2019 Giuliano França
+
+MIT License
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+====================================================================================================
+
+How to use:
+    * Run python -m pytest from the Procedural Objects folder.
+    * The scheduler reads a fake clock that the tests move by hand.
+
+Dependencies:
+    * Python 3
+    * Pytest
+
+Todo:
+    * NDA
+
+Sources:
+    * https://gafferongames.com/post/fix_your_timestep/
+
+This code supports Pylint. Rc file in project.
+"""
+import pytest
+
+from viewer import scheduler
+
+
+class FakeClock(object):
+    """Monotonic clock moved by the tests."""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        """Move the clock forward."""
+        self.now += seconds
+
+
+def tickOnTime(frameScheduler, clock, lateness=0.0):
+    """Move the clock to the next deadline, late by a fraction of the interval, and tick.
+
+    Returns:
+        float: The elapsed seconds returned by the tick.
+    """
+    clock.advance(frameScheduler.nextDelay() / 1000.0 + lateness * frameScheduler.interval)
+    return frameScheduler.tick()
+
+
+@pytest.fixture
+def clock():
+    """Return a fake clock."""
+    return FakeClock()
+
+
+def testDeadlinesDoNotDrift(clock):
+    """Ticks on the deadlines of a fractional rate keep time, the delays are not rounded twice."""
+    frameScheduler = scheduler.FrameScheduler(29.97, adaptive=False, clock=clock)
+    frameScheduler.start()
+    start = clock.now
+    for _ in range(300):
+        tickOnTime(frameScheduler, clock)
+    assert clock.now - start == pytest.approx(300 / 29.97, abs=1e-3)
+    assert (frameScheduler.frames, frameScheduler.lateFrames, frameScheduler.droppedFrames) == (300, 0, 0)
+
+
+def testPendingFrameCoalescesTicks(clock):
+    """Requests made before the pending frame is presented are folded into it."""
+    frameScheduler = scheduler.FrameScheduler(60.0, adaptive=False, clock=clock)
+    frameScheduler.start()
+    tickOnTime(frameScheduler, clock)
+    assert frameScheduler.requestFrame()
+    for coalesced in range(1, 4):
+        tickOnTime(frameScheduler, clock)
+        assert not frameScheduler.requestFrame()
+        assert frameScheduler.coalescedFrames == coalesced
+    frameScheduler.framePresented()
+    tickOnTime(frameScheduler, clock)
+    assert frameScheduler.requestFrame()
+    assert frameScheduler.coalescedFrames == 3
+
+
+def testLateTickAdvancesByElapsedTime(clock):
+    """A tick after missed deadlines returns the real elapsed time, drops them and waits for the next one."""
+    frameScheduler = scheduler.FrameScheduler(10.0, adaptive=False, clock=clock)
+    frameScheduler.start()
+    clock.advance(0.35)
+    assert frameScheduler.tick() == pytest.approx(0.35)
+    assert frameScheduler.droppedFrames == 2
+    assert frameScheduler.nextDelay() == 50
+
+
+def testIdleTimeIsForgotten(clock):
+    """The time spent stopped is not animated nor counted as dropped frames."""
+    frameScheduler = scheduler.FrameScheduler(60.0, adaptive=False, clock=clock)
+    assert frameScheduler.tick() == 0.0
+    tickOnTime(frameScheduler, clock)
+    frameScheduler.stop()
+    assert frameScheduler.nextDelay() == 17
+    clock.advance(10.0)
+    assert frameScheduler.tick() == 0.0
+    assert tickOnTime(frameScheduler, clock) == pytest.approx(1.0 / 60.0, abs=1e-3)
+    assert (frameScheduler.lateFrames, frameScheduler.droppedFrames) == (0, 0)
+
+
+def testAdaptiveRateFollowsMisses(clock):
+    """A window of late frames lowers the rate one step, clean windows raise it back."""
+    frameScheduler = scheduler.FrameScheduler(60.0, window=10, clock=clock)
+    frameScheduler.start()
+    for _ in range(10):
+        tickOnTime(frameScheduler, clock, lateness=0.5)
+    assert frameScheduler.lateFrames == 10
+    assert frameScheduler.targetFps == 30.0
+    for _ in range(frameScheduler.raiseWindows * 10 - 1):
+        tickOnTime(frameScheduler, clock)
+    assert frameScheduler.targetFps == 30.0
+    tickOnTime(frameScheduler, clock)
+    assert frameScheduler.targetFps == 60.0
+
+
+def testAchievedFps(clock):
+    """The achieved rate is measured from the presented frames."""
+    frameScheduler = scheduler.FrameScheduler(60.0, adaptive=False, clock=clock)
+    frameScheduler.start()
+    assert frameScheduler.achievedFps == 0.0
+    for _ in range(20):
+        clock.advance(0.04)
+        frameScheduler.tick()
+        frameScheduler.requestFrame()
+        frameScheduler.framePresented()
+    assert frameScheduler.achievedFps == pytest.approx(25.0)
+    assert frameScheduler.summary().startswith("25.0 / 60.00 FPS")
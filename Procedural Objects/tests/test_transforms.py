@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2019 Giuliano França
+
+MIT License
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+====================================================================================================
+
+How to use:
+    * Run python -m pytest from the Procedural Objects folder.
+    * The matrices are compared with the formulas of the OpenGL reference pages, written out here
+      in float64.
+
+Dependencies:
+    * Python 3
+    * Pytest
+    * Numpy
+
+Todo:
+    * NDA
+
+Sources:
+    * https://www.khronos.org/registry/OpenGL-Refpages/gl2.1/xhtml/glFrustum.xml
+    * https://www.khronos.org/registry/OpenGL-Refpages/gl2.1/xhtml/glRotate.xml
+    * https://www.khronos.org/registry/OpenGL-Refpages/gl2.1/xhtml/gluLookAt.xml
+
+This code supports Pylint. Rc file in project.
+"""
+import math
+import numpy as np
+import pytest
+
+from viewer import transforms
+
+
+def frustum(left, right, bottom, top, near, far):
+    """Return the matrix of glFrustum."""
+    return np.array([[2.0 * near / (right - left), 0.0, (right + left) / (right - left), 0.0],
+                     [0.0, 2.0 * near / (top - bottom), (top + bottom) / (top - bottom), 0.0],
+                     [0.0, 0.0, -(far + near) / (far - near), -2.0 * far * near / (far - near)],
+                     [0.0, 0.0, -1.0, 0.0]])
+
+
+def glRotate(degrees, x, y, z):
+    """Return the matrix of glRotate."""
+    x, y, z = np.array([x, y, z]) / math.sqrt(x * x + y * y + z * z)
+    c = math.cos(math.radians(degrees))
+    s = math.sin(math.radians(degrees))
+    return np.array([[x * x * (1 - c) + c, x * y * (1 - c) - z * s, x * z * (1 - c) + y * s, 0.0],
+                     [y * x * (1 - c) + z * s, y * y * (1 - c) + c, y * z * (1 - c) - x * s, 0.0],
+                     [x * z * (1 - c) - y * s, y * z * (1 - c) + x * s, z * z * (1 - c) + c, 0.0],
+                     [0.0, 0.0, 0.0, 1.0]])
+
+
+def lookAt(eye, center, up):
+    """Return the matrix of gluLookAt."""
+    eye = np.asarray(eye, dtype=np.float64)
+    forward = np.asarray(center, dtype=np.float64) - eye
+    forward /= np.linalg.norm(forward)
+    side = np.cross(forward, up)
+    side /= np.linalg.norm(side)
+    matrix = np.eye(4)
+    matrix[0, :3] = side
+    matrix[1, :3] = np.cross(side, forward)
+    matrix[2, :3] = -forward
+    return matrix @ np.array([[1.0, 0.0, 0.0, -eye[0]], [0.0, 1.0, 0.0, -eye[1]], [0.0, 0.0, 1.0, -eye[2]], [0.0, 0.0, 0.0, 1.0]])
+
+
+@pytest.mark.parametrize("fovY,aspect,near,far", [(45.0, 1.0, 1.0, 100.0), (60.0, 16.0 / 9.0, 0.1, 50.0), (90.0, 0.5, 2.0, 20.0)])
+def testPerspectiveMatchesFrustum(fovY, aspect, near, far):
+    """gluPerspective is the symmetric glFrustum through the field of view."""
+    top = near * math.tan(math.radians(fovY) * 0.5)
+    right = top * aspect
+    matrix = transforms.perspective(fovY, aspect, near, far)
+    assert matrix.dtype == np.float32
+    np.testing.assert_allclose(matrix, frustum(-right, right, -top, top, near, far), rtol=1e-6, atol=1e-7)
+
+
+def testOrthographicMapsBoxToClipCube():
+    """The corners of the glOrtho box land on the corners of the clip cube."""
+    matrix = transforms.orthographic(-2.0, 4.0, -1.0, 3.0, 0.5, 10.0)
+    np.testing.assert_allclose(transforms.transformPoints(matrix, [(-2.0, -1.0, -0.5), (4.0, 3.0, -10.0)]), [(-1.0, -1.0, -1.0), (1.0, 1.0, 1.0)],
+                               atol=1e-6)
+
+
+@pytest.mark.parametrize("axis,degrees", [((0.0, 0.0, 1.0), 90.0), ((1.0, 0.0, 0.0), -30.0), ((1.0, 2.0, 3.0), 123.0)])
+def testRotationMatchesGlRotate(axis, degrees):
+    """rotation() builds the glRotate matrix, also for axes that are not normalized."""
+    np.testing.assert_allclose(transforms.rotation(axis, degrees), glRotate(degrees, *axis), atol=1e-6)
+
+
+def testRotationBatch():
+    """A stack of angles gives the stack of single matrices."""
+    degrees = np.array([0.0, 45.0, 180.0])
+    matrices = transforms.rotation((0.0, 1.0, 0.0), degrees)
+    assert matrices.shape == (3, 4, 4)
+    for matrix, angle in zip(matrices, degrees):
+        np.testing.assert_allclose(matrix, glRotate(angle, 0.0, 1.0, 0.0), atol=1e-6)
+    np.testing.assert_allclose(transforms.rotation((0.0, 0.0, 1.0), 90.0)[:3, :3] @ (1.0, 0.0, 0.0), (0.0, 1.0, 0.0), atol=1e-7)
+
+
+def testEulerFollowsGlRotateOrder():
+    """The Euler quaternion is glRotate around X, then Y, then Z, like the legacy paintGL calls."""
+    expected = glRotate(20.0, 1.0, 0.0, 0.0) @ glRotate(-50.0, 0.0, 1.0, 0.0) @ glRotate(75.0, 0.0, 0.0, 1.0)
+    np.testing.assert_allclose(transforms.quaternionMatrix(transforms.quaternionFromEuler(20.0, -50.0, 75.0)), expected, atol=1e-6)
+
+
+@pytest.mark.parametrize("distance,pitch,yaw", [(5.0, 0.0, 0.0), (10.0, 30.0, 0.0), (3.0, -20.0, 135.0)])
+def testOrbitViewMatchesLookAt(distance, pitch, yaw):
+    """The orbit view is gluLookAt from the orbit position towards the origin."""
+    camera = transforms.Camera(distance=distance)
+    camera.setOrbit(pitch=pitch, yaw=yaw)
+    toWorld = glRotate(-yaw, 0.0, 1.0, 0.0) @ glRotate(-pitch, 1.0, 0.0, 0.0)
+    eye = toWorld[:3, :3] @ (0.0, 0.0, distance)
+    up = toWorld[:3, :3] @ (0.0, 1.0, 0.0)
+    np.testing.assert_allclose(camera.view, lookAt(eye, (0.0, 0.0, 0.0), up), atol=1e-5)
+
+
+def testToGLIsColumnMajor():
+    """glLoadMatrixf reads the translation from elements 12 to 14."""
+    matrix = transforms.translation((1.0, 2.0, 3.0))
+    np.testing.assert_array_equal(transforms.toGL(matrix).ravel()[12:15], (1.0, 2.0, 3.0))
+    assert transforms.toGL(matrix).flags.c_contiguous
+
+
+def testCameraCachesProducts():
+    """The products are rebuilt only after a change, which bumps the revision."""
+    camera = transforms.Camera(45.0, 1.5, 1.0, 100.0, 5.0)
+    mvp = camera.mvp
+    revision = camera.revision
+    camera.setPerspective(fovY=45.0)
+    camera.setOrbit(distance=5.0)
+    assert camera.mvp is mvp and camera.revision == revision
+    camera.setRotation(transforms.quaternion((0.0, 1.0, 0.0), 90.0))
+    assert camera.revision == revision + 1
+    np.testing.assert_allclose(camera.mvp, camera.projection @ camera.view @ glRotate(90.0, 0.0, 1.0, 0.0), atol=1e-6)
@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2019 Giuliano França
+
+MIT License
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+====================================================================================================
+
+How to use:
+    * Extract the planes of the view frustum from the model view projection of the camera with
+      frustumPlanes().
+    * Test a few bounding spheres or boxes with spheresVisible() and boxesVisible().
+    * For many objects, build a BoundingVolumeHierarchy once from their positions, refit() it when
+      their bounds change and query() it with the planes on every paint.
+
+Dependencies:
+    * Python 3
+    * Numpy
+
+Todo:
+    * NDA
+
+Sources:
+    * https://www.gamedevs.org/uploads/fast-extraction-viewing-frustum-planes-from-world-view-projection-matrix.pdf
+    * https://fgiesen.wordpress.com/2010/10/17/view-frustum-culling/
+    * https://en.wikipedia.org/wiki/Bounding_volume_hierarchy
+
+This code supports Pylint. Rc file in project.
+"""
+import numpy as np
+
+
+def frustumPlanes(matrix):
+    """Extract the six planes of the view frustum from a projection matrix.
+
+    The planes come out in the space the matrix transforms from: world space for the model view
+    projection, object space for its product with a model matrix.
+
+    Args:
+        matrix (numpy.ndarray): The row major projection, or projection times model view, with
+            shape (4, 4).
+
+    Returns:
+        numpy.ndarray: The float64 planes with shape (6, 4), left, right, bottom, top, near and
+            far. Each row holds a unit normal pointing inside and the offset, so a point p is
+            inside a plane when dot(normal, p) + offset >= 0.
+    """
+    matrix = np.asarray(matrix, dtype=np.float64)
+    planes = np.empty((6, 4), dtype=np.float64)
+    planes[0::2] = matrix[3] + matrix[:3]
+    planes[1::2] = matrix[3] - matrix[:3]
+    planes /= np.linalg.norm(planes[:, :3], axis=1)[:, np.newaxis]
+    return planes
+
+
+def spheresVisible(planes, centers, radii):
+    """Test bounding spheres against the frustum.
+
+    Args:
+        planes (numpy.ndarray): The planes returned by frustumPlanes().
+        centers (numpy.ndarray): The sphere centers with shape (N, 3).
+        radii (numpy.ndarray): The sphere radii with shape (N,).
+
+    Returns:
+        numpy.ndarray: True for the spheres that are at least partly inside.
+    """
+    distances = np.reshape(centers, (-1, 3)) @ planes[:, :3].T + planes[:, 3]
+    return np.all(distances >= -np.reshape(radii, (-1, 1)), axis=1)
+
+
+def classifyBoxes(planes, minimum, maximum):
+    """Find the axis aligned boxes that are fully outside or fully inside the frustum.
+
+    Each box is projected on the plane normals, so a box is tested against the six planes with a
+    few matrix products instead of its eight corners.
+
+    Args:
+        planes (numpy.ndarray): The planes returned by frustumPlanes().
+        minimum (numpy.ndarray): The minimum corners with shape (N, 3).
+        maximum (numpy.ndarray): The maximum corners with shape (N, 3).
+
+    Returns:
+        tuple: Two bool arrays, True for the boxes outside and for the boxes inside. The boxes
+            crossing a plane are in neither.
+    """
+    centers = (minimum + maximum) * 0.5
+    extents = (maximum - minimum) * 0.5
+    distances = centers @ planes[:, :3].T + planes[:, 3]
+    reach = extents @ np.abs(planes[:, :3]).T
+    return np.any(distances < -reach, axis=1), np.all(distances >= reach, axis=1)
+
+
+def boxesVisible(planes, minimum, maximum):
+    """Test axis aligned bounding boxes against the frustum.
+
+    Boxes crossing the frustum corners may pass the test while outside, which only costs a draw.
+
+    Args:
+        planes (numpy.ndarray): The planes returned by frustumPlanes().
+        minimum (numpy.ndarray): The minimum corners with shape (N, 3).
+        maximum (numpy.ndarray): The maximum corners with shape (N, 3).
+
+    Returns:
+        numpy.ndarray: True for the boxes that are at least partly inside.
+    """
+    outside, _ = classifyBoxes(planes, np.reshape(minimum, (-1, 3)), np.reshape(maximum, (-1, 3)))
+    return ~outside
+
+
+def transformBoxes(matrices, box):
+    """Return the world space axis aligned boxes of transformed copies of a box.
+
+    Args:
+        matrices (numpy.ndarray): The row major transforms with shape (N, 4, 4).
+        box (numpy.ndarray): The object space box as minimum and maximum corners, shape (2, 3).
+
+    Returns:
+        tuple: The minimum and maximum corners of the boxes enclosing each transformed box, both
+            with shape (N, 3).
+    """
+    box = np.asarray(box, dtype=np.float64)
+    center = (box[0] + box[1]) * 0.5
+    extent = (box[1] - box[0]) * 0.5
+    linear = matrices[:, :3, :3]
+    centers = linear @ center + matrices[:, :3, 3]
+    extents = np.abs(linear) @ extent
+    return centers - extents, centers + extents
+
+
+def _gather(order, starts, counts):
+    """Concatenate the slices order[start:start + count] without a python loop."""
+    total = int(counts.sum())
+    if not total:
+        return order[:0]
+    offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+    return order[offsets + np.arange(total)]
+
+
+class BoundingVolumeHierarchy(object):
+    """Binary tree of axis aligned boxes over a set of objects, queried with the frustum planes.
+
+    The tree is split at the median of the object positions along the longest axis, so its shape
+    only depends on the positions. When the objects keep their place but their bounds change,
+    refit() updates the boxes without rebuilding the tree.
+
+    A query walks the tree one level at a time and tests the whole level with classifyBoxes().
+    Subtrees fully inside are accepted without testing their children and the objects of the
+    leaves crossing a plane are tested one by one.
+    """
+
+    def __init__(self, positions, leafSize=16):
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+        self.leafSize = max(1, leafSize)
+        self.order = np.arange(len(positions))
+        starts, counts, children, depths = [], [], [], []
+        stack = [(0, len(positions), -1, 0, 0)]
+        while stack:
+            start, stop, parent, side, depth = stack.pop()
+            node = len(starts)
+            starts.append(start)
+            counts.append(stop - start)
+            children.append([-1, -1])
+            depths.append(depth)
+            if parent >= 0:
+                children[parent][side] = node
+            if stop - start <= self.leafSize:
+                continue
+            items = self.order[start:stop]
+            axis = int(np.argmax(np.ptp(positions[items], axis=0)))
+            middle = (stop - start) // 2
+            self.order[start:stop] = items[np.argpartition(positions[items, axis], middle)]
+            stack.append((start + middle, stop, node, 1, depth + 1))
+            stack.append((start, start + middle, node, 0, depth + 1))
+        self.starts = np.array(starts, dtype=np.int64)
+        self.counts = np.array(counts, dtype=np.int64)
+        self.children = np.array(children, dtype=np.int64).reshape(-1, 2)
+        self._leaves = np.flatnonzero(self.children[:, 0] < 0)
+        depths = np.array(depths, dtype=np.int64)
+        # Inner nodes grouped by depth, deepest first, for refit().
+        self._levels = [np.flatnonzero((depths == depth) & (self.children[:, 0] >= 0)) for depth in range(int(depths.max(initial=0)), -1, -1)]
+        self.minimum = np.zeros((len(starts), 3), dtype=np.float64)
+        self.maximum = np.zeros((len(starts), 3), dtype=np.float64)
+        self._itemMinimum = None
+        self._itemMaximum = None
+        self.testedNodes = 0
+
+    def __len__(self):
+        return len(self.order)
+
+    @property
+    def nodeCount(self):
+        """Return the number of nodes of the tree.
+
+        Returns:
+            int: The inner and leaf node count.
+        """
+        return len(self.starts)
+
+    def refit(self, minimum, maximum):
+        """Set the bounds of the objects and update the boxes of every node.
+
+        Args:
+            minimum (numpy.ndarray): The minimum corners of the object boxes with shape (N, 3),
+                in the order of the positions given to the constructor.
+            maximum (numpy.ndarray): The maximum corners with shape (N, 3).
+        """
+        self._itemMinimum = np.asarray(minimum, dtype=np.float64).reshape(-1, 3)
+        self._itemMaximum = np.asarray(maximum, dtype=np.float64).reshape(-1, 3)
+        if not len(self.order):
+            return
+        # The leaves split the ordered objects in consecutive runs, sorted by their start.
+        leaves = self._leaves[np.argsort(self.starts[self._leaves])]
+        self.minimum[leaves] = np.minimum.reduceat(self._itemMinimum[self.order], self.starts[leaves])
+        self.maximum[leaves] = np.maximum.reduceat(self._itemMaximum[self.order], self.starts[leaves])
+        for nodes in self._levels:
+            left, right = self.children[nodes, 0], self.children[nodes, 1]
+            self.minimum[nodes] = np.minimum(self.minimum[left], self.minimum[right])
+            self.maximum[nodes] = np.maximum(self.maximum[left], self.maximum[right])
+
+    def query(self, planes):
+        """Find the objects whose box is at least partly inside the frustum.
+
+        Args:
+            planes (numpy.ndarray): The planes returned by frustumPlanes().
+
+        Returns:
+            numpy.ndarray: The sorted indices of the visible objects.
+        """
+        self.testedNodes = 0
+        if not len(self.order) or self._itemMinimum is None:
+            return self.order[:0]
+        accepted = []
+        nodes = np.zeros(1, dtype=np.int64)
+        while len(nodes):
+            self.testedNodes += len(nodes)
+            outside, inside = classifyBoxes(planes, self.minimum[nodes], self.maximum[nodes])
+            accepted.append(_gather(self.order, self.starts[nodes[inside]], self.counts[nodes[inside]]))
+            crossing = nodes[~(outside | inside)]
+            isLeaf = self.children[crossing, 0] < 0
+            leaves = crossing[isLeaf]
+            if len(leaves):
+                items = _gather(self.order, self.starts[leaves], self.counts[leaves])
+                accepted.append(items[boxesVisible(planes, self._itemMinimum[items], self._itemMaximum[items])])
+            nodes = self.children[crossing[~isLeaf]].ravel()
+        visible = np.concatenate(accepted)
+        visible.sort()
+        return visible
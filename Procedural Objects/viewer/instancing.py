@@ -0,0 +1,596 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2019 Giuliano França
+
+MIT License
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+====================================================================================================
+
+How to use:
+    * Create an InstancedScene with the MeshBufferCache of the view.
+    * Add instances of a procedural object with add(), giving their transforms and colors.
+    * Call draw() on every paint with the render mode of the view. Each object is drawn with one
+      instanced draw call per primitive, whatever the number of its instances. The instances outside the view are culled first, read drawnCount
+      and culledCount for the result of the last draw.
+
+Dependencies:
+    * Python 3
+    * PyOpenGL
+    * Numpy
+
+Todo:
+    * NDA
+
+Sources:
+    * https://www.khronos.org/opengl/wiki/Vertex_Rendering#Instancing
+    * https://www.khronos.org/opengl/wiki/Vertex_Specification#Instanced_arrays
+
+This code supports Pylint. Rc file in project.
+"""
+import ctypes
+import numpy as np
+
+from viewer import culling
+from viewer import shaders
+from viewer import transforms
+
+
+# Layout of one instance in the instance buffer. The transform is stored column major, as GL expects.
+kInstanceDtype = np.dtype([("transform", np.float32, (4, 4)),
+                           ("color", np.float32, (4,))])
+
+# The mat4 attribute takes the four locations from kTransformLocation. Location 0 is avoided
+# because some drivers alias it with gl_Vertex.
+kTransformLocation = 4
+kColorLocation = 8
+
+kVertexShader = """
+#version 120
+uniform mat4 modelViewProjection;
+attribute mat4 instanceTransform;
+attribute vec4 instanceColor;
+varying vec4 color;
+
+void main()
+{
+    gl_Position = modelViewProjection * (instanceTransform * gl_Vertex);
+    color = instanceColor;
+}
+"""
+
+kFragmentShader = """
+#version 120
+varying vec4 color;
+
+void main()
+{
+    gl_FragColor = color;
+}
+"""
+
+kShadedVertexShader = """
+#version 120
+uniform mat4 modelViewProjection;
+uniform mat4 modelView;
+attribute mat4 instanceTransform;
+attribute vec4 instanceColor;
+varying vec4 color;
+varying vec3 eyePosition;
+
+void main()
+{
+    vec4 position = instanceTransform * gl_Vertex;
+    eyePosition = (modelView * position).xyz;
+    gl_Position = modelViewProjection * position;
+    color = instanceColor;
+}
+"""
+
+# Flat shading from the screen space derivatives, as the flat program of the shaders module, since
+# the instanced meshes are uploaded without normals.
+kShadedFragmentShader = """
+#version 120
+varying vec4 color;
+varying vec3 eyePosition;
+
+void main()
+{
+    vec3 normal = normalize(cross(dFdx(eyePosition), dFdy(eyePosition)));
+    gl_FragColor = vec4(color.rgb * (0.25 + 0.75 * abs(normal.z)), color.a);
+}
+"""
+
+# Shader sources of the instanced programs.
+kPrograms = {"wireframe": (kVertexShader, kFragmentShader),
+             "shaded": (kShadedVertexShader, kShadedFragmentShader)}
+
+# Primitives drawn by each render mode of the view, with the program drawing them. The shaded modes
+# draw the wireframe over the faces, as shaders.drawMesh() does.
+kModePrimitives = {"wireframe": (("lines", "wireframe"),),
+                   "flat": (("triangles", "shaded"), ("lines", "wireframe")),
+                   "smooth": (("triangles", "shaded"), ("lines", "wireframe"))}
+
+
+def lattice(count, spacing=1.0, scale=1.0):
+    """Lay out instances on a square grid in the XY plane, centered at the origin.
+
+    Args:
+        count (int): Number of instances.
+        spacing (float): Distance between two neighbour instances.
+        scale (float): Uniform scale of every instance.
+
+    Returns:
+        numpy.ndarray: The float32 transforms with shape (count, 4, 4), row major.
+    """
+    side = max(1, int(np.ceil(np.sqrt(count))))
+    index = np.arange(count)
+    offsets = np.zeros((count, 3), dtype=np.float32)
+    offsets[:, 0] = (index % side - (side - 1) * 0.5) * spacing
+    offsets[:, 1] = ((side - 1) * 0.5 - index // side) * spacing
+    return transforms.translation(offsets) @ transforms.scaling(scale)
+
+
+def latticeColors(count):
+    """Return a color gradient over the cells of a lattice.
+
+    Args:
+        count (int): Number of instances.
+
+    Returns:
+        numpy.ndarray: The float32 RGBA colors with shape (count, 4).
+    """
+    side = max(1, int(np.ceil(np.sqrt(count))))
+    index = np.arange(count)
+    colors = np.ones((count, 4), dtype=np.float32)
+    colors[:, 0] = 0.35 + 0.65 * (index % side) / max(1, side - 1)
+    colors[:, 1] = 0.35 + 0.65 * (index // side) / max(1, side - 1)
+    colors[:, 2] = 1.35 - colors[:, 0]
+    return colors
+
+
+class InstanceBuffer(object):
+    """Per instance transforms and colors kept in a structured array and mirrored in a GPU buffer.
+
+    Instances are addressed by handles that stay valid while other instances are removed. Removing
+    moves the last instance into the hole, so the array stays packed, and only the modified slots
+    are sent to the GPU on the next sync(). The revision counter increases on every change.
+
+    When only some instances are visible, sync() packs them at the start of the GPU buffer instead,
+    and the whole buffer is sent again once all of them are drawn.
+    """
+
+    def __init__(self, glModule, capacity=64):
+        self.gl = glModule
+        self.data = np.zeros(capacity, dtype=kInstanceDtype)
+        self.count = 0
+        self._handles = np.zeros(capacity, dtype=np.int64)
+        self._slots = {}
+        self._nextHandle = 0
+        self._vbo = None
+        self._allocated = 0
+        self._dirty = None
+        self._packed = None
+        self.revision = 0
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def instances(self):
+        """Return the packed instances.
+
+        Returns:
+            numpy.ndarray: A view of the used part of the structured array.
+        """
+        return self.data[:self.count]
+
+    def _reserve(self, count):
+        """Grow the storage, doubling its size, until it fits count instances."""
+        capacity = len(self.data)
+        if count <= capacity:
+            return
+        while capacity < count:
+            capacity *= 2
+        data = np.zeros(capacity, dtype=kInstanceDtype)
+        data[:self.count] = self.data[:self.count]
+        handles = np.zeros(capacity, dtype=np.int64)
+        handles[:self.count] = self._handles[:self.count]
+        self.data = data
+        self._handles = handles
+
+    def _markDirty(self, start, stop):
+        """Extend the range of slots to send on the next sync()."""
+        self.revision += 1
+        if self._dirty is None:
+            self._dirty = (start, stop)
+        else:
+            self._dirty = (min(self._dirty[0], start), max(self._dirty[1], stop))
+
+    def _slotsOf(self, handles):
+        """Return the slots of the given handles."""
+        return np.fromiter((self._slots[handle] for handle in np.ravel(handles).tolist()), dtype=np.int64)
+
+    def add(self, matrices, colors=None):
+        """Add instances.
+
+        Args:
+            matrices (numpy.ndarray): The row major transforms with shape (N, 4, 4) or (4, 4).
+            colors (numpy.ndarray): Optional RGBA colors with shape (N, 4) or (4,). Defaults to white.
+
+        Returns:
+            numpy.ndarray: The handles of the new instances.
+        """
+        matrices = transforms.toGL(np.reshape(matrices, (-1, 4, 4)))
+        start = self.count
+        stop = start + len(matrices)
+        self._reserve(stop)
+        self.data["transform"][start:stop] = matrices
+        self.data["color"][start:stop] = 1.0 if colors is None else colors
+        handles = np.arange(self._nextHandle, self._nextHandle + len(matrices), dtype=np.int64)
+        self._nextHandle += len(matrices)
+        self._handles[start:stop] = handles
+        self._slots.update(zip(handles.tolist(), range(start, stop)))
+        self.count = stop
+        self._markDirty(start, stop)
+        return handles
+
+    def update(self, handles, matrices=None, colors=None):
+        """Change the transforms or colors of existing instances.
+
+        Args:
+            handles (numpy.ndarray): The handles returned by add().
+            matrices (numpy.ndarray): Optional new row major transforms.
+            colors (numpy.ndarray): Optional new RGBA colors.
+        """
+        slots = self._slotsOf(handles)
+        if not len(slots):
+            return
+        if matrices is not None:
+            self.data["transform"][slots] = transforms.toGL(np.reshape(matrices, (-1, 4, 4)))
+        if colors is not None:
+            self.data["color"][slots] = colors
+        self._markDirty(int(slots.min()), int(slots.max()) + 1)
+
+    def remove(self, handles):
+        """Remove instances, moving the last instances into the freed slots.
+
+        Args:
+            handles (numpy.ndarray): The handles returned by add().
+        """
+        for handle in np.ravel(handles).tolist():
+            slot = self._slots.pop(handle)
+            last = self.count - 1
+            if slot != last:
+                self.data[slot] = self.data[last]
+                moved = int(self._handles[last])
+                self._handles[slot] = moved
+                self._slots[moved] = slot
+                self._markDirty(slot, slot + 1)
+            self.count = last
+        self.revision += 1
+
+    def clear(self):
+        """Remove all instances."""
+        self.count = 0
+        self._slots = {}
+        self._dirty = None
+        self.revision += 1
+
+    def sync(self, slots=None):
+        """Send the modified instances to the GPU.
+
+        The buffer is reallocated only when the storage grew, otherwise only the dirty slots are
+        overwritten.
+
+        Args:
+            slots (numpy.ndarray): Optional sorted slots of the instances to draw. They are packed
+                at the start of the buffer, and sent again only when they or the instances changed.
+        """
+        gl = self.gl
+        if self._vbo is None:
+            self._vbo = gl.glGenBuffers(1)
+        if slots is not None and len(slots) < self.count:
+            self._syncPacked(slots)
+            return
+        if self._packed is not None:
+            self._packed = None
+            self._dirty = (0, self.count)
+        if self._allocated != self.data.nbytes:
+            gl.glBindBuffer(gl.GL_ARRAY_BUFFER, self._vbo)
+            gl.glBufferData(gl.GL_ARRAY_BUFFER, self.data.nbytes, self.data, gl.GL_DYNAMIC_DRAW)
+            self._allocated = self.data.nbytes
+        elif self._dirty is not None and self._dirty[0] < self.count:
+            start, stop = self._dirty[0], min(self._dirty[1], self.count)
+            gl.glBindBuffer(gl.GL_ARRAY_BUFFER, self._vbo)
+            gl.glBufferSubData(gl.GL_ARRAY_BUFFER, start * kInstanceDtype.itemsize, (stop - start) * kInstanceDtype.itemsize,
+                               self.data[start:stop])
+        else:
+            self._dirty = None
+            return
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, 0)
+        self._dirty = None
+
+    def _syncPacked(self, slots):
+        """Send the instances of the given slots at the start of the buffer."""
+        if self._packed is not None and self._packed[0] == self.revision and np.array_equal(self._packed[1], slots):
+            return
+        gl = self.gl
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, self._vbo)
+        if self._allocated != self.data.nbytes:
+            gl.glBufferData(gl.GL_ARRAY_BUFFER, self.data.nbytes, None, gl.GL_DYNAMIC_DRAW)
+            self._allocated = self.data.nbytes
+        if len(slots):
+            packed = self.data[slots]
+            gl.glBufferSubData(gl.GL_ARRAY_BUFFER, 0, packed.nbytes, packed)
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, 0)
+        self._packed = (self.revision, slots)
+        self._dirty = None
+
+    def bind(self):
+        """Point the instanced attributes to the buffer. Pair every call with unbind()."""
+        gl = self.gl
+        stride = kInstanceDtype.itemsize
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, self._vbo)
+        for column in range(4):
+            location = kTransformLocation + column
+            gl.glEnableVertexAttribArray(location)
+            gl.glVertexAttribPointer(location, 4, gl.GL_FLOAT, gl.GL_FALSE, stride, ctypes.c_void_p(column * 16))
+            gl.glVertexAttribDivisor(location, 1)
+        gl.glEnableVertexAttribArray(kColorLocation)
+        gl.glVertexAttribPointer(kColorLocation, 4, gl.GL_FLOAT, gl.GL_FALSE, stride, ctypes.c_void_p(kInstanceDtype.fields["color"][1]))
+        gl.glVertexAttribDivisor(kColorLocation, 1)
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, 0)
+
+    def unbind(self):
+        """Disable the instanced attributes enabled by bind()."""
+        for location in range(kTransformLocation, kColorLocation + 1):
+            self.gl.glDisableVertexAttribArray(location)
+
+    def release(self):
+        """Delete the GPU buffer. The GL context must be current."""
+        if self._vbo is not None:
+            self.gl.glDeleteBuffers(1, [self._vbo])
+        self._vbo = None
+        self._allocated = 0
+        self._packed = None
+
+
+class InstancedScene(object):
+    """Procedural objects drawn many times, with one draw call per object.
+
+    The mesh of every object is taken from a MeshBufferCache, so it is generated and uploaded once
+    and reused by all of its instances. Without instancing support in the context the instances
+    are drawn one by one with the fixed function matrix stack, which must hold the camera matrices.
+    With a mesh worker the meshes are generated in the background and the objects are skipped
+    until their first mesh is ready.
+
+    With culling enabled, the instances of each object are sorted in a BoundingVolumeHierarchy
+    rebuilt when they change and refitted when the bounds of the mesh change. Only the instances
+    inside the view frustum are sent to the draw call, and the objects without any are skipped.
+    """
+
+    def __init__(self, meshBuffers, meshWorker=None, culling=True):
+        self.meshBuffers = meshBuffers
+        self.meshWorker = meshWorker
+        self.culling = culling
+        self.drawnCount = 0
+        self.culledCount = 0
+        self._batches = {}
+        self._hierarchies = {}
+        self._programs = {}
+        self._instanced = None
+
+    @property
+    def gl(self):
+        """Return the GL module of the mesh buffers, so a profiling wrapper is shared."""
+        return self.meshBuffers.gl
+
+    @property
+    def instanceCount(self):
+        """Return the number of instances in the scene.
+
+        Returns:
+            int: The number of instances of all objects.
+        """
+        return sum(len(batch) for _, batch in self._batches.values())
+
+    def _batch(self, obj):
+        """Return the instance buffer of an object, creating it if needed."""
+        entry = self._batches.get(id(obj))
+        if entry is None:
+            entry = (obj, InstanceBuffer(self.gl))
+            self._batches[id(obj)] = entry
+        return entry[1]
+
+    def add(self, obj, matrices, colors=None):
+        """Add instances of a procedural object.
+
+        Args:
+            obj (instance): A procedural object with the parameters and topologyParameters properties
+                and the mesh method.
+            matrices (numpy.ndarray): The row major transforms with shape (N, 4, 4).
+            colors (numpy.ndarray): Optional RGBA colors with shape (N, 4).
+
+        Returns:
+            numpy.ndarray: The handles of the new instances.
+        """
+        return self._batch(obj).add(matrices, colors)
+
+    def update(self, obj, handles, matrices=None, colors=None):
+        """Change the transforms or colors of instances of an object.
+
+        Args:
+            obj (instance): The object the instances were added with.
+            handles (numpy.ndarray): The handles returned by add().
+            matrices (numpy.ndarray): Optional new row major transforms.
+            colors (numpy.ndarray): Optional new RGBA colors.
+        """
+        self._batch(obj).update(handles, matrices, colors)
+
+    def remove(self, obj, handles):
+        """Remove instances of an object.
+
+        Args:
+            obj (instance): The object the instances were added with.
+            handles (numpy.ndarray): The handles returned by add().
+        """
+        self._batch(obj).remove(handles)
+
+    def clear(self):
+        """Remove all instances, keeping the GPU buffers for reuse."""
+        for _, batch in self._batches.values():
+            batch.clear()
+
+    def _visibleSlots(self, obj, batch, buffer, planes):
+        """Return the slots of the instances of an object inside the frustum.
+
+        Returns:
+            numpy.ndarray: The sorted slots, or None to draw all instances.
+        """
+        if not self.culling or buffer.box is None:
+            return None
+        entry = self._hierarchies.get(id(obj))
+        # The GPU layout is column major, its transpose is the row major transform.
+        matrices = batch.instances["transform"].transpose(0, 2, 1)
+        if entry is None or entry[0] != batch.revision:
+            entry = [batch.revision, None, culling.BoundingVolumeHierarchy(matrices[:, :3, 3])]
+            self._hierarchies[id(obj)] = entry
+        hierarchy = entry[2]
+        box = tuple(buffer.box.ravel().tolist())
+        if entry[1] != box:
+            hierarchy.refit(*culling.transformBoxes(matrices, buffer.box))
+            entry[1] = box
+        return hierarchy.query(planes)
+
+    def _buffer(self, obj):
+        """Return the mesh buffer of an object, or None while its first mesh is generated."""
+        if self.meshWorker is None:
+            return self.meshBuffers.get(obj)
+        snapshot = self.meshWorker.latest(obj)
+        return None if snapshot is None else self.meshBuffers.get(snapshot, key=id(obj))
+
+    def _supportsInstancing(self):
+        """Check if instanced arrays can be used and build the programs on first use.
+
+        Returns:
+            bool: True if the instanced path is available.
+        """
+        if self._instanced is None:
+            gl = self.gl
+            self._instanced = bool(getattr(gl, "glDrawElementsInstanced", None)) and bool(getattr(gl, "glVertexAttribDivisor", None))
+            if self._instanced:
+                try:
+                    for name, (vertexSource, fragmentSource) in kPrograms.items():
+                        program = shaders.compileProgram(gl, vertexSource, fragmentSource,
+                                                         {"instanceTransform": kTransformLocation,
+                                                          "instanceColor": kColorLocation})
+                        # The program, its camera uniform locations and the camera last uploaded.
+                        self._programs[name] = [program, gl.glGetUniformLocation(program, "modelViewProjection"),
+                                                gl.glGetUniformLocation(program, "modelView"), None]
+                except shaders.ShaderError:
+                    self._deletePrograms()
+                    self._instanced = False
+        return self._instanced
+
+    def _useProgram(self, name, camera):
+        """Bind an instanced program, uploading the camera only when it changed since its last use."""
+        gl = self.gl
+        entry = self._programs[name]
+        program, mvpLocation, modelViewLocation, uploaded = entry
+        gl.glUseProgram(program)
+        if uploaded != (id(camera), camera.revision):
+            gl.glUniformMatrix4fv(mvpLocation, 1, gl.GL_FALSE, transforms.toGL(camera.mvp))
+            if modelViewLocation != -1:
+                gl.glUniformMatrix4fv(modelViewLocation, 1, gl.GL_FALSE, transforms.toGL(camera.modelView))
+            entry[3] = (id(camera), camera.revision)
+
+    def draw(self, camera, mode="wireframe"):
+        """Draw all instances.
+
+        Args:
+            camera (Camera): The camera of the view. Its matrices are uploaded only when they
+                changed since the last draw.
+            mode (str): "wireframe", "flat" or "smooth", the render mode of the view. The shaded
+                modes are flat shaded, the instanced meshes having no normals.
+        """
+        gl = self.gl
+        self.drawnCount = self.culledCount = 0
+        batches = [(obj, batch) for obj, batch in self._batches.values() if len(batch)]
+        if not batches:
+            return
+        planes = culling.frustumPlanes(camera.mvp)
+        visible = []
+        for obj, batch in batches:
+            buffer = self._buffer(obj)
+            if buffer is None:
+                continue
+            slots = self._visibleSlots(obj, batch, buffer, planes)
+            count = len(batch) if slots is None else len(slots)
+            self.drawnCount += count
+            self.culledCount += len(batch) - count
+            if count:
+                visible.append((buffer, batch, slots))
+        if not visible:
+            return
+        primitives = kModePrimitives[mode]
+        if not self._supportsInstancing():
+            self._drawFallback(visible, [primitive for primitive, _ in primitives])
+            return
+        for primitive, program in primitives:
+            self._useProgram(program, camera)
+            for buffer, batch, slots in visible:
+                batch.gl = gl
+                batch.sync(slots)
+                buffer.bind()
+                batch.bind()
+                buffer.drawBound(primitive, len(batch) if slots is None else len(slots))
+                batch.unbind()
+                buffer.unbind()
+        gl.glUseProgram(0)
+
+    def _drawFallback(self, batches, primitives):
+        """Draw the instances one by one with the fixed function pipeline."""
+        gl = self.gl
+        for buffer, batch, slots in batches:
+            buffer.bind()
+            for instance in (batch.instances if slots is None else batch.instances[slots]):
+                gl.glPushMatrix()
+                gl.glMultMatrixf(instance["transform"])
+                gl.glColor4fv(instance["color"])
+                for primitive in primitives:
+                    buffer.drawBound(primitive)
+                gl.glPopMatrix()
+            buffer.unbind()
+
+    def release(self):
+        """Delete the instance buffers and the program. The GL context must be current."""
+        for _, batch in self._batches.values():
+            batch.gl = self.gl
+            batch.release()
+        self._hierarchies = {}
+        self._deletePrograms()
+        self._instanced = None
+
+    def _deletePrograms(self):
+        """Delete the instanced programs built so far."""
+        for program, _, _, _ in self._programs.values():
+            self.gl.glDeleteProgram(program)
+        self._programs = {}
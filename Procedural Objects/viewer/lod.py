@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2019 Giuliano França
+
+MIT License
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+====================================================================================================
+
+How to use:
+    * Create a LodChain for each shape and a LodSelector for the view.
+    * Measure the projected size of the objects with projectedSize() and pick their level with
+      select() for a single object or selectMany() for a batch of instances.
+    * Draw chain[level] instead of the shape.
+
+Dependencies:
+    * Python 3
+    * Numpy
+
+Todo:
+    * NDA
+
+Sources:
+    * https://en.wikipedia.org/wiki/Level_of_detail_(computer_graphics)
+
+This code supports Pylint. Rc file in project.
+"""
+import math
+import numpy as np
+
+
+def projectedSize(radius, depth, fovY, viewportHeight):
+    """Estimate the height in pixels of a bounding sphere seen through a gluPerspective projection.
+
+    Args:
+        radius (float or numpy.ndarray): The radius of the bounding spheres.
+        depth (float or numpy.ndarray): The distance of the sphere centers along the view axis.
+        fovY (float): The vertical field of view in degrees.
+        viewportHeight (int): The height of the viewport in pixels.
+
+    Returns:
+        float or numpy.ndarray: The projected diameters in pixels. Spheres crossing the near side
+            of the camera get the full viewport height.
+    """
+    depth = np.maximum(depth, radius)
+    size = np.asarray(radius) * viewportHeight / (np.asarray(depth) * math.tan(math.radians(fovY) * 0.5))
+    return np.minimum(size, float(viewportHeight)) if np.ndim(size) else min(float(size), float(viewportHeight))
+
+
+class LodChain(object):
+    """Copies of a shape with fewer subdivisions, the subdivisions being halved at every level.
+
+    Level 0 is the shape itself. The copies follow the parameters of the shape and, as every
+    shape, fetch their frames from the shared geometry cache, so each level is generated once per
+    topology. A level that would not reduce any subdivision is dropped, the chain of a shape
+    without LOD parameters only holds the shape.
+    """
+
+    def __init__(self, shape, levels=5):
+        self.shape = getattr(shape, "geometry", shape)
+        self._copies = [type(self.shape)() for _ in range(1, levels)]
+        self._chain = [self.shape]
+        self._parameters = None
+
+    def __len__(self):
+        self._sync()
+        return len(self._chain)
+
+    def __getitem__(self, level):
+        self._sync()
+        return self._chain[level]
+
+    def _sync(self):
+        """Copy the parameters of the shape to the coarser levels when they changed."""
+        parameters = self.shape.parameters
+        if parameters == self._parameters:
+            return
+        self._parameters = parameters
+        shape = self.shape
+        self._chain = [shape]
+        finest = {name: getattr(shape, name) for name in shape.kLodParameters}
+        previous = finest
+        for level, copy in enumerate(self._copies, 1):
+            # Never raise a subdivision already below the minimum, and stop once nothing halves.
+            reduced = {name: min(value, max(shape.kLodMinimum, value >> level)) for name, value in finest.items()}
+            if reduced == previous:
+                break
+            for name, _ in shape.kParameters:
+                copy.set(name, reduced.get(name, getattr(shape, name)))
+            self._chain.append(copy)
+            previous = reduced
+
+    def triangleCounts(self):
+        """Return the number of triangles of every level.
+
+        Returns:
+            numpy.ndarray: The int64 triangle counts, from the finest to the coarsest level.
+        """
+        self._sync()
+        return np.array([copy.triangleCount for copy in self._chain], dtype=np.int64)
+
+
+class LodSelector(object):
+    """Picks LOD levels from projected sizes, with hysteresis and a triangle budget.
+
+    Level ``i`` is used while the projected size is above ``thresholds[i]``. A level only becomes
+    finer when the size passes the threshold by the hysteresis ratio and only becomes coarser when
+    it drops below it by the same ratio, so objects sitting on a threshold do not flicker.
+    """
+
+    def __init__(self, thresholds=(200.0, 100.0, 50.0, 25.0), hysteresis=0.15, triangleBudget=500000):
+        self.thresholds = np.asarray(thresholds, dtype=np.float64)
+        self.hysteresis = hysteresis
+        self.triangleBudget = triangleBudget
+        self._levels = {}
+
+    def _levelsOf(self, sizes, previous, levelCount):
+        """Return the levels of the sizes, keeping the previous levels inside the hysteresis band."""
+        sizes = np.asarray(sizes, dtype=np.float64)[..., np.newaxis]
+        coarsest = levelCount - 1
+        if previous is None:
+            return np.minimum(np.count_nonzero(self.thresholds > sizes, axis=-1), coarsest)
+        finer = np.count_nonzero(self.thresholds * (1.0 + self.hysteresis) > sizes, axis=-1)
+        coarser = np.count_nonzero(self.thresholds * (1.0 - self.hysteresis) > sizes, axis=-1)
+        return np.minimum(np.clip(previous, coarser, finer), coarsest)
+
+    def select(self, key, size, levelCount):
+        """Pick the level of a single object, remembering it for the hysteresis.
+
+        Args:
+            key (hashable): Identifies the object between frames.
+            size (float): The projected size in pixels.
+            levelCount (int): Number of levels of the object chain.
+
+        Returns:
+            int: The level to draw.
+        """
+        level = int(self._levelsOf(size, self._levels.get(key), levelCount))
+        self._levels[key] = level
+        return level
+
+    def selectMany(self, sizes, triangleCounts, previous=None):
+        """Pick the levels of many instances of the same chain, respecting the triangle budget.
+
+        When the chosen levels exceed the budget the smallest instances are coarsened first.
+
+        Args:
+            sizes (numpy.ndarray): The projected sizes in pixels with shape (N,).
+            triangleCounts (numpy.ndarray): The triangle count of every level of the chain.
+            previous (numpy.ndarray): The levels of the last frame, for the hysteresis.
+
+        Returns:
+            numpy.ndarray: The level of every instance.
+        """
+        triangleCounts = np.asarray(triangleCounts, dtype=np.int64)
+        coarsest = len(triangleCounts) - 1
+        levels = self._levelsOf(sizes, previous, len(triangleCounts))
+        order = np.argsort(sizes, kind="stable")
+        for _ in range(coarsest):
+            excess = int(triangleCounts[levels].sum()) - self.triangleBudget
+            if excess <= 0:
+                break
+            savings = triangleCounts[levels[order]] - triangleCounts[np.minimum(levels[order] + 1, coarsest)]
+            count = int(np.searchsorted(np.cumsum(savings), excess)) + 1
+            levels[order[:count]] = np.minimum(levels[order[:count]] + 1, coarsest)
+        return levels
+
+    def forget(self, key):
+        """Drop the remembered level of an object.
+
+        Args:
+            key (hashable): The key given to select().
+        """
+        self._levels.pop(key, None)
@@ -0,0 +1,325 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2019 Giuliano França
+
+MIT License
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+====================================================================================================
+
+How to use:
+    * Create a MeshBuffer with the GL module (or a SoftwareGL for headless use).
+    * Call upload() with an objects.mesh.Mesh when the geometry changes and draw() on every paint.
+
+Dependencies:
+    * Python 3
+    * PyOpenGL
+    * Numpy
+
+Todo:
+    * NDA
+
+Sources:
+    * https://www.khronos.org/opengl/wiki/Vertex_Specification
+
+This code supports Pylint. Rc file in project.
+"""
+import ctypes
+from objects import mesh
+from viewer import profiler
+
+
+kPrimitives = {"points": "GL_POINTS",
+               "lines": "GL_LINES",
+               "triangles": "GL_TRIANGLES"}
+
+
+class MeshBuffer(object):
+    """GPU buffers of one mesh, drawn with a single glDrawElements per primitive.
+
+    The bounds of the last uploaded mesh are kept on the CPU, so the view can cull the buffer
+    before binding it.
+    """
+
+    def __init__(self, glModule):
+        self.gl = glModule
+        self.parameters = None
+        self.topology = None
+        self.normalsRequested = False
+        self._vao = None
+        self._vbo = None
+        self._ibo = None
+        self._vertexBytes = 0
+        self._indexBytes = 0
+        self._vertexCount = 0
+        self._stride = 0
+        self._normalOffset = None
+        self._attributes = ()
+        self._indexType = None
+        self._ranges = {}
+        self.box = None
+        self.sphere = None
+
+    @property
+    def vertexCount(self):
+        """Return the number of vertices in the buffer.
+
+        Returns:
+            int: The number of uploaded vertices.
+        """
+        return self._vertexCount
+
+    @property
+    def hasNormals(self):
+        """Check if the buffer holds vertex normals.
+
+        Returns:
+            bool: True if normals were uploaded.
+        """
+        return self._normalOffset is not None
+
+    @property
+    def primitives(self):
+        """Return the primitives that can be drawn from this buffer.
+
+        Returns:
+            list: The names of the uploaded index ranges.
+        """
+        return list(self._ranges)
+
+    def _useVertexArray(self):
+        """Check if vertex array objects are available in the current context.
+
+        Returns:
+            bool: True if the VAO functions are loaded.
+        """
+        return bool(getattr(self.gl, "glGenVertexArrays", None))
+
+    def _bufferData(self, target, data, allocated):
+        """Send the data to the bound buffer, reusing the storage when the size did not change.
+
+        Returns:
+            int: The number of bytes allocated in the buffer.
+        """
+        if data.nbytes == allocated:
+            self.gl.glBufferSubData(target, 0, data.nbytes, data)
+        else:
+            self.gl.glBufferData(target, data.nbytes, data, self.gl.GL_STATIC_DRAW)
+        return data.nbytes
+
+    def _setPointers(self):
+        """Point the fixed function vertex arrays to the bound buffer."""
+        gl = self.gl
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, self._vbo)
+        gl.glEnableClientState(gl.GL_VERTEX_ARRAY)
+        gl.glVertexPointer(3, gl.GL_FLOAT, self._stride, ctypes.c_void_p(0))
+        if self._normalOffset is not None:
+            gl.glEnableClientState(gl.GL_NORMAL_ARRAY)
+            gl.glNormalPointer(gl.GL_FLOAT, self._stride, ctypes.c_void_p(self._normalOffset))
+        else:
+            gl.glDisableClientState(gl.GL_NORMAL_ARRAY)
+        gl.glBindBuffer(gl.GL_ELEMENT_ARRAY_BUFFER, self._ibo)
+
+    def upload(self, meshData):
+        """Upload a mesh to the GPU.
+
+        The vertex and index arrays of the mesh are handed to GL as they are, without repacking.
+
+        Args:
+            meshData (Mesh): The mesh to upload.
+        """
+        gl = self.gl
+        self._stride = meshData.stride
+        self._normalOffset = meshData.attributeOffset("normal")
+        self._attributes = meshData.attributes
+        self._vertexCount = meshData.vertexCount
+        self.box = meshData.box
+        self.sphere = meshData.sphere
+        itemSize = meshData.indices.itemsize
+        self._indexType = gl.GL_UNSIGNED_SHORT if itemSize == 2 else gl.GL_UNSIGNED_INT
+        self._ranges = {primitive: (getattr(gl, kPrimitives[primitive]), count, start * itemSize)
+                        for primitive, (start, count) in meshData.ranges.items()}
+
+        if self._vbo is None:
+            self._vbo, self._ibo = gl.glGenBuffers(2)
+            if self._useVertexArray():
+                self._vao = gl.glGenVertexArrays(1)
+        if self._vao is not None:
+            gl.glBindVertexArray(self._vao)
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, self._vbo)
+        self._vertexBytes = self._bufferData(gl.GL_ARRAY_BUFFER, meshData.vertices, self._vertexBytes)
+        gl.glBindBuffer(gl.GL_ELEMENT_ARRAY_BUFFER, self._ibo)
+        self._indexBytes = self._bufferData(gl.GL_ELEMENT_ARRAY_BUFFER, meshData.indices, self._indexBytes)
+        if self._vao is not None:
+            self._setPointers()
+            gl.glBindVertexArray(0)
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, 0)
+
+    def updateVertices(self, meshData):
+        """Overwrite the vertex buffer in place, keeping the index buffer untouched.
+
+        The vertex count and attributes must match the last upload.
+
+        Args:
+            meshData (Mesh): The mesh with the new vertices.
+        """
+        gl = self.gl
+        if meshData.vertexCount != self._vertexCount or meshData.attributes != self._attributes:
+            raise ValueError("The vertex layout changed, use upload() instead.")
+        self.box = meshData.box
+        self.sphere = meshData.sphere
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, self._vbo)
+        gl.glBufferSubData(gl.GL_ARRAY_BUFFER, 0, meshData.vertices.nbytes, meshData.vertices)
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, 0)
+
+    def bind(self):
+        """Bind the buffers for drawing. Pair every call with unbind()."""
+        if self._vao is not None:
+            self.gl.glBindVertexArray(self._vao)
+        else:
+            self._setPointers()
+
+    def unbind(self):
+        """Restore the state changed by bind()."""
+        gl = self.gl
+        if self._vao is not None:
+            gl.glBindVertexArray(0)
+        else:
+            gl.glDisableClientState(gl.GL_VERTEX_ARRAY)
+            gl.glDisableClientState(gl.GL_NORMAL_ARRAY)
+            gl.glBindBuffer(gl.GL_ARRAY_BUFFER, 0)
+            gl.glBindBuffer(gl.GL_ELEMENT_ARRAY_BUFFER, 0)
+
+    def drawBound(self, primitive, instances=None):
+        """Draw one of the uploaded primitives from the buffers bound with bind().
+
+        Args:
+            primitive (str): The name of the primitive to draw.
+            instances (int): Number of instances to draw with a single instanced call, or None
+                for a regular draw.
+        """
+        gl = self.gl
+        if primitive in self._ranges:
+            mode, count, offset = self._ranges[primitive]
+            if instances is None:
+                gl.glDrawElements(mode, count, self._indexType, ctypes.c_void_p(offset))
+            else:
+                gl.glDrawElementsInstanced(mode, count, self._indexType, ctypes.c_void_p(offset), instances)
+        elif primitive == "points":
+            if instances is None:
+                gl.glDrawArrays(gl.GL_POINTS, 0, self._vertexCount)
+            else:
+                gl.glDrawArraysInstanced(gl.GL_POINTS, 0, self._vertexCount, instances)
+
+    def draw(self, primitive):
+        """Draw one of the uploaded primitives.
+
+        Points are drawn straight from the vertex buffer when no point indices were uploaded.
+
+        Args:
+            primitive (str): The name of the primitive to draw.
+        """
+        if self._vbo is None:
+            return
+        self.bind()
+        self.drawBound(primitive)
+        self.unbind()
+
+    def release(self):
+        """Delete the GPU buffers. The GL context must be current."""
+        if self._vbo is None:
+            return
+        if self._vao is not None:
+            self.gl.glDeleteVertexArrays(1, [self._vao])
+        self.gl.glDeleteBuffers(2, [self._vbo, self._ibo])
+        self._vao = self._vbo = self._ibo = None
+        self._vertexBytes = self._indexBytes = 0
+        self._normalOffset = None
+        self._ranges = {}
+        self.box = None
+        self.sphere = None
+        self.parameters = None
+        self.topology = None
+        self.normalsRequested = False
+
+
+class MeshBufferCache(object):
+    """MeshBuffers of the procedural objects, uploaded only when their parameters change.
+
+    When only the scale parameters changed the vertex buffer is overwritten in place and the
+    index buffer is kept.
+    """
+
+    def __init__(self, glModule, frameProfiler=None):
+        self.gl = glModule
+        self.profiler = frameProfiler if frameProfiler is not None else profiler.NullProfiler()
+        self._buffers = {}
+
+    def setGL(self, glModule):
+        """Change the GL module used by the cache and all its buffers.
+
+        Args:
+            glModule (module): The OpenGL.GL module or a stand-in with the same functions.
+        """
+        self.gl = glModule
+        for buffer in self._buffers.values():
+            buffer.gl = glModule
+
+    def get(self, obj, normals=False, key=None):
+        """Return the buffer of an object, uploading its mesh when the parameters changed.
+
+        Args:
+            obj (instance): A procedural object with the parameters and topologyParameters properties
+                and the toMesh method.
+            normals (bool): Also upload the vertex normals, when the object provides them with a
+                normals property.
+            key (hashable): Identifies the buffer, defaults to the object id. Give the id of the
+                shape when obj is a snapshot generated from it.
+
+        Returns:
+            MeshBuffer: The up to date buffer of the object.
+        """
+        key = id(obj) if key is None else key
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            buffer = MeshBuffer(self.gl)
+            self._buffers[key] = buffer
+        parameters = obj.parameters
+        # Normals that were missing at the last upload may come with a newer snapshot of the same parameters.
+        vertexNormals = getattr(obj, "normals", None) if normals and not buffer.hasNormals else None
+        if buffer.parameters != parameters or buffer.normalsRequested != normals or vertexNormals is not None:
+            with self.profiler.phase("generate"):
+                meshData = obj.toMesh(normals)
+            topology = obj.topologyParameters
+            with self.profiler.phase("upload"):
+                if buffer.topology == topology and meshData.hasNormals == buffer.hasNormals:
+                    buffer.updateVertices(meshData)
+                else:
+                    buffer.upload(meshData)
+            buffer.topology = topology
+            buffer.parameters = parameters
+            buffer.normalsRequested = normals
+        return buffer
+
+    def release(self):
+        """Delete all buffers. The GL context must be current."""
+        for buffer in self._buffers.values():
+            buffer.release()
+        self._buffers = {}
@@ -0,0 +1,482 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2019 Giuliano França
+
+MIT License
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+====================================================================================================
+
+How to use:
+    * Create a MeshWorker, optionally with a process pool and a thread safe onReady callback, like
+      the emit of a queued Qt signal that repaints the view.
+    * On every paint call latest() with the shape to draw. It submits a job when the parameters
+      changed and returns the last completed mesh, or None before the first one is ready.
+    * Give the returned snapshot to MeshBufferCache.get() with the shape id as key.
+    * With a process pool, also give a SharedMeshPool so the workers build the meshes straight in
+      shared memory instead of pickling them back. A snapshot mapped from a block stays valid until
+      the next latest() call of the same shape.
+    * Give a MeshDiskCache to map the meshes generated in earlier sessions instead of generating
+      them again. The workers store the meshes that took longer than its minSeconds.
+    * Every process keeps one shape per job key, the viewer for the meshes built in place and each
+      worker process for its jobs, so a job only generates again what its parameters changed.
+    * A failed job is logged and the last completed mesh stays on screen.
+
+Dependencies:
+    * Python 3
+    * Numpy
+
+Todo:
+    * NDA
+
+Sources:
+    * https://docs.python.org/3/library/concurrent.futures.html
+
+This code supports Pylint. Rc file in project.
+"""
+import time
+import logging
+import threading
+import concurrent.futures
+import numpy as np
+
+from objects import mesh
+from objects import sharedmesh
+
+
+# Shared block size per triangle before the first mesh of a shape tells the real one.
+kBytesPerTriangle = 64
+# Shapes kept per process, the oldest are dropped when more shapes are edited.
+kPersistentShapes = 64
+
+logger = logging.getLogger(__name__)
+
+# Persistent shapes of this process by job key.
+_shapes = {}
+
+
+class MeshSnapshot(object):
+    """A generated mesh with the procedural object interface read by MeshBufferCache."""
+    __slots__ = ("parameters", "topologyParameters", "meshData", "seconds", "generation", "block", "layout")
+
+    def __init__(self, parameters, topologyParameters, meshData, seconds=0.0):
+        self.parameters = parameters
+        self.topologyParameters = topologyParameters
+        self.meshData = meshData
+        self.seconds = seconds
+        self.generation = 0
+        self.block = None
+        self.layout = None
+
+    @classmethod
+    def load(cls, diskCache, shapeType, parameters, normals=False):
+        """Map a mesh stored by an earlier generation.
+
+        Args:
+            diskCache (MeshDiskCache): The cache of generated meshes.
+            shapeType (type): A ShapeGeometry subclass.
+            parameters (tuple): The parameter values in declaration order.
+            normals (bool): Look for the mesh with vertex normals.
+
+        Returns:
+            MeshSnapshot: The stored mesh, without generation time, or None if it is not stored.
+        """
+        meshData = diskCache.load(diskCache.keyOf(shapeType, parameters, normals))
+        if meshData is None:
+            return None
+        shape = shapeType(**dict(zip((name for name, _ in shapeType.kParameters), parameters)))
+        return cls(parameters, shape.topologyParameters, meshData, None)
+
+    @property
+    def normals(self):
+        """Return the generated vertex normals.
+
+        Returns:
+            numpy.ndarray: A view of the normals, or None if they were not generated.
+        """
+        return self.meshData.normals
+
+    @property
+    def triangleCount(self):
+        """Return the number of generated triangles.
+
+        Returns:
+            int: The triangle count.
+        """
+        return self.meshData.ranges.get("triangles", (0, 0))[1] // 3
+
+    def mesh(self):
+        """Return the generated geometry.
+
+        Returns:
+            tuple: Views of the vertex positions and a dict with the index arrays of each primitive.
+        """
+        return self.meshData.positions, self.meshData.elements
+
+    def toMesh(self, normals=False):
+        """Return the generated Mesh. The normals were already decided when the job was submitted.
+
+        Returns:
+            Mesh: The packed mesh built by the worker.
+        """
+        # pylint: disable=unused-argument
+        return self.meshData
+
+
+def _storeSlow(diskCache, shapeType, parameters, normals, meshData, seconds):
+    """Store a generated mesh on disk when it took longer than the minSeconds of the cache."""
+    if diskCache is not None and seconds >= diskCache.minSeconds:
+        diskCache.store(diskCache.keyOf(shapeType, parameters, normals), meshData)
+
+
+def _takeShape(key, shapeType, parameters):
+    """Return the shape kept for a job key, with the parameters of the job set on it.
+
+    Only the changed parameters are flagged as dirty, so the shape rebuilds just what they affect.
+    The shape is taken out until _keepShape(), so a job that fails does not leave a half built
+    shape behind.
+
+    Args:
+        key (hashable): The job key, or None for a shape that is not kept.
+        shapeType (type): A ShapeGeometry subclass.
+        parameters (tuple): The parameter values in declaration order.
+
+    Returns:
+        ShapeGeometry: The kept shape, or a new one if there is none of that type.
+    """
+    shape = _shapes.pop(key, None) if key is not None else None
+    if type(shape) is not shapeType:  # pylint: disable=unidiomatic-typecheck
+        return shapeType(**dict(zip((name for name, _ in shapeType.kParameters), parameters)))
+    for (name, _), value in zip(shapeType.kParameters, parameters):
+        shape.set(name, value)
+    return shape
+
+
+def _keepShape(key, shape):
+    """Keep the shape of a finished job for the next job with the same key."""
+    if key is None:
+        return
+    while len(_shapes) >= kPersistentShapes:
+        _shapes.pop(next(iter(_shapes)))
+    _shapes[key] = shape
+
+
+def buildMesh(shapeType, parameters, normals=False, diskCache=None, key=None):
+    """Generate the mesh of a shape. Module level, so process pools can pickle it.
+
+    The vertices are interleaved and the indices packed in the worker, so the GUI thread only
+    hands the arrays to GL.
+
+    Args:
+        shapeType (type): A ShapeGeometry subclass.
+        parameters (tuple): The parameter values in declaration order.
+        normals (bool): Also generate the vertex normals of the shape.
+        diskCache (MeshDiskCache): Optional cache that stores the mesh if it was slow to generate.
+        key (hashable): Optional job key, the shape is kept in this process and updated by the
+            next job with the same key.
+
+    Returns:
+        MeshSnapshot: The generated mesh and the time it took.
+    """
+    start = time.perf_counter()
+    shape = _takeShape(key, shapeType, parameters)
+    meshData = shape.toMesh(normals)
+    _keepShape(key, shape)
+    seconds = time.perf_counter() - start
+    _storeSlow(diskCache, shapeType, parameters, normals, meshData, seconds)
+    return MeshSnapshot(parameters, shape.topologyParameters, meshData, seconds)
+
+
+def buildSharedMesh(shapeType, parameters, normals, block, blockBytes, diskCache=None, key=None):
+    """Generate the mesh of a shape straight in a shared memory block. Runs in the worker processes.
+
+    Only the layout of the mesh goes back to the viewer. A mesh that does not fit in the block is
+    returned whole instead, and the next block of the shape is sized from it.
+
+    Args:
+        shapeType (type): A ShapeGeometry subclass.
+        parameters (tuple): The parameter values in declaration order.
+        normals (bool): Also generate the vertex normals of the shape.
+        block (str): The name of the shared memory block acquired for the job.
+        blockBytes (int): The size of the block.
+        diskCache (MeshDiskCache): Optional cache that stores the mesh if it was slow to generate.
+        key (hashable): Optional job key, the shape is kept in the worker process and updated by
+            the next job with the same key.
+
+    Returns:
+        MeshSnapshot: The block and layout of the generated mesh, or the mesh itself.
+    """
+    start = time.perf_counter()
+    shape = _takeShape(key, shapeType, parameters)
+    positions, elements = shape.mesh()
+    vertexNormals = shape.normals if normals else None
+    attributes = ("position", "normal") if vertexNormals is not None else ("position",)
+    nbytes, _ = mesh.Mesh.bufferSize(len(positions), attributes, sum(np.size(indices) for indices in elements.values()))
+    if nbytes > blockBytes:
+        meshData = shape.toMesh(normals)
+        _keepShape(key, shape)
+        seconds = time.perf_counter() - start
+        _storeSlow(diskCache, shapeType, parameters, normals, meshData, seconds)
+        return MeshSnapshot(parameters, shape.topologyParameters, meshData, seconds)
+    layout = sharedmesh.writeMesh(block, positions, elements, vertexNormals)
+    _keepShape(key, shape)
+    seconds = time.perf_counter() - start
+    if diskCache is not None and seconds >= diskCache.minSeconds:
+        with sharedmesh.openBlock(block) as buffer:
+            _storeSlow(diskCache, shapeType, parameters, normals, mesh.Mesh.fromBuffer(buffer, layout), seconds)
+    snapshot = MeshSnapshot(parameters, shape.topologyParameters, None, seconds)
+    snapshot.block = block
+    snapshot.layout = layout
+    return snapshot
+
+
+class _Job(object):
+    """Generation state of one shape."""
+    __slots__ = ("key", "shapeType", "requested", "generation", "running", "queued", "latest", "seconds", "triangles",
+                 "bytesPerTriangle", "retired", "error", "forgotten")
+
+    def __init__(self, key, shapeType):
+        self.key = key
+        self.shapeType = shapeType
+        self.requested = None
+        self.generation = 0
+        self.running = None
+        self.queued = None
+        self.latest = None
+        self.seconds = None
+        self.triangles = 0
+        self.bytesPerTriangle = None
+        self.retired = []
+        self.error = None
+        self.forgotten = False
+
+
+class MeshWorker(object):
+    """Generates meshes away from the GUI thread, the latest parameters winning.
+
+    Each shape has at most one running and one queued job. A new request replaces the queued job,
+    so intermediate slider positions are skipped, and results older than the displayed mesh are
+    discarded. Meshes predicted to take less than synchronousSeconds, from the time of the last
+    generation scaled by the triangle count, are built in place, as the round trip through the
+    worker would cost more than the generation.
+
+    With a SharedMeshPool the jobs write their meshes in pooled shared memory blocks. The block of
+    a replaced mesh goes back to the pool on the next latest() call of its shape, when the viewer
+    is done reading it.
+
+    A job that raises is logged on the next latest() call, which keeps returning the last completed
+    mesh until new parameters generate successfully.
+    """
+
+    def __init__(self, executor=None, onReady=None, synchronousSeconds=0.002, pool=None, diskCache=None):
+        self.executor = executor if executor is not None else concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self.onReady = onReady
+        self.synchronousSeconds = synchronousSeconds
+        self.pool = pool
+        self.diskCache = diskCache
+        self.submitted = 0
+        self.cancelled = 0
+        self.discarded = 0
+        self.completed = 0
+        self._jobs = {}
+        self._lock = threading.RLock()
+        self._closed = False
+
+    def latest(self, shape, normals=False):
+        """Return the last completed mesh of a shape, requesting a new one when the parameters changed.
+
+        Args:
+            shape (ShapeGeometry): The shape to draw.
+            normals (bool): Also generate the vertex normals.
+
+        Returns:
+            MeshSnapshot: The newest completed mesh, or None if no mesh was completed yet.
+        """
+        with self._lock:
+            job = self._jobs.get(id(shape))
+            if job is None:
+                job = _Job(id(shape), type(shape))
+                self._jobs[id(shape)] = job
+            self._releaseRetired(job)
+            if job.error is not None:
+                self._logError(job)
+            request = (shape.parameters, normals)
+            if request != job.requested:
+                job.requested = request
+                job.generation += 1
+                stored = None if self.diskCache is None else MeshSnapshot.load(self.diskCache, job.shapeType, *request)
+                if stored is not None:
+                    self._accept(job, job.generation, stored)
+                elif job.running is None and self._predictSeconds(job, shape) < self.synchronousSeconds:
+                    try:
+                        self._accept(job, job.generation, buildMesh(job.shapeType, *request, key=job.key))
+                    except Exception as error:  # pylint: disable=broad-except
+                        job.error = error
+                        self._logError(job)
+                else:
+                    self._submit(job, job.generation, request, shape.triangleCount)
+            return job.latest
+
+    @staticmethod
+    def _logError(job):
+        """Log the error of the last failed job of a shape, its last completed mesh stays in use."""
+        error, job.error = job.error, None
+        logger.error("Generating a %s mesh failed, keeping the last one.", job.shapeType.kName, exc_info=error)
+
+    @staticmethod
+    def _predictSeconds(job, shape):
+        """Estimate the generation time of a shape from the last generation.
+
+        Returns:
+            float: The predicted seconds, infinite when nothing was generated yet.
+        """
+        if job.seconds is None:
+            return float("inf")
+        return job.seconds * shape.triangleCount / max(job.triangles, 1)
+
+    @staticmethod
+    def _predictBytes(job, triangles):
+        """Estimate the shared memory needed by a mesh from the last mesh of the shape.
+
+        Returns:
+            int: The predicted bytes, with some room for the rounding of the index counts.
+        """
+        if job.bytesPerTriangle is None:
+            return kBytesPerTriangle * triangles
+        return int(job.bytesPerTriangle * triangles * 1.25) + mesh.kIndexAlignment
+
+    def _submit(self, job, generation, request, triangles):
+        """Start a job, or queue it behind the running one."""
+        if job.running is not None:
+            if job.queued is not None:
+                self.cancelled += 1
+            job.queued = (generation, request, triangles)
+            return
+        self.submitted += 1
+        block = None
+        if self.pool is None:
+            job.running = self.executor.submit(buildMesh, job.shapeType, *request, self.diskCache, job.key)
+        else:
+            block, blockBytes = self.pool.acquire(self._predictBytes(job, triangles))
+            job.running = self.executor.submit(buildSharedMesh, job.shapeType, *request, block, blockBytes, self.diskCache, job.key)
+        job.running.add_done_callback(lambda future: self._finished(job, generation, future, block))
+
+    def _accept(self, job, generation, snapshot):
+        """Keep a completed mesh if it is newer than the displayed one.
+
+        Returns:
+            bool: True if the mesh was kept.
+        """
+        snapshot.generation = generation
+        job.bytesPerTriangle = snapshot.meshData.nbytes / max(snapshot.triangleCount, 1)
+        if snapshot.seconds is not None:
+            # Meshes mapped from disk say nothing about the generation time.
+            job.seconds = snapshot.seconds
+            job.triangles = snapshot.triangleCount
+        if job.latest is not None and job.latest.generation >= generation:
+            self.discarded += 1
+            return False
+        if job.latest is not None and job.latest.block is not None:
+            job.retired.append(job.latest)
+        job.latest = snapshot
+        self.completed += 1
+        return True
+
+    def _releaseRetired(self, job):
+        """Give the blocks of the replaced meshes of a job back to the pool."""
+        for snapshot in job.retired:
+            snapshot.meshData = None
+            self.pool.release(snapshot.block)
+        job.retired = []
+
+    def _finished(self, job, generation, future, block=None):
+        """Collect a finished job and start the queued one. Called from the worker thread."""
+        accepted = False
+        with self._lock:
+            if self._closed:
+                return
+            job.running = None
+            snapshot = None
+            if job.forgotten:
+                # The shape was dropped while its mesh was built, nothing will read the block.
+                if block is not None:
+                    self.pool.release(block)
+                return
+            if future.cancelled():
+                self.cancelled += 1
+            elif future.exception() is not None:
+                job.error = future.exception()
+            else:
+                snapshot = future.result()
+                if snapshot.block is not None:
+                    snapshot.meshData = self.pool.meshOf(snapshot.block, snapshot.layout)
+                accepted = self._accept(job, generation, snapshot)
+            if block is not None and not (accepted and snapshot.block is not None):
+                self.pool.release(block)
+            if job.queued is not None:
+                queued, job.queued = job.queued, None
+                self._submit(job, *queued)
+        if accepted and self.onReady is not None:
+            self.onReady()
+
+    def isBusy(self, shape):
+        """Check if a mesh of the shape is being generated.
+
+        Args:
+            shape (ShapeGeometry): The shape given to latest().
+
+        Returns:
+            bool: True while a job of the shape is running or queued.
+        """
+        job = self._jobs.get(id(shape))
+        return job is not None and (job.running is not None or job.queued is not None)
+
+    def forget(self, shape):
+        """Drop the state and the meshes of a shape.
+
+        Args:
+            shape (ShapeGeometry): The shape given to latest().
+        """
+        with self._lock:
+            job = self._jobs.pop(id(shape), None)
+            if job is None:
+                return
+            _shapes.pop(job.key, None)
+            job.forgotten = True
+            job.queued = None
+            if job.running is not None:
+                job.running.cancel()
+            if job.latest is not None and job.latest.block is not None:
+                job.retired.append(job.latest)
+            job.latest = None
+            self._releaseRetired(job)
+
+    def shutdown(self):
+        """Cancel the queued jobs and stop the executor without waiting for the running ones.
+
+        The meshes are dropped, so the shared memory pool can be closed afterwards.
+        """
+        with self._lock:
+            self._closed = True
+            for job in self._jobs.values():
+                job.queued = None
+                job.latest = None
+                job.retired = []
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2019 Giuliano França
+
+MIT License
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+====================================================================================================
+
+How to use:
+    * Call createContext() before importing OpenGL.GL anywhere else, so PyOpenGL picks the
+      headless platform ("egl" by default, "osmesa" also works).
+    * Bind a Framebuffer to render into, since a surfaceless context has no default framebuffer.
+    * Read frames back with a PixelReader: each read() starts the transfer of the current frame
+      and returns the previous one, so the copy overlaps the rendering of the next frame.
+
+Dependencies:
+    * Python 3
+    * PyOpenGL
+    * Mesa with EGL surfaceless or OSMesa support
+
+Todo:
+    * NDA
+
+Sources:
+    * https://registry.khronos.org/EGL/extensions/MESA/EGL_MESA_platform_surfaceless.txt
+    * https://www.khronos.org/opengl/wiki/Framebuffer_Object
+    * https://www.khronos.org/opengl/wiki/Pixel_Buffer_Object
+
+This code supports Pylint. Rc file in project.
+"""
+import os
+import ctypes
+import numpy as np
+
+
+class EGLContext(object):
+    """Surfaceless EGL context with a desktop OpenGL compatibility profile."""
+
+    def __init__(self):
+        # pylint: disable=import-outside-toplevel
+        from OpenGL import EGL
+        self._egl = EGL
+        self.display = EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+        major, minor = EGL.EGLint(), EGL.EGLint()
+        if not EGL.eglInitialize(self.display, ctypes.pointer(major), ctypes.pointer(minor)):
+            raise RuntimeError("Unable to initialize the EGL display.")
+        config = EGL.EGLConfig()
+        count = EGL.EGLint()
+        attributes = (EGL.EGLint * 3)(EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT, EGL.EGL_NONE)
+        EGL.eglChooseConfig(self.display, attributes, ctypes.pointer(config), 1, ctypes.pointer(count))
+        EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+        # Without a matching config Mesa still accepts EGL_NO_CONFIG_KHR for surfaceless contexts.
+        self.context = EGL.eglCreateContext(self.display, config if count.value else None, EGL.EGL_NO_CONTEXT, None)
+        if not self.context:
+            raise RuntimeError("Unable to create the EGL context.")
+
+    def makeCurrent(self):
+        """Make the context current in the calling thread."""
+        EGL = self._egl  # pylint: disable=invalid-name
+        if not EGL.eglMakeCurrent(self.display, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, self.context):
+            raise RuntimeError("Unable to make the EGL context current.")
+
+    def release(self):
+        """Destroy the context."""
+        EGL = self._egl  # pylint: disable=invalid-name
+        EGL.eglMakeCurrent(self.display, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, EGL.EGL_NO_CONTEXT)
+        EGL.eglDestroyContext(self.display, self.context)
+        EGL.eglTerminate(self.display)
+
+
+class OSMesaContext(object):
+    """Software OSMesa context rendering into a small client side buffer."""
+
+    def __init__(self, width=16, height=16):
+        # pylint: disable=import-outside-toplevel
+        from OpenGL import GL
+        from OpenGL import osmesa
+        from OpenGL import arrays
+        self._osmesa = osmesa
+        self._gl = GL
+        self.context = osmesa.OSMesaCreateContextExt(osmesa.OSMESA_RGBA, 24, 0, 0, None)
+        if not self.context:
+            raise RuntimeError("Unable to create the OSMesa context.")
+        self.width = width
+        self.height = height
+        self.buffer = arrays.GLubyteArray.zeros((height, width, 4))
+
+    def makeCurrent(self):
+        """Make the context current in the calling thread."""
+        if not self._osmesa.OSMesaMakeCurrent(self.context, self.buffer, self._gl.GL_UNSIGNED_BYTE, self.width, self.height):
+            raise RuntimeError("Unable to make the OSMesa context current.")
+
+    def release(self):
+        """Destroy the context."""
+        self._osmesa.OSMesaDestroyContext(self.context)
+
+
+def createContext(platform=None):
+    """Create and make current a headless GL context.
+
+    Args:
+        platform (str): "egl" or "osmesa". Defaults to the PYOPENGL_PLATFORM environment variable,
+            or "egl" when it is not set.
+
+    Returns:
+        EGLContext or OSMesaContext: The current context.
+    """
+    platform = platform or os.environ.get("PYOPENGL_PLATFORM") or "egl"
+    os.environ.setdefault("PYOPENGL_PLATFORM", platform)
+    if platform == "egl":
+        os.environ.setdefault("EGL_PLATFORM", "surfaceless")
+        context = EGLContext()
+    elif platform == "osmesa":
+        context = OSMesaContext()
+    else:
+        raise ValueError("Unsupported headless platform: %s" % platform)
+    context.makeCurrent()
+    return context
+
+
+class Framebuffer(object):
+    """Framebuffer object with a RGBA8 color and a 24 bit depth renderbuffer."""
+
+    def __init__(self, width, height):
+        # pylint: disable=import-outside-toplevel
+        import OpenGL.GL as gl
+        self.gl = gl
+        self.width = width
+        self.height = height
+        self.fbo = gl.glGenFramebuffers(1)
+        self.color, self.depth = gl.glGenRenderbuffers(2)
+        gl.glBindRenderbuffer(gl.GL_RENDERBUFFER, self.color)
+        gl.glRenderbufferStorage(gl.GL_RENDERBUFFER, gl.GL_RGBA8, width, height)
+        gl.glBindRenderbuffer(gl.GL_RENDERBUFFER, self.depth)
+        gl.glRenderbufferStorage(gl.GL_RENDERBUFFER, gl.GL_DEPTH_COMPONENT24, width, height)
+        gl.glBindRenderbuffer(gl.GL_RENDERBUFFER, 0)
+        gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, self.fbo)
+        gl.glFramebufferRenderbuffer(gl.GL_FRAMEBUFFER, gl.GL_COLOR_ATTACHMENT0, gl.GL_RENDERBUFFER, self.color)
+        gl.glFramebufferRenderbuffer(gl.GL_FRAMEBUFFER, gl.GL_DEPTH_ATTACHMENT, gl.GL_RENDERBUFFER, self.depth)
+        status = gl.glCheckFramebufferStatus(gl.GL_FRAMEBUFFER)
+        gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, 0)
+        if status != gl.GL_FRAMEBUFFER_COMPLETE:
+            raise RuntimeError("Incomplete framebuffer: 0x%x" % status)
+
+    def bind(self):
+        """Bind the framebuffer for drawing and reading and set the viewport."""
+        self.gl.glBindFramebuffer(self.gl.GL_FRAMEBUFFER, self.fbo)
+        self.gl.glViewport(0, 0, self.width, self.height)
+
+    def release(self):
+        """Delete the framebuffer and its renderbuffers."""
+        self.gl.glBindFramebuffer(self.gl.GL_FRAMEBUFFER, 0)
+        self.gl.glDeleteRenderbuffers(2, [self.color, self.depth])
+        self.gl.glDeleteFramebuffers(1, [self.fbo])
+
+
+class PixelReader(object):
+    """Reads the bound framebuffer back through two pixel buffer objects used in turn.
+
+    glReadPixels into a bound pack buffer returns at once and the GPU copies the pixels in the
+    background. The buffer of a frame is only mapped at the next read(), after the following frame
+    was submitted, so the CPU rarely waits for the transfer.
+    """
+
+    def __init__(self, glModule, width, height):
+        self.gl = glModule
+        self.width = width
+        self.height = height
+        self.nbytes = width * height * 4
+        self._pbos = [int(name) for name in glModule.glGenBuffers(2)]
+        for pbo in self._pbos:
+            glModule.glBindBuffer(glModule.GL_PIXEL_PACK_BUFFER, pbo)
+            glModule.glBufferData(glModule.GL_PIXEL_PACK_BUFFER, self.nbytes, None, glModule.GL_STREAM_READ)
+        glModule.glBindBuffer(glModule.GL_PIXEL_PACK_BUFFER, 0)
+        self._frame = 0
+        self._pending = False
+
+    def _map(self, pbo):
+        """Copy the pixels of a pack buffer into a new array.
+
+        Returns:
+            numpy.ndarray: The uint8 RGBA pixels with shape (height, width, 4), bottom row first.
+        """
+        gl = self.gl
+        pixels = np.empty((self.height, self.width, 4), dtype=np.uint8)
+        gl.glBindBuffer(gl.GL_PIXEL_PACK_BUFFER, pbo)
+        pointer = gl.glMapBufferRange(gl.GL_PIXEL_PACK_BUFFER, 0, self.nbytes, gl.GL_MAP_READ_BIT)
+        ctypes.memmove(pixels.ctypes.data, pointer, self.nbytes)
+        gl.glUnmapBuffer(gl.GL_PIXEL_PACK_BUFFER)
+        return pixels
+
+    def read(self):
+        """Start reading the current frame and return the previous one.
+
+        Returns:
+            numpy.ndarray: The pixels of the previous frame, or None on the first call.
+        """
+        gl = self.gl
+        gl.glBindBuffer(gl.GL_PIXEL_PACK_BUFFER, self._pbos[self._frame % 2])
+        gl.glReadPixels(0, 0, self.width, self.height, gl.GL_RGBA, gl.GL_UNSIGNED_BYTE, ctypes.c_void_p(0))
+        previous = self._map(self._pbos[(self._frame + 1) % 2]) if self._pending else None
+        gl.glBindBuffer(gl.GL_PIXEL_PACK_BUFFER, 0)
+        self._frame += 1
+        self._pending = True
+        return previous
+
+    def finish(self):
+        """Return the frame started by the last read().
+
+        Returns:
+            numpy.ndarray: The pixels of the last frame, or None if there is none pending.
+        """
+        if not self._pending:
+            return None
+        self._pending = False
+        pixels = self._map(self._pbos[(self._frame + 1) % 2])
+        self.gl.glBindBuffer(self.gl.GL_PIXEL_PACK_BUFFER, 0)
+        return pixels
+
+    def release(self):
+        """Delete the pixel buffers."""
+        self.gl.glDeleteBuffers(2, self._pbos)
+        self._pbos = []
+        self._pending = False
@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2019 Giuliano França
+
+MIT License
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+====================================================================================================
+
+How to use:
+    * Give a FrameProfiler to the view to record, or keep the NullProfiler for no overhead.
+    * Wrap the GL module with CountingGL to count the GL calls of each frame.
+    * Record per frame values, like the number of drawn objects, with count().
+    * Read stats() or summary() for the frame time percentiles and call dumpChromeTrace() to
+      save the recorded phases. Open the file in chrome://tracing or https://ui.perfetto.dev.
+
+Dependencies:
+    * Python 3
+    * Numpy
+
+Todo:
+    * NDA
+
+Sources:
+    * https://docs.google.com/document/d/1CvAClvFfyA5R-PhYUmn5OOQtYMH4h6I0nSsKchNAySU
+
+This code supports Pylint. Rc file in project.
+"""
+import json
+import time
+import contextlib
+import collections
+import numpy as np
+
+
+class NullProfiler(object):
+    """Profiler that records nothing, used while profiling is disabled."""
+    enabled = False
+
+    def __init__(self):
+        self._nullPhase = contextlib.nullcontext()
+
+    def phase(self, name):
+        """Return a context manager that does nothing."""
+        # pylint: disable=unused-argument
+        return self._nullPhase
+
+    def begin(self, name):
+        """Do nothing."""
+        # pylint: disable=unused-argument
+        return 0.0
+
+    def end(self, name, start):
+        """Do nothing."""
+
+    def frameBegin(self):
+        """Do nothing."""
+
+    def frameEnd(self):
+        """Do nothing."""
+
+    def countCall(self):
+        """Do nothing."""
+
+    def count(self, name, value):
+        """Do nothing."""
+
+
+class FrameProfiler(object):
+    """Records frame times, phase timings, GL call counts and counters into ring buffers."""
+    enabled = True
+
+    def __init__(self, frameCapacity=600, eventCapacity=20000):
+        self.frameTimes = collections.deque(maxlen=frameCapacity)
+        self.frameCalls = collections.deque(maxlen=frameCapacity)
+        self.events = collections.deque(maxlen=eventCapacity)
+        self.counters = collections.OrderedDict()
+        self._origin = time.perf_counter()
+        self._frameStart = None
+        self._calls = 0
+        self._counts = collections.Counter()
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """Time the wrapped block as a phase.
+
+        Args:
+            name (str): The name of the phase.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.events.append((name, start, time.perf_counter() - start))
+
+    def begin(self, name):
+        """Start a phase that ends in another function.
+
+        Args:
+            name (str): The name of the phase.
+
+        Returns:
+            float: The token to pass to end().
+        """
+        # pylint: disable=unused-argument
+        return time.perf_counter()
+
+    def end(self, name, start):
+        """Finish a phase started with begin().
+
+        Args:
+            name (str): The name of the phase.
+            start (float): The token returned by begin().
+        """
+        if start:
+            self.events.append((name, start, time.perf_counter() - start))
+
+    def frameBegin(self):
+        """Mark the start of a frame."""
+        self._frameStart = time.perf_counter()
+        self._calls = 0
+        self._counts.clear()
+
+    def frameEnd(self):
+        """Mark the end of a frame and store its time and GL call count."""
+        if self._frameStart is None:
+            return
+        duration = time.perf_counter() - self._frameStart
+        self.events.append(("frame", self._frameStart, duration))
+        self.frameTimes.append(duration)
+        self.frameCalls.append(self._calls)
+        for name, value in self._counts.items():
+            self.counters.setdefault(name, collections.deque(maxlen=self.frameTimes.maxlen)).append(value)
+        self._frameStart = None
+
+    def countCall(self):
+        """Count one GL call in the current frame."""
+        self._calls += 1
+
+    def count(self, name, value):
+        """Add to a counter of the current frame.
+
+        Args:
+            name (str): The name of the counter, as shown by summary().
+            value (int): The amount to add.
+        """
+        self._counts[name] += value
+
+    def clear(self):
+        """Drop all recorded data."""
+        self.frameTimes.clear()
+        self.frameCalls.clear()
+        self.events.clear()
+        self.counters.clear()
+
+    def stats(self):
+        """Return the statistics of the recorded frames.
+
+        Returns:
+            dict: The frame count, the p50, p95 and p99 frame times in milliseconds, the mean GL
+                calls per frame and the mean of each counter per frame, keyed by its name.
+        """
+        if not self.frameTimes:
+            return {"frames": 0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "glCalls": 0.0, "counters": {}}
+        p50, p95, p99 = np.percentile(np.fromiter(self.frameTimes, dtype=np.float64), [50, 95, 99]) * 1000.0
+        return {"frames": len(self.frameTimes),
+                "p50": p50,
+                "p95": p95,
+                "p99": p99,
+                "glCalls": float(np.mean(np.fromiter(self.frameCalls, dtype=np.float64))),
+                "counters": {name: float(np.mean(np.fromiter(values, dtype=np.float64))) for name, values in self.counters.items()}}
+
+    def summary(self):
+        """Return the statistics as a single line of text.
+
+        Returns:
+            str: The frame time percentiles, GL calls and counters per frame.
+        """
+        stats = self.stats()
+        counters = "".join(" | %.0f %s" % (value, name) for name, value in stats["counters"].items())
+        return "Frame p50 %.2f ms | p95 %.2f ms | p99 %.2f ms | %.0f GL calls%s | %d frames" % (
+            stats["p50"], stats["p95"], stats["p99"], stats["glCalls"], counters, stats["frames"])
+
+    def dumpChromeTrace(self, path):
+        """Save the recorded phases in the Chrome trace event format.
+
+        Args:
+            path (str): The output json file path.
+        """
+        events = [{"name": name,
+                   "ph": "X",
+                   "ts": (start - self._origin) * 1e6,
+                   "dur": duration * 1e6,
+                   "pid": 0,
+                   "tid": 0} for name, start, duration in self.events]
+        with open(path, "w") as traceFile:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, traceFile)
+
+
+class CountingGL(object):
+    """Proxy of a GL module that counts every function call in a profiler."""
+
+    def __init__(self, glModule, profiler):
+        self._gl = glModule
+        self._profiler = profiler
+
+    def __getattr__(self, name):
+        value = getattr(self._gl, name)
+        if not callable(value) or not value:
+            return value
+        profiler = self._profiler
+
+        def counted(*args):
+            profiler.countCall()
+            return value(*args)
+        counted.__name__ = name
+        # Keep the wrapper so the next lookups skip __getattr__.
+        setattr(self, name, counted)
+        return counted
+
+    def __bool__(self):
+        return bool(self._gl)
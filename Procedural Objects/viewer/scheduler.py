@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2019 Giuliano França
+
+MIT License
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+====================================================================================================
+
+How to use:
+    * Create a FrameScheduler with the target frame rate and call start() when the animation starts.
+    * On every timer tick call tick() and advance the animation by the returned elapsed seconds.
+    * Call update() on the widget only when requestFrame() returns True and call framePresented()
+      when the frame was swapped.
+    * Restart the single shot timer with nextDelay() so fractional rates like 29.97 keep time.
+
+Dependencies:
+    * Python 3
+
+Todo:
+    * NDA
+
+Sources:
+    * https://gafferongames.com/post/fix_your_timestep/
+
+This code supports Pylint. Rc file in project.
+"""
+import time
+import collections
+
+
+# Frame rates the adaptive mode steps through, from the lowest to the highest.
+kRates = (12.0, 24.0, 29.97, 30.0, 60.0)
+
+
+class FrameScheduler(object):
+    """Paces an animation against a monotonic clock.
+
+    Frames are scheduled on absolute deadlines, so the timer error does not accumulate and the
+    animation advances by the real elapsed time even when frames are late. Deadlines that were
+    missed entirely are counted as dropped frames, ticks that arrive while the previous frame was
+    not presented yet are coalesced into it. With adaptive enabled the target rate is lowered one
+    step of kRates when too many frames of a window miss their deadline, and raised back towards
+    the requested rate after a few clean windows.
+    """
+
+    def __init__(self, fps=60.0, adaptive=True, window=60, clock=time.monotonic):
+        self.clock = clock
+        self.adaptive = adaptive
+        self.window = window
+        self.requestedFps = float(fps)
+        self.targetFps = float(fps)
+        self.lateTolerance = 0.25
+        self.lowerRatio = 0.2
+        self.raiseWindows = 4
+        self.frames = 0
+        self.lateFrames = 0
+        self.droppedFrames = 0
+        self.coalescedFrames = 0
+        self._presented = collections.deque(maxlen=120)
+        self._lastTick = None
+        self._deadline = None
+        self._pending = False
+        self._windowTicks = 0
+        self._windowMisses = 0
+        self._cleanWindows = 0
+
+    @property
+    def interval(self):
+        """Return the time between two frames at the current target rate.
+
+        Returns:
+            float: The frame interval in seconds.
+        """
+        return 1.0 / self.targetFps
+
+    @property
+    def achievedFps(self):
+        """Return the measured rate of the presented frames.
+
+        Returns:
+            float: The frames per second of the recently presented frames.
+        """
+        if len(self._presented) < 2:
+            return 0.0
+        elapsed = self._presented[-1] - self._presented[0]
+        return (len(self._presented) - 1) / elapsed if elapsed > 0.0 else 0.0
+
+    def setTargetFps(self, fps):
+        """Change the requested frame rate.
+
+        Args:
+            fps (float): The new frames per second target.
+        """
+        self.requestedFps = float(fps)
+        self.targetFps = float(fps)
+        self._resetWindow()
+        self._cleanWindows = 0
+        self._presented.clear()
+        if self._lastTick is not None:
+            self._deadline = self.clock() + self.interval
+
+    def start(self):
+        """Start pacing from now, forgetting the time spent while stopped."""
+        now = self.clock()
+        self._lastTick = now
+        self._deadline = now + self.interval
+        self._pending = False
+        self._presented.clear()
+
+    def stop(self):
+        """Stop pacing."""
+        self._lastTick = None
+        self._deadline = None
+
+    def tick(self):
+        """Register a timer tick and advance the deadlines.
+
+        Returns:
+            float: The seconds elapsed since the previous tick, to advance the animation with.
+        """
+        now = self.clock()
+        if self._lastTick is None:
+            self.start()
+            return 0.0
+        elapsed = now - self._lastTick
+        self._lastTick = now
+
+        interval = self.interval
+        lateness = now - self._deadline
+        missed = False
+        if lateness >= interval:
+            skipped = int(lateness / interval)
+            self.droppedFrames += skipped
+            self._deadline += skipped * interval
+            missed = True
+        elif lateness > interval * self.lateTolerance:
+            self.lateFrames += 1
+            missed = True
+        self._deadline += interval
+        if self._pending:
+            self.coalescedFrames += 1
+            missed = True
+
+        self.frames += 1
+        self._windowTicks += 1
+        self._windowMisses += missed
+        if self.adaptive and self._windowTicks >= self.window:
+            self._adapt()
+        return elapsed
+
+    def nextDelay(self):
+        """Return the time left until the next deadline.
+
+        Returns:
+            int: The delay in milliseconds for a single shot timer.
+        """
+        if self._deadline is None:
+            return int(round(self.interval * 1000.0))
+        return max(0, int(round((self._deadline - self.clock()) * 1000.0)))
+
+    def requestFrame(self):
+        """Check if a new frame has to be requested.
+
+        Returns:
+            bool: False while the previous frame was not presented, so update() is not repeated.
+        """
+        if self._pending:
+            return False
+        self._pending = True
+        return True
+
+    def framePresented(self):
+        """Mark the pending frame as presented and record its time."""
+        self._pending = False
+        self._presented.append(self.clock())
+
+    def _resetWindow(self):
+        """Start a new adaptive measurement window."""
+        self._windowTicks = 0
+        self._windowMisses = 0
+
+    def _adapt(self):
+        """Lower or raise the target rate from the misses of the finished window."""
+        ratio = self._windowMisses / float(self._windowTicks)
+        self._resetWindow()
+        if ratio > self.lowerRatio:
+            self._cleanWindows = 0
+            lower = [rate for rate in kRates if rate < self.targetFps]
+            if lower:
+                self.targetFps = lower[-1]
+            return
+        if ratio > 0.0 or self.targetFps >= self.requestedFps:
+            self._cleanWindows = 0
+            return
+        self._cleanWindows += 1
+        if self._cleanWindows >= self.raiseWindows:
+            self._cleanWindows = 0
+            higher = [rate for rate in kRates if self.targetFps < rate <= self.requestedFps]
+            self.targetFps = higher[0] if higher else self.requestedFps
+
+    def stats(self):
+        """Return the pacing counters.
+
+        Returns:
+            dict: The requested, target and achieved rates and the frame counters.
+        """
+        return {"requestedFps": self.requestedFps,
+                "targetFps": self.targetFps,
+                "achievedFps": self.achievedFps,
+                "frames": self.frames,
+                "late": self.lateFrames,
+                "dropped": self.droppedFrames,
+                "coalesced": self.coalescedFrames}
+
+    def summary(self):
+        """Return the pacing counters as a single line of text.
+
+        Returns:
+            str: The achieved and target rates and the frame counters.
+        """
+        stats = self.stats()
+        return "%.1f / %.2f FPS | %d late | %d dropped | %d coalesced" % (
+            stats["achievedFps"], stats["targetFps"], stats["late"], stats["dropped"], stats["coalesced"])
@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2019 Giuliano França
+
+MIT License
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+====================================================================================================
+
+How to use:
+    * Call compileProgram() with the GL module and the shader sources while a context is current.
+    * Bind the returned program with glUseProgram and delete it with glDeleteProgram.
+    * Or keep a ProgramCache in the view and call use() with one of the kRenderModes on every draw.
+      Each program is compiled on its first use and only bound afterwards.
+    * drawMesh() draws a MeshBuffer with the programs of a render mode, as the viewer does.
+
+Dependencies:
+    * Python 3
+    * PyOpenGL
+    * Numpy
+
+Todo:
+    * NDA
+
+Sources:
+    * https://www.khronos.org/opengl/wiki/Shader_Compilation
+
+This code supports Pylint. Rc file in project.
+"""
+from viewer import transforms
+
+
+kWireframeVertexShader = """
+#version 120
+uniform mat4 modelViewProjection;
+
+void main()
+{
+    gl_Position = modelViewProjection * gl_Vertex;
+}
+"""
+
+kWireframeFragmentShader = """
+#version 120
+uniform vec4 color;
+
+void main()
+{
+    gl_FragColor = color;
+}
+"""
+
+kFlatVertexShader = """
+#version 120
+uniform mat4 modelViewProjection;
+uniform mat4 modelView;
+varying vec3 eyePosition;
+
+void main()
+{
+    eyePosition = (modelView * gl_Vertex).xyz;
+    gl_Position = modelViewProjection * gl_Vertex;
+}
+"""
+
+# The face normal comes from the screen space derivatives of the position, so flat shading does not
+# need per face vertices. The light is a headlight and both sides of the faces are lit.
+kFlatFragmentShader = """
+#version 120
+uniform vec4 color;
+varying vec3 eyePosition;
+
+void main()
+{
+    vec3 normal = normalize(cross(dFdx(eyePosition), dFdy(eyePosition)));
+    gl_FragColor = vec4(color.rgb * (0.25 + 0.75 * abs(normal.z)), color.a);
+}
+"""
+
+kSmoothVertexShader = """
+#version 120
+uniform mat4 modelViewProjection;
+uniform mat4 modelView;
+varying vec3 normal;
+
+void main()
+{
+    normal = mat3(modelView) * gl_Normal;
+    gl_Position = modelViewProjection * gl_Vertex;
+}
+"""
+
+kSmoothFragmentShader = """
+#version 120
+uniform vec4 color;
+varying vec3 normal;
+
+void main()
+{
+    gl_FragColor = vec4(color.rgb * (0.25 + 0.75 * abs(normalize(normal).z)), color.a);
+}
+"""
+
+# Shader sources of each render mode.
+kRenderModes = {"wireframe": (kWireframeVertexShader, kWireframeFragmentShader),
+                "flat": (kFlatVertexShader, kFlatFragmentShader),
+                "smooth": (kSmoothVertexShader, kSmoothFragmentShader)}
+
+# Render modes that read the vertex normals.
+kNormalModes = ("smooth",)
+
+
+class ShaderError(RuntimeError):
+    """Raised when a shader fails to compile or a program fails to link."""
+
+
+def _infoLog(log):
+    """Decode a shader or program info log.
+
+    Returns:
+        str: The log as text.
+    """
+    return log.decode("utf-8", "replace") if isinstance(log, bytes) else str(log)
+
+
+def compileShader(glModule, shaderType, source):
+    """Compile a single shader stage.
+
+    Args:
+        glModule (module): The OpenGL.GL module or a stand-in with the same functions.
+        shaderType (int): The stage, like GL_VERTEX_SHADER.
+        source (str): The GLSL source code.
+
+    Returns:
+        int: The shader name.
+    """
+    gl = glModule
+    shader = gl.glCreateShader(shaderType)
+    gl.glShaderSource(shader, source)
+    gl.glCompileShader(shader)
+    if not gl.glGetShaderiv(shader, gl.GL_COMPILE_STATUS):
+        log = _infoLog(gl.glGetShaderInfoLog(shader))
+        gl.glDeleteShader(shader)
+        raise ShaderError("Shader compilation failed:\n%s" % log)
+    return shader
+
+
+def compileProgram(glModule, vertexSource, fragmentSource, attributes=None):
+    """Compile and link a program from a vertex and a fragment shader.
+
+    Args:
+        glModule (module): The OpenGL.GL module or a stand-in with the same functions.
+        vertexSource (str): The GLSL source of the vertex shader.
+        fragmentSource (str): The GLSL source of the fragment shader.
+        attributes (dict): Optional attribute locations keyed by attribute name, bound before linking.
+
+    Returns:
+        int: The program name.
+    """
+    gl = glModule
+    shaders = [compileShader(gl, gl.GL_VERTEX_SHADER, vertexSource)]
+    try:
+        shaders.append(compileShader(gl, gl.GL_FRAGMENT_SHADER, fragmentSource))
+    except ShaderError:
+        gl.glDeleteShader(shaders[0])
+        raise
+    program = gl.glCreateProgram()
+    for shader in shaders:
+        gl.glAttachShader(program, shader)
+    for name, location in (attributes or {}).items():
+        gl.glBindAttribLocation(program, location, name)
+    gl.glLinkProgram(program)
+    for shader in shaders:
+        gl.glDetachShader(program, shader)
+        gl.glDeleteShader(shader)
+    if not gl.glGetProgramiv(program, gl.GL_LINK_STATUS):
+        log = _infoLog(gl.glGetProgramInfoLog(program))
+        gl.glDeleteProgram(program)
+        raise ShaderError("Program link failed:\n%s" % log)
+    return program
+
+
+class Program(object):
+    """A linked program with its uniform locations and the last uploaded values."""
+
+    def __init__(self, glModule, name):
+        self.gl = glModule
+        self.name = name
+        self.locations = {uniform: glModule.glGetUniformLocation(name, uniform) for uniform in ("modelViewProjection", "modelView", "color")}
+        self._camera = None
+        self._color = None
+
+    def setCamera(self, camera):
+        """Upload the camera matrices when they changed since the last upload. The program must be bound.
+
+        Args:
+            camera (Camera): The camera of the view.
+        """
+        key = (id(camera), camera.revision)
+        if key == self._camera:
+            return
+        self.gl.glUniformMatrix4fv(self.locations["modelViewProjection"], 1, self.gl.GL_FALSE, transforms.toGL(camera.mvp))
+        if self.locations["modelView"] not in (None, -1):
+            self.gl.glUniformMatrix4fv(self.locations["modelView"], 1, self.gl.GL_FALSE, transforms.toGL(camera.modelView))
+        self._camera = key
+
+    def setColor(self, red, green, blue, alpha=1.0):
+        """Upload the draw color when it changed. The program must be bound."""
+        color = (red, green, blue, alpha)
+        if color != self._color:
+            self.gl.glUniform4f(self.locations["color"], *color)
+            self._color = color
+
+
+class ProgramCache(object):
+    """The programs of the render modes, compiled once and switched by binding."""
+
+    def __init__(self, glModule, sources=None):
+        self.gl = glModule
+        self.sources = sources if sources is not None else kRenderModes
+        self._programs = {}
+
+    def use(self, mode, camera=None):
+        """Bind the program of a render mode, compiling it on first use.
+
+        Args:
+            mode (str): One of the keys of the sources, like "wireframe".
+            camera (Camera): Optional camera whose matrices are uploaded when they are stale.
+
+        Returns:
+            Program: The bound program.
+        """
+        program = self._programs.get(mode)
+        if program is None:
+            program = Program(self.gl, compileProgram(self.gl, *self.sources[mode]))
+            self._programs[mode] = program
+        program.gl = self.gl
+        self.gl.glUseProgram(program.name)
+        if camera is not None:
+            program.setCamera(camera)
+        return program
+
+    def release(self):
+        """Delete all programs. The GL context must be current."""
+        for program in self._programs.values():
+            self.gl.glDeleteProgram(program.name)
+        self._programs = {}
+
+
+def drawMesh(programs, buffer, camera, mode):
+    """Draw a mesh buffer as the viewer does: the shaded faces, the wireframe over them and the points.
+
+    Args:
+        programs (ProgramCache): The programs, whose GL module is used for the draw.
+        buffer (MeshBuffer): The uploaded mesh.
+        camera (Camera): The camera of the view.
+        mode (str): "wireframe", "flat" or "smooth". Smooth falls back to flat when the buffer has
+            no normals.
+    """
+    gl = programs.gl
+    if mode != "wireframe":
+        if mode == "smooth" and not buffer.hasNormals:
+            mode = "flat"
+        program = programs.use(mode, camera)
+        program.setColor(0.6, 0.6, 0.6)
+        buffer.draw("triangles")
+    program = programs.use("wireframe", camera)
+    program.setColor(1.0, 1.0, 1.0)
+    buffer.draw("lines")
+    program.setColor(1.0, 0.0, 0.0)
+    gl.glPointSize(6.0)
+    buffer.draw("points")
+    gl.glUseProgram(0)
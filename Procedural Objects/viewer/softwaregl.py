@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2019 Giuliano França
+
+MIT License
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+====================================================================================================
+
+How to use:
+    * Pass a SoftwareGL instance wherever a module expects the OpenGL.GL module.
+    * Inspect the calls, counters and buffer contents after drawing.
+
+Dependencies:
+    * Python 3
+    * Numpy
+
+Todo:
+    * NDA
+
+Sources:
+    * NDA
+
+This code supports Pylint. Rc file in project.
+"""
+import collections
+import numpy as np
+
+
+class SoftwareGL(object):
+    """Headless stand-in of the OpenGL.GL functions used by the viewer.
+
+    Buffers are kept as numpy byte arrays and every call is counted, so render code can be
+    checked without a display or a GL context.
+    """
+    # pylint: disable=invalid-name, unused-argument
+
+    GL_POINTS = 0x0000
+    GL_LINES = 0x0001
+    GL_TRIANGLES = 0x0004
+    GL_UNSIGNED_SHORT = 0x1403
+    GL_UNSIGNED_INT = 0x1405
+    GL_FLOAT = 0x1406
+    GL_VERTEX_ARRAY = 0x8074
+    GL_NORMAL_ARRAY = 0x8075
+    GL_COLOR_ARRAY = 0x8076
+    GL_ARRAY_BUFFER = 0x8892
+    GL_ELEMENT_ARRAY_BUFFER = 0x8893
+    GL_STATIC_DRAW = 0x88E4
+    GL_DYNAMIC_DRAW = 0x88E8
+    GL_FALSE = 0
+    GL_TRUE = 1
+    GL_DEPTH_BUFFER_BIT = 0x0100
+    GL_COLOR_BUFFER_BIT = 0x4000
+    GL_FRAGMENT_SHADER = 0x8B30
+    GL_VERTEX_SHADER = 0x8B31
+    GL_COMPILE_STATUS = 0x8B81
+    GL_LINK_STATUS = 0x8B82
+
+    def __init__(self):
+        self.calls = collections.Counter()
+        self.buffers = {}
+        self.bound = {}
+        self.clientState = set()
+        self.drawnVertices = 0
+        self.drawnInstances = 0
+        self._nextName = 1
+
+    def _genNames(self, count):
+        names = list(range(self._nextName, self._nextName + count))
+        self._nextName += count
+        return names[0] if count == 1 else names
+
+    def __getattr__(self, name):
+        if name.startswith("gl"):
+            def record(*args):
+                self.calls[name] += 1
+            return record
+        raise AttributeError(name)
+
+    def glGenBuffers(self, count):
+        """Return new buffer names."""
+        self.calls["glGenBuffers"] += 1
+        return self._genNames(count)
+
+    def glGenVertexArrays(self, count):
+        """Return new vertex array names."""
+        self.calls["glGenVertexArrays"] += 1
+        return self._genNames(count)
+
+    def glBindVertexArray(self, name):
+        """Bind a vertex array."""
+        self.calls["glBindVertexArray"] += 1
+        self.bound["vao"] = name
+
+    def glBindBuffer(self, target, name):
+        """Bind a buffer to a target."""
+        self.calls["glBindBuffer"] += 1
+        self.bound[target] = name
+
+    def glBufferData(self, target, size, data, usage):
+        """Allocate the bound buffer and copy the data."""
+        self.calls["glBufferData"] += 1
+        storage = np.zeros(size, dtype=np.uint8)
+        if data is not None:
+            storage[:] = np.frombuffer(np.ascontiguousarray(data).tobytes(), dtype=np.uint8)
+        self.buffers[self.bound[target]] = storage
+
+    def glBufferSubData(self, target, offset, size, data):
+        """Copy the data into the bound buffer storage."""
+        self.calls["glBufferSubData"] += 1
+        storage = self.buffers[self.bound[target]]
+        storage[offset:offset + size] = np.frombuffer(np.ascontiguousarray(data).tobytes(), dtype=np.uint8)
+
+    def glDeleteBuffers(self, count, names):
+        """Delete buffers."""
+        self.calls["glDeleteBuffers"] += 1
+        for name in names:
+            self.buffers.pop(name, None)
+
+    def glEnableClientState(self, array):
+        """Enable a client array."""
+        self.calls["glEnableClientState"] += 1
+        self.clientState.add(array)
+
+    def glDisableClientState(self, array):
+        """Disable a client array."""
+        self.calls["glDisableClientState"] += 1
+        self.clientState.discard(array)
+
+    def glDrawElements(self, mode, count, indexType, offset):
+        """Count the vertices submitted by an indexed draw."""
+        self.calls["glDrawElements"] += 1
+        self.drawnVertices += count
+
+    def glDrawArrays(self, mode, first, count):
+        """Count the vertices submitted by an array draw."""
+        self.calls["glDrawArrays"] += 1
+        self.drawnVertices += count
+
+    def glDrawElementsInstanced(self, mode, count, indexType, offset, instances):
+        """Count the vertices submitted by an instanced indexed draw."""
+        self.calls["glDrawElementsInstanced"] += 1
+        self.drawnVertices += count * instances
+        self.drawnInstances += instances
+
+    def glDrawArraysInstanced(self, mode, first, count, instances):
+        """Count the vertices submitted by an instanced array draw."""
+        self.calls["glDrawArraysInstanced"] += 1
+        self.drawnVertices += count * instances
+        self.drawnInstances += instances
+
+    def glCreateShader(self, shaderType):
+        """Return a new shader name."""
+        self.calls["glCreateShader"] += 1
+        return self._genNames(1)
+
+    def glCreateProgram(self):
+        """Return a new program name."""
+        self.calls["glCreateProgram"] += 1
+        return self._genNames(1)
+
+    def glGetShaderiv(self, shader, pname):
+        """Report every shader as compiled."""
+        self.calls["glGetShaderiv"] += 1
+        return self.GL_TRUE
+
+    def glGetProgramiv(self, program, pname):
+        """Report every program as linked."""
+        self.calls["glGetProgramiv"] += 1
+        return self.GL_TRUE
+
+    def bufferArray(self, name, dtype):
+        """Return the content of a buffer as an array.
+
+        Args:
+            name (int): The buffer name.
+            dtype (numpy.dtype): The type of the stored elements.
+
+        Returns:
+            numpy.ndarray: A view of the buffer storage.
+        """
+        return self.buffers[name].view(dtype)
+
+    @property
+    def totalCalls(self):
+        """Return the number of GL calls made so far.
+
+        Returns:
+            int: The total number of calls.
+        """
+        return sum(self.calls.values())
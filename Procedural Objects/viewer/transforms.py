@@ -0,0 +1,424 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2019 Giuliano França
+
+MIT License
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+====================================================================================================
+
+How to use:
+    * Build float32 4x4 matrices with the builder functions. Every builder also takes arrays of
+      inputs and returns a stack of matrices with shape (N, 4, 4), so instances and culling can
+      transform everything in one call.
+    * Matrices are row major and multiply column vectors (M @ v). Pass them through toGL() before
+      glLoadMatrixf, or upload them with the transpose flag.
+    * Keep a Camera per view and read its cached mvp or modelView on every paint.
+
+Dependencies:
+    * Python 3
+    * Numpy
+
+Todo:
+    * NDA
+
+Sources:
+    * https://www.khronos.org/registry/OpenGL-Refpages/gl2.1/xhtml/gluPerspective.xml
+    * https://www.khronos.org/registry/OpenGL-Refpages/gl2.1/xhtml/glOrtho.xml
+    * https://en.wikipedia.org/wiki/Quaternions_and_spatial_rotation
+
+This code supports Pylint. Rc file in project.
+"""
+import math
+import numpy as np
+
+
+def identity(count=None):
+    """Return identity matrices.
+
+    Args:
+        count (int): Number of matrices, or None for a single matrix.
+
+    Returns:
+        numpy.ndarray: A float32 matrix with shape (4, 4), or (count, 4, 4).
+    """
+    if count is None:
+        return np.eye(4, dtype=np.float32)
+    return np.tile(np.eye(4, dtype=np.float32), (count, 1, 1))
+
+
+def translation(offsets):
+    """Return translation matrices.
+
+    Args:
+        offsets (numpy.ndarray): The offsets with shape (3,) or (N, 3).
+
+    Returns:
+        numpy.ndarray: The float32 matrices with shape (4, 4) or (N, 4, 4).
+    """
+    offsets = np.asarray(offsets, dtype=np.float32)
+    matrices = np.zeros(offsets.shape[:-1] + (4, 4), dtype=np.float32)
+    matrices[..., [0, 1, 2, 3], [0, 1, 2, 3]] = 1.0
+    matrices[..., :3, 3] = offsets
+    return matrices
+
+
+def scaling(factors):
+    """Return scale matrices.
+
+    Args:
+        factors (float or numpy.ndarray): Uniform factors with shape () or (N,), or per axis
+            factors with shape (3,) or (N, 3).
+
+    Returns:
+        numpy.ndarray: The float32 matrices with shape (4, 4) or (N, 4, 4).
+    """
+    factors = np.asarray(factors, dtype=np.float32)
+    if factors.ndim == 0 or factors.shape[-1] != 3:
+        factors = np.repeat(factors[..., np.newaxis], 3, axis=-1)
+    matrices = np.zeros(factors.shape[:-1] + (4, 4), dtype=np.float32)
+    matrices[..., [0, 1, 2], [0, 1, 2]] = factors
+    matrices[..., 3, 3] = 1.0
+    return matrices
+
+
+def rotation(axis, degrees):
+    """Return rotation matrices around an axis, like glRotatef.
+
+    Args:
+        axis (numpy.ndarray): The rotation axes with shape (3,) or (N, 3). They do not need to be normalized.
+        degrees (float or numpy.ndarray): The angles with shape () or (N,).
+
+    Returns:
+        numpy.ndarray: The float32 matrices with shape (4, 4) or (N, 4, 4).
+    """
+    return quaternionMatrix(quaternion(axis, degrees))
+
+
+def perspective(fovY, aspect, near, far):
+    """Return the projection matrix of gluPerspective.
+
+    Args:
+        fovY (float): The vertical field of view in degrees.
+        aspect (float): The width divided by the height of the viewport.
+        near (float): Distance to the near clipping plane.
+        far (float): Distance to the far clipping plane.
+
+    Returns:
+        numpy.ndarray: The float32 matrix with shape (4, 4).
+    """
+    focal = 1.0 / math.tan(math.radians(fovY) * 0.5)
+    matrix = np.zeros((4, 4), dtype=np.float32)
+    matrix[0, 0] = focal / aspect
+    matrix[1, 1] = focal
+    matrix[2, 2] = (far + near) / (near - far)
+    matrix[2, 3] = 2.0 * far * near / (near - far)
+    matrix[3, 2] = -1.0
+    return matrix
+
+
+def orthographic(left, right, bottom, top, near, far):
+    """Return the projection matrix of glOrtho.
+
+    Returns:
+        numpy.ndarray: The float32 matrix with shape (4, 4).
+    """
+    matrix = np.eye(4, dtype=np.float32)
+    matrix[0, 0] = 2.0 / (right - left)
+    matrix[1, 1] = 2.0 / (top - bottom)
+    matrix[2, 2] = -2.0 / (far - near)
+    matrix[0, 3] = -(right + left) / (right - left)
+    matrix[1, 3] = -(top + bottom) / (top - bottom)
+    matrix[2, 3] = -(far + near) / (far - near)
+    return matrix
+
+
+def quaternion(axis, degrees):
+    """Return the quaternions of rotations around an axis.
+
+    Args:
+        axis (numpy.ndarray): The rotation axes with shape (3,) or (N, 3).
+        degrees (float or numpy.ndarray): The angles with shape () or (N,).
+
+    Returns:
+        numpy.ndarray: The float32 unit quaternions as (x, y, z, w), with shape (4,) or (N, 4).
+    """
+    axis = np.asarray(axis, dtype=np.float64)
+    halfAngle = np.radians(np.asarray(degrees, dtype=np.float64)) * 0.5
+    axis = axis / np.linalg.norm(axis, axis=-1, keepdims=True)
+    shape = np.broadcast_shapes(axis.shape[:-1], halfAngle.shape)
+    result = np.empty(shape + (4,), dtype=np.float32)
+    result[..., :3] = axis * np.sin(halfAngle)[..., np.newaxis]
+    result[..., 3] = np.cos(halfAngle)
+    return result
+
+
+def quaternionMultiply(a, b):
+    """Compose quaternions, the result rotates by b and then by a.
+
+    Args:
+        a (numpy.ndarray): Quaternions with shape (4,) or (N, 4).
+        b (numpy.ndarray): Quaternions with shape (4,) or (N, 4).
+
+    Returns:
+        numpy.ndarray: The float32 products.
+    """
+    a = np.asarray(a, dtype=np.float32)
+    b = np.asarray(b, dtype=np.float32)
+    ax, ay, az, aw = np.moveaxis(a, -1, 0)
+    bx, by, bz, bw = np.moveaxis(b, -1, 0)
+    return np.stack((aw * bx + ax * bw + ay * bz - az * by,
+                     aw * by - ax * bz + ay * bw + az * bx,
+                     aw * bz + ax * by - ay * bx + az * bw,
+                     aw * bw - ax * bx - ay * by - az * bz), axis=-1)
+
+
+def quaternionFromEuler(xDegrees, yDegrees, zDegrees):
+    """Return the quaternion of glRotatef calls around X, then Y, then Z.
+
+    Returns:
+        numpy.ndarray: The float32 quaternions with shape (4,) or (N, 4).
+    """
+    return quaternionMultiply(quaternionMultiply(quaternion((1.0, 0.0, 0.0), xDegrees), quaternion((0.0, 1.0, 0.0), yDegrees)),
+                              quaternion((0.0, 0.0, 1.0), zDegrees))
+
+
+def quaternionMatrix(quaternions):
+    """Convert unit quaternions to rotation matrices.
+
+    Args:
+        quaternions (numpy.ndarray): The (x, y, z, w) quaternions with shape (4,) or (N, 4).
+
+    Returns:
+        numpy.ndarray: The float32 matrices with shape (4, 4) or (N, 4, 4).
+    """
+    x, y, z, w = np.moveaxis(np.asarray(quaternions, dtype=np.float32), -1, 0)
+    matrices = np.zeros(x.shape + (4, 4), dtype=np.float32)
+    matrices[..., 0, 0] = 1.0 - 2.0 * (y * y + z * z)
+    matrices[..., 0, 1] = 2.0 * (x * y - z * w)
+    matrices[..., 0, 2] = 2.0 * (x * z + y * w)
+    matrices[..., 1, 0] = 2.0 * (x * y + z * w)
+    matrices[..., 1, 1] = 1.0 - 2.0 * (x * x + z * z)
+    matrices[..., 1, 2] = 2.0 * (y * z - x * w)
+    matrices[..., 2, 0] = 2.0 * (x * z - y * w)
+    matrices[..., 2, 1] = 2.0 * (y * z + x * w)
+    matrices[..., 2, 2] = 1.0 - 2.0 * (x * x + y * y)
+    matrices[..., 3, 3] = 1.0
+    return matrices
+
+
+def transformPoints(matrices, points):
+    """Transform points by affine matrices.
+
+    Args:
+        matrices (numpy.ndarray): The matrices with shape (4, 4) or (N, 4, 4).
+        points (numpy.ndarray): The points with shape (3,), (M, 3) or, with N matrices, (N, 3) to
+            transform one point by each matrix.
+
+    Returns:
+        numpy.ndarray: The float32 transformed points.
+    """
+    matrices = np.asarray(matrices, dtype=np.float32)
+    points = np.asarray(points, dtype=np.float32)
+    if matrices.ndim == 3:
+        return np.einsum("nij,nj->ni", matrices[:, :3, :3], points) + matrices[:, :3, 3]
+    return points @ matrices[:3, :3].T + matrices[:3, 3]
+
+
+def toGL(matrices):
+    """Return matrices in the column major layout of glLoadMatrixf and the GLSL mat4 attributes.
+
+    Args:
+        matrices (numpy.ndarray): Row major matrices with shape (4, 4) or (N, 4, 4).
+
+    Returns:
+        numpy.ndarray: Contiguous float32 transposed matrices.
+    """
+    return np.ascontiguousarray(np.swapaxes(np.asarray(matrices, dtype=np.float32), -1, -2))
+
+
+class Camera(object):
+    """Projection, view and model rotation of a viewer, with the composed matrices cached.
+
+    The products are only rebuilt when one of their inputs changed. The revision counter increases
+    on every change, so the users can skip uploading a matrix that is already on the GPU.
+    """
+
+    def __init__(self, fovY=45.0, aspect=1.0, near=1.0, far=100.0, distance=5.0):
+        self.revision = 0
+        self._projection = perspective(fovY, aspect, near, far)
+        self._perspective = (fovY, aspect, near, far)
+        self._orbit = (distance, 0.0, 0.0)
+        self._view = None
+        self._rotation = np.array([0.0, 0.0, 0.0, 1.0], dtype=np.float32)
+        self._model = None
+        self._modelView = None
+        self._mvp = None
+
+    def _changed(self, view=False, model=False):
+        """Drop the cached products depending on the changed input."""
+        self.revision += 1
+        if view:
+            self._view = None
+        if model:
+            self._model = None
+        if view or model:
+            self._modelView = None
+        self._mvp = None
+
+    def setPerspective(self, fovY=None, aspect=None, near=None, far=None):
+        """Change the perspective projection, keeping the values that are not given.
+
+        Args:
+            fovY (float): The vertical field of view in degrees.
+            aspect (float): The width divided by the height of the viewport.
+            near (float): Distance to the near clipping plane.
+            far (float): Distance to the far clipping plane.
+        """
+        values = tuple(old if new is None else float(new) for old, new in zip(self._perspective, (fovY, aspect, near, far)))
+        if values == self._perspective:
+            return
+        self._perspective = values
+        self._projection = perspective(*values)
+        self._changed()
+
+    def setOrthographic(self, left, right, bottom, top, near, far):
+        """Use an orthographic projection.
+
+        Args:
+            left (float): The left clipping plane.
+            right (float): The right clipping plane.
+            bottom (float): The bottom clipping plane.
+            top (float): The top clipping plane.
+            near (float): Distance to the near clipping plane.
+            far (float): Distance to the far clipping plane.
+        """
+        self._perspective = (None, None, None, None)
+        self._projection = orthographic(left, right, bottom, top, near, far)
+        self._changed()
+
+    def setOrbit(self, distance=None, pitch=None, yaw=None):
+        """Place the camera on an orbit around the origin, keeping the values that are not given.
+
+        Args:
+            distance (float): Distance from the origin.
+            pitch (float): Rotation around X in degrees.
+            yaw (float): Rotation around Y in degrees.
+        """
+        values = tuple(old if new is None else float(new) for old, new in zip(self._orbit, (distance, pitch, yaw)))
+        if values == self._orbit:
+            return
+        self._orbit = values
+        self._changed(view=True)
+
+    def setRotation(self, rotation):
+        """Set the rotation of the model.
+
+        Args:
+            rotation (numpy.ndarray): An (x, y, z, w) unit quaternion.
+        """
+        rotation = np.asarray(rotation, dtype=np.float32)
+        if np.array_equal(rotation, self._rotation):
+            return
+        self._rotation = rotation
+        self._changed(model=True)
+
+    @property
+    def fovY(self):
+        """Return the vertical field of view.
+
+        Returns:
+            float: The field of view in degrees, or None with an orthographic projection.
+        """
+        return self._perspective[0]
+
+    @property
+    def distance(self):
+        """Return the distance of the camera to the origin.
+
+        Returns:
+            float: The orbit distance.
+        """
+        return self._orbit[0]
+
+    @property
+    def projection(self):
+        """Return the projection matrix.
+
+        Returns:
+            numpy.ndarray: The float32 matrix with shape (4, 4).
+        """
+        return self._projection
+
+    @property
+    def view(self):
+        """Return the view matrix.
+
+        Returns:
+            numpy.ndarray: The float32 matrix with shape (4, 4).
+        """
+        if self._view is None:
+            distance, pitch, yaw = self._orbit
+            self._view = translation((0.0, 0.0, -distance)) @ rotation((1.0, 0.0, 0.0), pitch) @ rotation((0.0, 1.0, 0.0), yaw)
+        return self._view
+
+    @property
+    def model(self):
+        """Return the model matrix.
+
+        Returns:
+            numpy.ndarray: The float32 matrix with shape (4, 4).
+        """
+        if self._model is None:
+            self._model = quaternionMatrix(self._rotation)
+        return self._model
+
+    @property
+    def modelView(self):
+        """Return the view times the model matrix.
+
+        Returns:
+            numpy.ndarray: The float32 matrix with shape (4, 4).
+        """
+        if self._modelView is None:
+            self._modelView = self.view @ self.model
+        return self._modelView
+
+    @property
+    def mvp(self):
+        """Return the composed model view projection matrix.
+
+        Returns:
+            numpy.ndarray: The float32 matrix with shape (4, 4).
+        """
+        if self._mvp is None:
+            self._mvp = self.projection @ self.modelView
+        return self._mvp
+
+    def mvpBatch(self, models):
+        """Compose the cached model view projection with many model matrices at once.
+
+        Args:
+            models (numpy.ndarray): Model matrices with shape (N, 4, 4), applied before the camera model.
+
+        Returns:
+            numpy.ndarray: The float32 matrices with shape (N, 4, 4).
+        """
+        return np.matmul(self.mvp, models)
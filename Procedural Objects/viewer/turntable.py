@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2019 Giuliano França
+
+MIT License
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+====================================================================================================
+
+How to use:
+    * Create a headless context with offscreen.createContext(), then a TurntableRenderer.
+    * Call render() with a shape, the number of angles and a writer: a PngSequenceWriter or a
+      RawVideoWriter. The writer runs in a FrameEncoder thread, so the encoding of a frame overlaps
+      the rendering of the next ones, and render() returns the frames per second.
+    * A raw video can be piped into ffmpeg:
+      ffmpeg -f rawvideo -pix_fmt rgba -s 512x512 -r 30 -i - turntable.mp4
+
+Dependencies:
+    * Python 3
+    * PyOpenGL
+    * Numpy
+
+Todo:
+    * NDA
+
+Sources:
+    * https://www.w3.org/TR/png/
+    * https://trac.ffmpeg.org/wiki/Encode/H.264
+
+This code supports Pylint. Rc file in project.
+"""
+import os
+import sys
+import math
+import time
+import zlib
+import queue
+import struct
+import threading
+import numpy as np
+
+from viewer import meshbuffer
+from viewer import offscreen
+from viewer import shaders
+from viewer import transforms
+
+
+kBackgroundColor = (0.14, 0.14, 0.14, 0.0)  # The background of the viewer.
+kFieldOfView = 45.0
+kViewTilt = 15.0
+kPngSignature = b"\x89PNG\r\n\x1a\n"
+
+
+def _pngChunk(kind, data):
+    """Return a PNG chunk with its length and CRC."""
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+def encodePng(pixels, compressLevel=6):
+    """Encode RGBA pixels as a PNG file.
+
+    Every row uses the "up" filter, the difference with the row above, computed in one vectorized
+    pass. Rendered images have large flat areas, so it compresses much better than no filter.
+
+    Args:
+        pixels (numpy.ndarray): The uint8 pixels with shape (height, width, 4), top row first.
+        compressLevel (int): The zlib level, from 1 (fastest) to 9 (smallest).
+
+    Returns:
+        bytes: The PNG file.
+    """
+    height, width, _ = pixels.shape
+    rows = np.empty((height, width * 4 + 1), dtype=np.uint8)
+    rows[:, 0] = 2
+    rows[0, 1:] = pixels[0].reshape(-1)
+    np.subtract(pixels[1:].reshape(height - 1, width * 4), pixels[:-1].reshape(height - 1, width * 4), out=rows[1:, 1:])
+    header = struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)
+    return (kPngSignature
+            + _pngChunk(b"IHDR", header)
+            + _pngChunk(b"IDAT", zlib.compress(rows.tobytes(), compressLevel))
+            + _pngChunk(b"IEND", b""))
+
+
+class PngSequenceWriter(object):
+    """Writes every frame to its own numbered PNG file."""
+
+    def __init__(self, folder, name="frame", compressLevel=6):
+        self.folder = folder
+        self.name = name
+        self.compressLevel = compressLevel
+        os.makedirs(folder, exist_ok=True)
+
+    def write(self, index, pixels):
+        """Encode and save one frame.
+
+        Args:
+            index (int): The frame number.
+            pixels (numpy.ndarray): The uint8 RGBA pixels, top row first.
+        """
+        with open(os.path.join(self.folder, "%s_%04d.png" % (self.name, index)), "wb") as imageFile:
+            imageFile.write(encodePng(pixels, self.compressLevel))
+
+    def close(self):
+        """Nothing to flush, every frame is in its own file."""
+
+
+class RawVideoWriter(object):
+    """Writes the frames one after the other as raw RGBA, the rawvideo input format of ffmpeg."""
+
+    def __init__(self, path):
+        self._file = sys.stdout.buffer if path == "-" else open(path, "wb")
+
+    def write(self, index, pixels):
+        """Append one frame to the stream. The frames must come in order.
+
+        Args:
+            index (int): The frame number.
+            pixels (numpy.ndarray): The uint8 RGBA pixels, top row first.
+        """
+        # pylint: disable=unused-argument
+        self._file.write(np.ascontiguousarray(pixels).data)
+
+    def close(self):
+        """Flush the stream and close the file."""
+        self._file.flush()
+        if self._file is not sys.stdout.buffer:
+            self._file.close()
+
+
+class FrameEncoder(object):
+    """Runs a writer in a background thread, fed through a bounded queue.
+
+    zlib and the file writes release the GIL, so the encoding runs in parallel with the rendering.
+    The queue blocks the renderer when the writer falls behind, which bounds the memory.
+    """
+
+    def __init__(self, writer, maxPending=8):
+        self.writer = writer
+        self.frames = 0
+        self.seconds = 0.0
+        self._error = None
+        self._queue = queue.Queue(maxPending)
+        self._thread = threading.Thread(target=self._run, name="FrameEncoder", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        """Write the queued frames until the None sentinel. Frames after an error are dropped."""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            if self._error is not None:
+                continue
+            index, pixels = item
+            start = time.perf_counter()
+            try:
+                # The rows come from glReadPixels bottom first.
+                self.writer.write(index, pixels[::-1])
+            except Exception as error:  # pylint: disable=broad-except
+                self._error = error
+            self.seconds += time.perf_counter() - start
+            self.frames += 1
+
+    def submit(self, index, pixels):
+        """Queue a frame, waiting when the queue is full.
+
+        Args:
+            index (int): The frame number.
+            pixels (numpy.ndarray): The uint8 RGBA pixels as read from GL, bottom row first.
+        """
+        if self._error is not None:
+            raise self._error
+        self._queue.put((index, pixels))
+
+    def close(self):
+        """Wait for the queued frames and close the writer.
+
+        Raises:
+            Exception: The first error of the writer.
+        """
+        self._queue.put(None)
+        self._thread.join()
+        self.writer.close()
+        if self._error is not None:
+            raise self._error
+
+
+class TurntableRenderer(object):
+    """Renders a shape spinning around the Y axis into an offscreen framebuffer.
+
+    The shape is drawn with the programs and the draw path of the viewer. The pixels are read back
+    through a PixelReader, so the transfer of a frame overlaps the rendering of the next one.
+    """
+
+    def __init__(self, glModule, width=512, height=512, mode="flat"):
+        self.gl = glModule
+        self.width = width
+        self.height = height
+        self.mode = mode
+        self.framebuffer = offscreen.Framebuffer(width, height)
+        self.reader = offscreen.PixelReader(glModule, width, height)
+        self.meshBuffers = meshbuffer.MeshBufferCache(glModule)
+        self.programs = shaders.ProgramCache(glModule)
+        self.camera = transforms.Camera(kFieldOfView, width / height)
+        self.camera.setOrbit(pitch=kViewTilt)
+
+        # The state set by the viewer in initializeGL.
+        gl = glModule
+        gl.glClearColor(*kBackgroundColor)
+        gl.glDisable(gl.GL_CULL_FACE)
+        gl.glEnable(gl.GL_BLEND)
+        gl.glBlendFunc(gl.GL_SRC_ALPHA, gl.GL_ONE_MINUS_SRC_ALPHA)
+        gl.glEnable(gl.GL_DEPTH_TEST)
+        gl.glEnable(gl.GL_POLYGON_OFFSET_FILL)
+        gl.glPolygonOffset(1.0, 1.0)
+
+    def fit(self, shape):
+        """Move the camera so the bounding sphere of the shape fills the image at every angle.
+
+        Args:
+            shape (ShapeGeometry): The shape to frame.
+        """
+        radius = max(shape.boundingRadius, 1e-3)
+        halfFov = math.radians(kFieldOfView * 0.5)
+        if self.width < self.height:
+            halfFov = math.atan(math.tan(halfFov) * self.width / self.height)
+        distance = radius / math.sin(halfFov) * 1.05
+        self.camera.setOrbit(distance=distance)
+        self.camera.setPerspective(near=max(distance - radius * 1.1, distance * 0.01), far=distance + radius * 1.1)
+
+    def draw(self, shape, degrees):
+        """Draw one frame of the shape into the framebuffer.
+
+        Args:
+            shape (ShapeGeometry): The shape, uploaded on the first draw.
+            degrees (float): The rotation of the shape around the Y axis.
+        """
+        gl = self.gl
+        self.camera.setRotation(transforms.quaternion((0.0, 1.0, 0.0), degrees))
+        self.framebuffer.bind()
+        gl.glClear(gl.GL_COLOR_BUFFER_BIT | gl.GL_DEPTH_BUFFER_BIT)
+        buffer = self.meshBuffers.get(shape, normals=self.mode in shaders.kNormalModes)
+        shaders.drawMesh(self.programs, buffer, self.camera, self.mode)
+
+    def render(self, shape, frames, writer=None):
+        """Render evenly spaced angles of a full turn and hand the frames to a writer.
+
+        Args:
+            shape (ShapeGeometry): The shape to render.
+            frames (int): Number of angles.
+            writer (PngSequenceWriter or RawVideoWriter): Receives the frames in an encoder thread.
+                Without a writer the frames are only read back, which measures the GPU side.
+
+        Returns:
+            dict: The frame count, the total seconds and frames per second, and the frames per
+                second of the rendering with the readback and of the encoding alone.
+        """
+        self.fit(shape)
+        encoder = FrameEncoder(writer) if writer is not None else None
+        start = time.perf_counter()
+        for index in range(frames + 1):
+            if index < frames:
+                self.draw(shape, 360.0 * index / frames)
+                pixels = self.reader.read()
+            else:
+                pixels = self.reader.finish()
+            if pixels is not None and encoder is not None:
+                encoder.submit(index - 1, pixels)
+        renderSeconds = time.perf_counter() - start
+        if encoder is not None:
+            encoder.close()
+        seconds = time.perf_counter() - start
+        encodeSeconds = encoder.seconds if encoder is not None else 0.0
+        return {"frames": frames,
+                "seconds": seconds,
+                "fps": frames / seconds if seconds else 0.0,
+                "renderFps": frames / renderSeconds if renderSeconds else 0.0,
+                "encodeFps": frames / encodeSeconds if encodeSeconds else 0.0}
+
+    def release(self):
+        """Delete the GL objects. The context must be current."""
+        self.reader.release()
+        self.programs.release()
+        self.meshBuffers.release()
+        self.framebuffer.release()
@@ -6,12 +6,15 @@ Redistribution:
     MIT License.
 
 How to use:
-    * Pass
+    * Run the file from a checkout of the whole project. The matrices come from viewer.transforms,
+      imported from the "Procedural Objects" folder next to this one.
 
 Requirements:
     * Python 3
     * PyOpenGL
     * PySide2
+    * Numpy
+    * The viewer package of the "Procedural Objects" folder, added to sys.path on import.
 
 Todo:
     * NDA
@@ -24,10 +27,14 @@ Source:
 
 This code supports Pylint. Rc file in project.
 """
+import os
 import sys
 import OpenGL.GL as gl
 from PyQt5 import QtWidgets, QtCore
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "Procedural Objects"))
+from viewer import transforms  # pylint: disable=wrong-import-position
+
 
 kVerticies = [[1.0, -1.0, -1.0],
               [1.0, 1.0, -1.0],
@@ -88,6 +95,7 @@ class PySideOpenGL(QtWidgets.QOpenGLWidget):
         self.xRot = 0               # Rotation variables
         self.yRot = 0
         self.zRot = 0
+        self.camera = transforms.Camera(distance=10.0)
 
         self.lastPos = QtCore.QPoint()
 
@@ -115,22 +123,18 @@ class PySideOpenGL(QtWidgets.QOpenGLWidget):
         if side < 0:
             return
         gl.glViewport((w - side) // 2, (h - side) // 2, side, side)
-        gl.glMatrixMode(gl.GL_PROJECTION)
-        gl.glLoadIdentity()
         if self.resizeLines:
-            gl.glOrtho(-50, 50, -50, 50, -50.0, 50.0)
+            self.camera.setOrthographic(-50, 50, -50, 50, -50.0, 50.0)
         else:
-            gl.glOrtho(-2, 2, -2, 2, 1.0, 15.0) # original pyramid settings
+            self.camera.setOrthographic(-2, 2, -2, 2, 1.0, 15.0) # original pyramid settings
+        gl.glMatrixMode(gl.GL_PROJECTION)
+        gl.glLoadMatrixf(transforms.toGL(self.camera.projection))
         gl.glMatrixMode(gl.GL_MODELVIEW)
 
     def paintGL(self):
         """ This virtual function is called whenever the widget needs to be painted. """
         gl.glClear(gl.GL_COLOR_BUFFER_BIT | gl.GL_DEPTH_BUFFER_BIT)
-        gl.glLoadIdentity()
-        gl.glTranslatef(0.0, 0.0, -10.0)
-        gl.glRotatef(self.xRot / 16.0, 1.0, 0.0, 0.0)
-        gl.glRotatef(self.yRot / 16.0, 0.0, 1.0, 0.0)
-        gl.glRotatef(self.zRot / 16.0, 0.0, 0.0, 1.0)
+        gl.glLoadMatrixf(transforms.toGL(self.camera.modelView))
         self.draw()
 
     def draw(self):
@@ -223,11 +227,16 @@ class PySideOpenGL(QtWidgets.QOpenGLWidget):
             angle -= 360 * 16
         return angle
 
+    def updateRotation(self):
+        """ Send the rotation angles to the camera, the angles are in 1/16th of degree. """
+        self.camera.setRotation(transforms.quaternionFromEuler(self.xRot / 16.0, self.yRot / 16.0, self.zRot / 16.0))
+
     def setXRotation(self, angle):
         """ Set x rotation. """
         angle = self.normalizeAngle(angle)
         if angle != self.xRot:
             self.xRot = angle
+            self.updateRotation()
             self.xRotChanged.emit(angle)
             self.update()
 
@@ -236,6 +245,7 @@ class PySideOpenGL(QtWidgets.QOpenGLWidget):
         angle = self.normalizeAngle(angle)
         if angle != self.yRot:
             self.yRot = angle
+            self.updateRotation()
             self.yRotChanged.emit(angle)
             self.update()
 
@@ -244,6 +254,7 @@ class PySideOpenGL(QtWidgets.QOpenGLWidget):
         angle = self.normalizeAngle(angle)
         if angle != self.zRot:
             self.zRot = angle
+            self.updateRotation()
             self.zRotChanged.emit(angle)
             self.update()
 
@@ -36,7 +36,6 @@ Dependencies:
 
 Todo:
     * Add the other draw types
-    * Fix the rotation intensity to all fps settings.
     * Add wireframe drawing option.
     * [FUTURE] Add a import file based system to read FBX in a future version.
 
@@ -49,14 +48,19 @@ Sources:
 
 This code supports Pylint. Rc file in project.
 """
+import os
 import sys
-import math
-import collections
-import numpy as np
 import OpenGL.GL as gl
-import OpenGL.GLU as glu
 from PySide2 import QtWidgets, QtCore
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "Procedural Objects"))
+from objects import geometry  # pylint: disable=wrong-import-position
+from objects import mesh  # pylint: disable=wrong-import-position
+from viewer import meshbuffer  # pylint: disable=wrong-import-position
+from viewer import profiler  # pylint: disable=wrong-import-position
+from viewer import scheduler  # pylint: disable=wrong-import-position
+from viewer import transforms  # pylint: disable=wrong-import-position
+
 
 kVerticies = [[1.0, -1.0, -1.0],
               [1.0, 1.0, -1.0],
@@ -67,19 +71,6 @@ kVerticies = [[1.0, -1.0, -1.0],
               [-1.0, -1.0, 1.0],
               [-1.0, 1.0, 1.0]]
 
-kEdges = [[0, 1],
-          [0, 3],
-          [0, 4],
-          [2, 1],
-          [2, 3],
-          [2, 7],
-          [6, 3],
-          [6, 4],
-          [6, 7],
-          [5, 1],
-          [5, 4],
-          [5, 7]]
-
 kSurfaces = [[0, 1, 2, 3],
              [3, 2, 7, 6],
              [6, 7, 5, 4],
@@ -87,6 +78,14 @@ kSurfaces = [[0, 1, 2, 3],
              [1, 5, 7, 2],
              [4, 0, 3, 6]]
 
+# Rotation speed of the animation with a rotMult of 1.0, independent of the frame rate.
+kDegreesPerSecond = 60.0
+
+kTriangles = [[surface[0], surface[i], surface[i + 1]] for surface in kSurfaces for i in (1, 2)]
+
+# The lists above are only the source of the cube, drawing uses this packed copy with the edges found from the faces.
+kCubeMesh = mesh.Mesh(kVerticies, {"lines": geometry.uniqueEdges(kSurfaces), "triangles": kTriangles})
+
 
 class DrawTypes(object):
     """
@@ -117,11 +116,12 @@ class MainWindow(QtWidgets.QMainWindow):
         self.widget.drawType = DrawTypes.kTorus
         self.widget.rotMult = 1.0
 
-        self.fpsList = {"12": 1000.0 / 12.0,
-                        "24": 1000.0 / 24.0,
-                        "29.97": 1000.0 / 29.97,
-                        "30": 1000.0 / 30.0,
-                        "60": 1000.0 / 60.0}
+        self.fpsList = {"12": 12.0,
+                        "24": 24.0,
+                        "29.97": 29.97,
+                        "30": 30.0,
+                        "60": 60.0}
+        self.scheduler = scheduler.FrameScheduler()
 
         self.exitAction = QtWidgets.QAction('Quit', self)
         self.exitAction.setShortcut('Ctrl+Q')
@@ -159,6 +159,17 @@ class MainWindow(QtWidgets.QMainWindow):
         self.setFPS60Action.triggered.connect(lambda: self.setFPS("60"))
         self.setFPS60Action.setCheckable(True)
         self.fpsActionList.append(self.setFPS60Action)
+        self.profileFramesAction = QtWidgets.QAction('Profile frames', self)
+        self.profileFramesAction.setCheckable(True)
+        self.profileFramesAction.setShortcut('Ctrl+Shift+P')
+        self.profileFramesAction.toggled.connect(self.toggleProfiling)
+        self.saveFrameTraceAction = QtWidgets.QAction('Save frame trace...', self)
+        self.saveFrameTraceAction.triggered.connect(self.saveFrameTrace)
+        self.adaptiveFPSAction = QtWidgets.QAction('Adaptive FPS', self)
+        self.adaptiveFPSAction.setCheckable(True)
+        self.adaptiveFPSAction.setChecked(True)
+        self.adaptiveFPSAction.setStatusTip("Lower the frame rate when the frames can not keep up.")
+        self.adaptiveFPSAction.toggled.connect(self.toggleAdaptiveFPS)
 
         fileMenu = self.menuBar().addMenu("&File")
         drawTypeMenu = fileMenu.addMenu("&Draw Type")
@@ -175,29 +186,91 @@ class MainWindow(QtWidgets.QMainWindow):
         self.fpsMenu.addAction(self.setFPS2997Action)
         self.fpsMenu.addAction(self.setFPS30Action)
         self.fpsMenu.addAction(self.setFPS60Action)
+        self.fpsMenu.addSeparator()
+        self.fpsMenu.addAction(self.adaptiveFPSAction)
+        animationMenu.addSeparator()
+        animationMenu.addAction(self.profileFramesAction)
+        animationMenu.addAction(self.saveFrameTraceAction)
 
+        # Single shot timer restarted on every tick against the scheduler deadlines.
         self.timer = QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(QtCore.Qt.PreciseTimer)
+        self.timer.timeout.connect(self.tick)
+        self.widget.frameSwapped.connect(self.scheduler.framePresented)
         self.setFPS("60")
-        self.timer.timeout.connect(self.widget.spin)
+        self.statsTimer = QtCore.QTimer(self)
+        self.statsTimer.setInterval(500)
+        self.statsTimer.timeout.connect(self.showStats)
 
         self.setWindowTitle("Testing PyOpenGL with PySide2 - Procedural objects")
 
     def togglePlayAnimation(self):
         """ Toggle play animation. """
         if self.playAnimationAction.isChecked():
-            self.timer.start()
+            self.scheduler.start()
+            self.timer.start(self.scheduler.nextDelay())
         else:
             self.timer.stop()
+            self.scheduler.stop()
+        self.updateStatsTimer()
+
+    def tick(self):
+        """ Advance the animation by the elapsed time and schedule the next tick. """
+        self.widget.spin(self.scheduler.tick())
+        if self.scheduler.requestFrame():
+            self.widget.update()
+        if self.playAnimationAction.isChecked():
+            self.timer.start(self.scheduler.nextDelay())
 
     def setFPS(self, fps):
         """ Set the Frame per Second. """
-        self.timer.setInterval(self.fpsList[fps])
+        self.scheduler.setTargetFps(self.fpsList[fps])
         for action in self.fpsActionList:
             if fps in action.text():
                 action.setChecked(True)
             else:
                 action.setChecked(False)
 
+    def toggleAdaptiveFPS(self, enabled):
+        """ Enable or disable the automatic frame rate lowering under load. """
+        self.scheduler.adaptive = enabled
+        self.scheduler.setTargetFps(self.scheduler.requestedFps)
+
+    def toggleProfiling(self, enabled):
+        """ Enable or disable the frame profiler. """
+        if enabled:
+            self.widget.setProfiler(profiler.FrameProfiler())
+        else:
+            self.widget.setProfiler(profiler.NullProfiler())
+        self.updateStatsTimer()
+
+    def updateStatsTimer(self):
+        """ Show the statistics while the animation plays or the profiler records. """
+        if self.playAnimationAction.isChecked() or self.widget.profiler.enabled:
+            self.statsTimer.start()
+        else:
+            self.statsTimer.stop()
+            self.statusBar().clearMessage()
+
+    def showStats(self):
+        """ Show the achieved frame rate and the frame time statistics in the status bar. """
+        messages = []
+        if self.playAnimationAction.isChecked():
+            messages.append(self.scheduler.summary())
+        if self.widget.profiler.enabled:
+            messages.append(self.widget.profiler.summary())
+        self.statusBar().showMessage(" || ".join(messages))
+
+    def saveFrameTrace(self):
+        """ Save the recorded frame timings as a Chrome trace file. """
+        if not self.widget.profiler.enabled:
+            self.statusBar().showMessage("Enable Animation > Profile frames to record a trace.", 3000)
+            return
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Save frame trace", "frametrace.json", "Trace (*.json)")
+        if path:
+            self.widget.profiler.dumpChromeTrace(path)
+
     def setDrawType(self, typ):
         """ Set the draw type geometry. """
         self.widget.drawType = typ
@@ -215,6 +288,12 @@ class PySideOpenGL(QtWidgets.QOpenGLWidget):
         self.rotAxis = [1.0, 1.0, 1.0]
         self.resizeSize = QtCore.QSize(800, 600)
         self.drawType = DrawTypes.kCubeLines
+        self.meshBuffers = {}
+        self.profiler = profiler.NullProfiler()
+        self.glApi = gl
+        self.camera = transforms.Camera(45.0, self.resizeSize.width() / self.resizeSize.height(), 1.0, 100.0, 5.0)
+        self._swapStart = 0.0
+        self.frameSwapped.connect(self.onFrameSwapped)
 
         self.setMinimumSize(self.resizeSize)
 
@@ -234,116 +313,67 @@ class PySideOpenGL(QtWidgets.QOpenGLWidget):
         """ This virtual function is called whenever the widget has been resized. """
         # pylint: disable=invalid-name
         gl.glViewport(0, 0, w, h)
+        self.camera.setPerspective(aspect=w / max(h, 1))
         gl.glMatrixMode(gl.GL_PROJECTION)
-        gl.glLoadIdentity()
-        glu.gluPerspective(45, (self.resizeSize.width() / self.resizeSize.height()), 1.0, 100.0)
+        gl.glLoadMatrixf(transforms.toGL(self.camera.projection))
         gl.glMatrixMode(gl.GL_MODELVIEW)
 
+    def setProfiler(self, frameProfiler):
+        """ Set the profiler that records the frames, or a NullProfiler to disable it. """
+        self.profiler = frameProfiler
+        self.glApi = profiler.CountingGL(gl, frameProfiler) if frameProfiler.enabled else gl
+        for buffer in self.meshBuffers.values():
+            buffer.gl = self.glApi
+
+    def onFrameSwapped(self):
+        """ Close the frame in the profiler once the buffers were swapped. """
+        self.profiler.end("swap", self._swapStart)
+        self.profiler.frameEnd()
+
     def paintGL(self):
         """ This virtual function is called whenever the widget needs to be painted. """
-        gl.glClear(gl.GL_COLOR_BUFFER_BIT | gl.GL_DEPTH_BUFFER_BIT)
-        gl.glLoadIdentity()
-        gl.glTranslatef(0.0, 0.0, -5.0)
-        gl.glRotatef(self.yRotDeg, self.rotAxis[0], self.rotAxis[1], self.rotAxis[2])
-        self.draw()
+        self.profiler.frameBegin()
+        glApi = self.glApi
+        with self.profiler.phase("paintGL"):
+            glApi.glClear(glApi.GL_COLOR_BUFFER_BIT | glApi.GL_DEPTH_BUFFER_BIT)
+            glApi.glLoadMatrixf(transforms.toGL(self.camera.modelView))
+            self.draw()
+        self._swapStart = self.profiler.begin("swap")
+
+    def meshBuffer(self):
+        """ Return the GPU buffer of the current draw type, uploading it on first use. """
+        meshType = DrawTypes.kTorus if self.drawType == DrawTypes.kTorus else DrawTypes.kCube
+        buffer = self.meshBuffers.get(meshType)
+        if buffer is None:
+            buffer = meshbuffer.MeshBuffer(self.glApi)
+            if meshType == DrawTypes.kTorus:
+                positions, _ = geometry.torusGrid(15, 20, 1.0, 0.5)
+                buffer.upload(mesh.Mesh(positions, {"lines": geometry.torusLineIndices(15, 20)}))
+            else:
+                buffer.upload(kCubeMesh)
+            self.meshBuffers[meshType] = buffer
+        return buffer
 
     def draw(self):
         """ Draw objects. """
-        if self.drawType == DrawTypes.kCubeLines:
-            gl.glBegin(gl.GL_LINES)
-            gl.glColor3f(1.0, 1.0, 1.0)
-            for edge in kEdges:
-                for vertex in edge:
-                    gl.glVertex3f(kVerticies[vertex][0], kVerticies[vertex][1], kVerticies[vertex][2])  # or gl.glVertex3fv(kVertices[vertex])
-            gl.glEnd()
-            # width = 1.0         # X
-            # height = 1.0        # Y
-            # depth = 1.0         # Z
-            # subdWidth = 1
-            # subdHeight = 1
-            # subdDepth = 1
-            # gl.glPointSize(3)
-            # gl.glBegin(gl.GL_POINTS)
-            # for w in range(subdWidth):
-            #     wStep = width / subdWidth
-            #     for h in range(subdHeight):
-            #         hStep = height / subdHeight
-            #         gl.glVertex3f(wStep * (w - width), hStep * (w - height), 0.0)
-            # gl.glEnd()
-        elif self.drawType == DrawTypes.kCube:
-            gl.glBegin(gl.GL_QUADS)
-            for surface in kSurfaces:
-                gl.glColor4f(0.5, 0.5, 0.5, 1.0)
-                for vertex in surface:
-                    gl.glVertex3f(kVerticies[vertex][0], kVerticies[vertex][1], kVerticies[vertex][2])
-            # gl.glColor4f(0.6, 0.6, 0.6, 0.6)
-            # for i in range(len(kVerticies) - 1):
-            #     gl.glVertex3f(kVerticies[i][0], kVerticies[i][0], kVerticies[i][0])
-            gl.glEnd()
-            gl.glBegin(gl.GL_LINES)
-            gl.glColor3f(1.0, 1.0, 1.0)
-            # for i in range(len(kVerticies) - 1):
-            #     gl.glVertex3f(kVerticies[i][0], kVerticies[i][1], kVerticies[i][2])
-            #     gl.glVertex3f(kVerticies[i + 1][0], kVerticies[i + 1][1], kVerticies[i + 1][2])
-            for edge in kEdges:
-                for vertex in edge:
-                    gl.glVertex3f(kVerticies[vertex][0], kVerticies[vertex][1], kVerticies[vertex][2])  # or gl.glVertex3fv(kVertices[vertex])
-            gl.glEnd()
-        elif self.drawType == DrawTypes.kTorus:
-            subdAxis = 15
-            subdHeight = 20
-            radius = 1.0
-            radiusSec = 0.5
-            step = 2.0 * math.pi / subdAxis
-            stepSec = 2.0 * math.pi / subdHeight
-            loops = collections.OrderedDict()
-            for i in range(subdAxis):
-                gl.glColor3f(1.0, 0.0, 0.0)
-                alpha = step * i + (math.pi / 2.0)
-                mOrigin = np.identity(4)
-                mOrigin[0][0] = math.cos(-alpha)
-                mOrigin[0][2] = -math.sin(-alpha)
-                mOrigin[2][0] = math.sin(-alpha)
-                mOrigin[2][2] = math.cos(-alpha)
-                mOrigin[3][0] = math.cos(step * i) * radius
-                mOrigin[3][2] = math.sin(step * i) * radius
-                pivotInfo = collections.OrderedDict()
-                for j in range(subdHeight):
-                    gl.glColor3f(1.0, 1.0, 1.0)
-                    beta = stepSec * j
-                    mChildL = np.identity(4)
-                    mChildL[3][1] = -math.sin(beta) * radiusSec
-                    mChildL[3][2] = math.cos(beta) * radiusSec
-                    mChildW = np.matmul(mChildL, mOrigin)
-                    pivotInfo["Point %s" % j] = [mChildW[3][0], mChildW[3][1], mChildW[3][2]]
-                loops["Pivot %s" % i] = pivotInfo
-            gl.glBegin(gl.GL_LINES)
-            for i in range(subdAxis):
-                for j in range(subdHeight):
-                    gl.glColor3f(1.0, 1.0, 1.0)
-                    aID = i + 1
-                    if aID == subdAxis:
-                        aID = 0
-                    pID = j + 1
-                    if pID == subdHeight:
-                        pID = 0
-                    startAxis = loops["Pivot %s" % str(i)]["Point %s" % str(j)]
-                    endAxis = loops["Pivot %s" % str(aID)]["Point %s" % str(j)]
-                    startHeight = loops["Pivot %s" % str(i)]["Point %s" % str(j)]
-                    endHeight = loops["Pivot %s" % str(i)]["Point %s" % str(pID)]
-                    gl.glVertex3f(startAxis[0], startAxis[1], startAxis[2])
-                    gl.glVertex3f(endAxis[0], endAxis[1], endAxis[2])
-                    gl.glColor3f(1.0, 1.0, 1.0)
-                    gl.glVertex3f(startHeight[0], startHeight[1], startHeight[2])
-                    gl.glVertex3f(endHeight[0], endHeight[1], endHeight[2])
-            gl.glEnd()
-        else:
-            pass
+        glApi = self.glApi
+        buffer = self.meshBuffer()
+        if self.drawType == DrawTypes.kCube:
+            glApi.glColor4f(0.5, 0.5, 0.5, 1.0)
+            buffer.draw("triangles")
+        glApi.glColor3f(1.0, 1.0, 1.0)
+        buffer.draw("lines")
+
+    def spin(self, elapsed):
+        """
+        Spin the cube by the elapsed time, so the speed does not depend on the frame rate.
 
-    def spin(self):
-        """ Spin the cube. """
-        self.yRotDeg = (self.yRotDeg + self.rotMult) % 360.0
-        self.update()
+        Args:
+            elapsed (float): Seconds since the previous spin.
+        """
+        with self.profiler.phase("spin"):
+            self.yRotDeg = (self.yRotDeg + kDegreesPerSecond * self.rotMult * elapsed) % 360.0
+            self.camera.setRotation(transforms.quaternion(self.rotAxis, self.yRotDeg))
 
 
 if __name__ == "__main__":